@@ -0,0 +1,89 @@
+"""
+find_file latency as the catalog grows: the old `name LIKE '%q%'` scan vs the
+trigram-indexed search_db in sentinel.tools.sql_index.
+
+Synthetic names are inserted straight into a temporary catalog (triggers keep
+the trigram index in sync, as in production), growing step by step.
+
+    python benchmarks/bench_name_search.py [--sizes 10000,100000,1000000,5000000]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sentinel.core import db
+from sentinel.tools import sql_index
+
+WORDS = ["report", "invoice", "budget", "notes", "draft", "final", "meeting", "photo", "scan",
+         "contract", "resume", "project", "summary", "backup", "export", "design", "plan", "data",
+         "quarterly", "receipt", "taxes", "slides", "thesis", "roadmap", "agenda", "minutes"]
+EXTS = [".pdf", ".docx", ".xlsx", ".txt", ".png", ".jpg", ".py", ".md", ".zip", ".csv"]
+
+# (query, kind): rare hits a handful of rows, common hits a large share of the catalog
+QUERIES = [("invoice_4471", "rare"), ("roadmap-2023", "rare"), ("thesis_final", "medium"),
+           ("quarterly", "common"), ("report", "common")]
+
+
+def _rows(start, stop, rng):
+    now = time.time()
+    for i in range(start, stop):
+        name = f"{rng.choice(WORDS)}{rng.choice('_- ')}{rng.choice(WORDS + [str(rng.randrange(10000)), '2023', '2024'])}" \
+               f"_{i}{rng.choice(EXTS)}"
+        folder = f"/data/d{i % 5000}"
+        mtime = now - rng.random() * 3 * 365 * 86400
+        yield (f"{folder}/{name}", name, os.path.splitext(name)[1], 0.1, "2024-01-01 00:00:00", mtime, folder)
+
+
+def _old_search(query):
+    return sql_index._get_conn().execute(
+        "SELECT name, path, modified_date FROM files WHERE name LIKE ? ORDER BY mtime_raw DESC LIMIT 10",
+        (f"%{query}%",)
+    ).fetchall()
+
+
+def _median_ms(fn, query, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(query)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="10000,100000,1000000,5000000")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    sizes = [int(s) for s in args.sizes.split(",")]
+
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        sql_index.DB_FILE = os.path.join(tmp, "catalog.db")
+        sql_index._schema_ready = False
+        sql_index._ensure_schema()
+
+        print(f"{'rows':>9}  {'query':<14} {'kind':<7} {'LIKE scan':>10} {'trigram':>10}")
+        have = 0
+        for size in sizes:
+            for chunk_start in range(have, size, 50_000):
+                with db.write(sql_index.DB_FILE) as conn:
+                    conn.executemany(sql_index._UPSERT_FILE, _rows(chunk_start, min(chunk_start + 50_000, size), rng))
+            have = size
+
+            for query, kind in QUERIES:
+                old = _median_ms(_old_search, query, args.repeat)
+                new = _median_ms(sql_index.search_db, query, args.repeat)
+                print(f"{size:>9}  {query:<14} {kind:<7} {old:>8.1f}ms {new:>8.1f}ms")
+            print()
+        db.close_all()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Memory vector backends: ChromaDB vs the built-in NumPy/SQLite store.
+
+Uses random precomputed embeddings so only the store itself is measured:
+cold start (fresh interpreter: import + open + first query), single-fact
+insert latency (what store_fact does) and top-k query latency.
+
+    python benchmarks/bench_vector_store.py [--facts 3000] [--dim 384]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from sentinel.core import db, vector_store
+
+COLD_START = """
+import sys, time
+start = time.perf_counter()
+import numpy as np
+from sentinel.core import vector_store
+backend, path, dim = sys.argv[1], sys.argv[2], int(sys.argv[3])
+if backend == "numpy":
+    store = vector_store.NumpyVectorStore(path)
+else:
+    store = vector_store.open_chroma(path, None)
+store.query(query_embeddings=[np.ones(dim, dtype="float32")], n_results=5)
+print(time.perf_counter() - start)
+"""
+
+
+def _open(backend, path):
+    if backend == "numpy":
+        return vector_store.NumpyVectorStore(path)
+    return vector_store.open_chroma(path, None)
+
+
+def _vectors(n, dim, rng):
+    v = rng.standard_normal((n, dim)).astype("float32")
+    return v / np.linalg.norm(v, axis=1, keepdims=True)
+
+
+def _ms(samples):
+    samples = sorted(samples)
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    return f"p50 {statistics.median(samples) * 1000:7.2f} ms   p95 {p95 * 1000:7.2f} ms"
+
+
+def _bench(backend, path, facts, dim, rng):
+    store = _open(backend, path)
+    vectors = _vectors(facts, dim, rng)
+    for i in range(0, facts, 500):
+        chunk = range(i, min(i + 500, facts))
+        store.add(
+            ids=[f"m{j}" for j in chunk],
+            documents=[f"fact number {j}" for j in chunk],
+            metadatas=[{"subject": f"s{j % 50}", "type": "fact"} for j in chunk],
+            embeddings=vectors[i:i + 500],
+        )
+
+    inserts = []
+    for j, v in enumerate(_vectors(100, dim, rng)):
+        start = time.perf_counter()
+        store.add(ids=[f"new{j}"], documents=[f"new fact {j}"], metadatas=[{"subject": "new", "type": "fact"}], embeddings=[v])
+        inserts.append(time.perf_counter() - start)
+
+    queries = []
+    for q in _vectors(200, dim, rng):
+        start = time.perf_counter()
+        store.query(query_embeddings=[q], n_results=10)
+        queries.append(time.perf_counter() - start)
+
+    if backend == "numpy":
+        store.close()
+    del store
+
+    colds = []
+    for _ in range(3):
+        out = subprocess.run([sys.executable, "-c", COLD_START, backend, path, str(dim)],
+                             capture_output=True, text=True, cwd=ROOT, env={**os.environ, "PYTHONPATH": ROOT})
+        colds.append(float(out.stdout.strip().splitlines()[-1]))
+
+    print(f"{backend:<7} cold start  {min(colds) * 1000:8.0f} ms (best of 3)")
+    print(f"{backend:<7} insert      {_ms(inserts)}")
+    print(f"{backend:<7} query k=10  {_ms(queries)}\n")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--facts", type=int, default=3000)
+    parser.add_argument("--dim", type=int, default=384)
+    args = parser.parse_args()
+
+    print(f"{args.facts} stored facts, {args.dim}-d embeddings\n")
+    with tempfile.TemporaryDirectory() as tmp:
+        _bench("chroma", os.path.join(tmp, "chroma"), args.facts, args.dim, np.random.default_rng(0))
+        _bench("numpy", os.path.join(tmp, "vectors.db"), args.facts, args.dim, np.random.default_rng(0))
+        db.close_all()
+
+
+if __name__ == "__main__":
+    main()
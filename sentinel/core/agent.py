@@ -6,10 +6,15 @@ import shutil
 from sentinel.core.config import ConfigManager
 from sentinel.core.llm import LLMEngine
 from sentinel.core.registry import TOOLS, SYSTEM_PROMPT
+from sentinel.core.router import IntentRouter
+from sentinel.core.tool_schema import build_tool_specs, NATIVE_PROMPT_NOTE
+from sentinel.core.repair import local_repair, looks_like_tool_call, repair_action, repair_stats
+from sentinel.core.summary import RollingSummary
+from sentinel.core import executor, jobs, embed_cache, embeddings
 from sentinel.core.ui import UI
 from sentinel.core.schema import AgentAction
-from sentinel.tools import memory_ops
-from sentinel.paths import USER_DATA_DIR, DB_PATH, VECTOR_PATH, AUDIT_LOG_PATH as AUDIT_LOG
+from sentinel.tools import memory_ops, sql_index
+from sentinel.paths import USER_DATA_DIR, DB_PATH, VECTOR_PATH, VECTOR_DB_PATH, AUDIT_LOG_PATH as AUDIT_LOG
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 SCRIPTS_DIR = os.path.join(BASE_DIR, "scripts")
@@ -18,11 +23,21 @@ FACTORY_RESET_SCRIPT = os.path.join(SCRIPTS_DIR, "factory_reset.bat")
 WIPE_VECTOR_SCRIPT = os.path.join(SCRIPTS_DIR, "wipe_vector.bat")
 
 class SentinelAgent:
-    def __init__(self, config_manager):
+    def __init__(self, config_manager, ui=UI, tool_specs=None):
+        """
+        Args:
+            ui: Output sink for turn results. The terminal UI by default;
+                sessions hosted by SessionManager pass their own collector.
+            tool_specs: Pre-built native tool schemas, shared between sessions.
+        """
         self.config_manager = config_manager
+        self.ui = ui
         self.brain = LLMEngine(self.config_manager)
         self.history = []
         self.window_size = self.config_manager.get("memory.window_size", 15)
+        self.router = IntentRouter(self.config_manager, TOOLS)
+        self.tool_specs = tool_specs or build_tool_specs(TOOLS, SYSTEM_PROMPT)
+        self.summary = RollingSummary(self.config_manager)
 
     def _parse_action(self, text) -> AgentAction | None:
         json_data = None
@@ -55,12 +70,53 @@ class SentinelAgent:
         except:
             return None
 
+    def _validate_step(self, reply):
+        """Cascade check: None if the fast tier's output is usable, else the escalation reason."""
+        if isinstance(reply, tuple):
+            text, calls = reply
+            if any(c["tool"] not in TOOLS for c in calls):
+                return "unknown_tool"
+            # Plain text is a legitimate final answer in native mode, unless it is broken JSON
+            if calls or not looks_like_tool_call(text) or self._parse_action(text) or local_repair(text, TOOLS)[0]:
+                return None
+            return "parse_failed"
+
+        action = self._parse_action(reply) or local_repair(reply, TOOLS)[0]
+        if action is None:
+            return "parse_failed"
+        if action.tool != "response" and action.tool not in TOOLS:
+            return "unknown_tool"
+        return None
+
+    def _actions_from_reply(self, reply):
+        """Returns (raw_text, [AgentAction]) for either a native (text, calls) reply or raw text."""
+        if isinstance(reply, tuple):
+            text, calls = reply
+            actions = []
+            for call in calls:
+                try:
+                    actions.append(AgentAction(tool=call["tool"], args=call.get("args") or {}))
+                except Exception:
+                    continue
+            if actions:
+                return text, actions
+        else:
+            text = reply
+
+        action = self._parse_action(text)
+        misnamed = action is not None and action.tool != "response" and action.tool not in TOOLS
+        if (action is None and looks_like_tool_call(text)) or misnamed:
+            # Looks like an attempted tool call: repair it instead of ending the turn
+            action = repair_action(text, self.tool_specs, self.brain) or action
+        return text, [action] if action else []
+
     def _enforce_memory_limit(self):
         max_msgs = self.window_size * 2
         while len(self.history) > max_msgs:
             if len(self.history) < 2: break
             old_user = self.history.pop(0)
             old_ai = self.history.pop(0)
+            self.summary.add(old_user.get('content', ''), old_ai.get('content', ''))
             try:
                 memory_ops.archive_interaction(old_user.get('content', ''), old_ai.get('content', ''))
             except:
@@ -99,6 +155,7 @@ class SentinelAgent:
                 # 2. Release Database Locks
                 try:
                     memory_ops.teardown()
+                    embed_cache.close()
                 except:
                     pass
 
@@ -113,13 +170,19 @@ class SentinelAgent:
                     except Exception as e:
                         UI.print_error(f"Failed to delete vectors: {e}")
 
-                # Delete SQLite DB
-                if os.path.exists(DB_PATH):
+                # SQLite databases, with their WAL sidecar files
+                for path, label in ((VECTOR_DB_PATH, "Vector Store"), (DB_PATH, "Brain Database"),
+                                    (embed_cache.CACHE_DB, "Embedding Cache")):
+                    if not os.path.exists(path):
+                        continue
                     try:
-                        os.remove(DB_PATH)
-                        UI.print_success("Deleted Brain Database.")
+                        for sidecar in (f"{path}-wal", f"{path}-shm"):
+                            if os.path.exists(sidecar):
+                                os.remove(sidecar)
+                        os.remove(path)
+                        UI.print_success(f"Deleted {label}.")
                     except Exception as e:
-                        UI.print_error(f"Failed to delete DB: {e}")
+                        UI.print_error(f"Failed to delete {label.lower()}: {e}")
 
                 UI.print_system("Wipe Complete. Restarting Sentinel is recommended.")
                 sys.exit(0)
@@ -134,6 +197,8 @@ class SentinelAgent:
                     from sentinel.core import scheduler
                     scheduler.stop_all_jobs()
                     memory_ops.teardown()
+                    from sentinel.core import db
+                    db.close_all()
 
                     # Nuke the entire .sentinel folder
                     if os.path.exists(USER_DATA_DIR):
@@ -148,14 +213,15 @@ class SentinelAgent:
             return True
 
         if cmd == "status":
-            UI.print_agent(
-                f"**Provider:** {self.brain.provider.upper()}\n**Model:** {self.brain.model}\n**Window:** {self.window_size} turns\n**Active Memory:** {len(self.history)} messages",
-                model=self.brain.model
-            )
+            status = f"**Provider:** {self.brain.provider.upper()}\n**Model:** {self.brain.model}\n**Window:** {self.window_size} turns\n**Active Memory:** {len(self.history)} messages (+ ~{self.summary.tokens()} token summary)\n**Fast Path:** {self.router.stats()}\n**Parse Repairs:** {repair_stats()}\n**Embeddings:** {embed_cache.stats()} | Local model: {embeddings.stats()}\n**Hot Memory:** {memory_ops.hot_tier.stats()}\n**File Watcher:** {sql_index.watcher_stats()}"
+            if self.brain.fast_provider:
+                status += f"\n**Cascade:** {self.brain.fast_provider}/{self.brain.fast_model} → {self.brain.cascade_stats()}"
+            UI.print_agent(status, model=self.brain.model)
             return True
 
         if cmd == "clear":
             self.history = []
+            self.summary.clear()
             UI.print_success("Short-term memory cleared.")
             return True
 
@@ -172,6 +238,35 @@ class SentinelAgent:
             UI.console.print(res)
             return True
 
+        if cmd == "cascade":
+            if not args:
+                UI.print_system(f"Cascade: {self.brain.fast_provider or 'OFF'} | {self.brain.cascade_stats()}")
+            elif args[0].lower() == "off":
+                self.config_manager.set("llm.fast_provider", None)
+                self.brain.reload_config()
+                UI.print_success("Cascade disabled. Every step uses the primary model.")
+            else:
+                self.config_manager.set("llm.fast_provider", args[0].lower())
+                self.config_manager.set("llm.fast_model", args[1] if len(args) > 1 else None)
+                self.brain.reload_config()
+                UI.print_success(f"Fast tier set to {self.brain.fast_provider}/{self.brain.fast_model}.")
+            return True
+
+        if cmd == "vectors":
+            if not args:
+                backend = self.config_manager.get("memory.vector_backend", "chroma")
+                UI.print_system(f"Vector backend: {backend}. Use /vectors chroma|numpy to migrate.")
+            else:
+                UI.print_system(memory_ops.switch_vector_backend(args[0].lower()))
+            return True
+
+        if cmd == "jobs":
+            if args and args[0].lower() == "cancel" and len(args) > 1:
+                UI.print_system(jobs.job_cancel(args[1]))
+            else:
+                UI.print_system(jobs.job_status(args[0] if args else None))
+            return True
+
         if cmd == "log":
             if not args:
                 state = ConfigManager().get("system.audit_logging", True)
@@ -206,86 +301,152 @@ class SentinelAgent:
 
         return False
 
-    def run_loop(self):
-        if self.config_manager.get_key(self.brain.provider):
-            UI.print_system("Systems Online. Waiting for input...")
+    def _execute_action(self, action):
+        """Runs a tool call and records it in history. Returns False if the tool is unknown."""
+        tool, args = action.tool, action.args
 
-        while True:
-            try:
-                user_input = UI.get_input()
-                if not user_input:
-                    continue
+        if tool not in TOOLS:
+            error_msg = f"Tool '{tool}' not found. Available tools: {', '.join(TOOLS.keys())}"
+            self.ui.print_error(error_msg)
+            self.history.append({"role": "assistant", "content": action.model_dump_json()})
+            self.history.append({"role": "system", "content": error_msg})
+            return False
 
-                if user_input.lower().strip() in ["exit", "quit"]:
-                    sys.exit(0)
+        self.ui.print_tool(tool)
+        try:
+            timeout = executor.resolve_timeout(tool, self.config_manager)
+            res = executor.run_tool(tool, TOOLS[tool], args, timeout=timeout)
 
-                if self.process_slash_command(user_input):
-                    continue
+            if not res or not str(res).strip():
+                res = "No long-term memories stored about you yet."
 
-                relevant_context = memory_ops.retrieve_relevant_context(user_input)
-                current_sys = SYSTEM_PROMPT
-                if relevant_context:
-                    current_sys += f"\n\n[RECALLED MEMORIES]\n{relevant_context}\n"
+            self.ui.print_result(res)
 
-                self.history.append({"role": "user", "content": user_input})
-                memory_ops.log_activity("chat", user_input)
+            self.history.append({"role": "assistant", "content": action.model_dump_json()})
 
-                for _ in range(20):
-                    messages = self.history[-self.window_size * 2:]
-                    full_resp = self.brain.query(current_sys, messages)
-                    action = self._parse_action(full_resp)
+            if res and str(res).strip():
+                self.history.append({"role": "user", "content": str(res)})
 
-                    if not action:
-                        clean = full_resp.replace("```json", "").replace("```", "").strip()
+        except executor.ToolTimeout as e:
+            self.ui.print_error(f"Tool Timeout: {e}")
+            self.history.append({"role": "assistant", "content": action.model_dump_json()})
+            if e.may_complete:
+                error, hint = "timeout_unconfirmed", ("The action may still complete in the background. "
+                                                      "Do NOT retry it; tell the user its outcome is unconfirmed.")
+            else:
+                error, hint = "timeout", "The tool did not respond in time. Try a different approach or tell the user."
+            self.history.append({"role": "user", "content": json.dumps({
+                "error": error,
+                "tool": tool,
+                "timeout_seconds": e.seconds,
+                "hint": hint
+            })})
+        except executor.Cancelled:
+            raise
+        except Exception as e:
+            self.ui.print_error(f"Tool Error: {e}")
+            self.history.append({"role": "system", "content": f"Error: {e}"})
+        return True
+
+    def handle_turn(self, user_input):
+        """
+        Runs one user turn (fast path or tool loop) against this agent's history.
+        Output goes to `self.ui`. Returns the final reply text, if any.
+        """
+        routed = self.router.route(user_input)
+        if routed:
+            self.history.append({"role": "user", "content": user_input})
+            memory_ops.log_activity("chat", user_input)
+            self._execute_action(routed)
+            self._enforce_memory_limit()
+            return self.history[-1]["content"] if self.history else None
+
+        relevant_context = memory_ops.retrieve_relevant_context(user_input)
+        current_sys = SYSTEM_PROMPT
+        if relevant_context:
+            current_sys += f"\n\n[RECALLED MEMORIES]\n{relevant_context}\n"
+        current_sys += self.summary.context_block()
+
+        self.history.append({"role": "user", "content": user_input})
+        memory_ops.log_activity("chat", user_input)
+
+        complex_step = len(user_input) > self.brain.complex_chars
+        if self.brain.native_tools:
+            current_sys += NATIVE_PROMPT_NOTE
+
+        final_text = None
+        for _ in range(20):
+            messages = self.history[-self.window_size * 2:]
+            reply, tier = self.brain.query_step(
+                current_sys, messages, validate=self._validate_step,
+                complex_step=complex_step, tool_specs=self.tool_specs
+            )
+            model_name = self.brain.fast_model if tier == "fast" else self.brain.model
+            full_resp, actions = self._actions_from_reply(reply)
 
-                        if not clean:
-                            clean = "I don't have any stored long-term information about you yet."
+            if not actions:
+                clean = full_resp.replace("```json", "").replace("```", "").strip()
 
-                        UI.print_agent(clean, model=self.brain.model)
+                if not clean:
+                    clean = "I don't have any stored long-term information about you yet."
 
-                        if full_resp and full_resp.strip():
-                            self.history.append({"role": "assistant", "content": full_resp})
-                        break
+                self.ui.print_agent(clean, model=model_name)
+                final_text = clean
 
-                    tool, args = action.tool, action.args
+                if full_resp and full_resp.strip():
+                    self.history.append({"role": "assistant", "content": full_resp})
+                break
 
-                    if tool == "response":
-                        text = args.get("text", "").strip()
-                        if not text:
-                            text = "I don't have any stored long-term information about you yet."
+            finished = False
+            for action in actions:
+                if action.tool == "response":
+                    text = action.args.get("text", "").strip()
+                    if not text:
+                        text = "I don't have any stored long-term information about you yet."
 
-                        UI.print_agent(text, model=self.brain.model)
-                        self.history.append({"role": "assistant", "content": action.model_dump_json()})
-                        break
+                    self.ui.print_agent(text, model=model_name)
+                    self.history.append({"role": "assistant", "content": action.model_dump_json()})
+                    final_text = text
+                    finished = True
+                    break
 
-                    if tool in TOOLS:
-                        UI.print_tool(tool)
-                        try:
-                            res = TOOLS[tool](**args)
+                if not self._execute_action(action):
+                    # Once a step has gone wrong, let the primary model finish the turn
+                    complex_step = True
+
+            if finished:
+                break
 
-                            if not res or not str(res).strip():
-                                res = "No long-term memories stored about you yet."
+        self._enforce_memory_limit()
+        return final_text
 
-                            UI.print_result(res)
+    def run_loop(self):
+        if self.config_manager.get_key(self.brain.provider):
+            UI.print_system("Systems Online. Waiting for input...")
+
+        while True:
+            try:
+                user_input = UI.get_input()
+            except KeyboardInterrupt:
+                # Nothing is running at the prompt, so Ctrl+C quits as it always did
+                sys.exit(0)
 
-                            self.history.append({"role": "assistant", "content": action.model_dump_json()})
+            try:
+                if not user_input:
+                    continue
 
-                            if res and str(res).strip():
-                                self.history.append({"role": "user", "content": str(res)})
+                if user_input.lower().strip() in ["exit", "quit"]:
+                    sys.exit(0)
 
-                        except Exception as e:
-                            UI.print_error(f"Tool Error: {e}")
-                            self.history.append({"role": "system", "content": f"Error: {e}"})
-                    else:
-                        error_msg = f"Tool '{tool}' not found. Available tools: {', '.join(TOOLS.keys())}"
-                        UI.print_error(error_msg)
-                        self.history.append({"role": "assistant", "content": action.model_dump_json()})
-                        self.history.append({"role": "system", "content": error_msg})
-                        continue
+                if self.process_slash_command(user_input):
+                    continue
 
-                self._enforce_memory_limit()
+                self.handle_turn(user_input)
 
-            except KeyboardInterrupt:
-                sys.exit(0)
+            except (KeyboardInterrupt, executor.Cancelled):
+                # Ctrl+C cancels the running tool or LLM stream, not the whole program
+                if self.history and self.history[-1]["role"] != "assistant":
+                    self.history.append({"role": "assistant", "content": "[Cancelled by user]"})
+                UI.print_warning("Cancelled. Back to the prompt.")
             except Exception as e:
                 UI.print_error(f"System Error: {e}")
@@ -49,7 +49,7 @@ def get_daily_briefing(config_manager):
     # 6. Get Yesterday's Reflection
     try:
         yesterday = (now - datetime.timedelta(days=1)).strftime("%Y-%m-%d")
-        history = memory_ops.reflect_on_day(yesterday)
+        history = memory_ops.summarize_day(yesterday)
     except Exception:
         history = "Memory unavailable."
 
@@ -0,0 +1,145 @@
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+# Applied to every connection. WAL lets readers run while one writer commits;
+# synchronous=NORMAL is durable across app crashes in WAL mode (only an OS crash
+# can drop the last transactions), which is the right trade for index/log data.
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-16000",
+)
+
+# Prepared statements kept per connection (sqlite3's default is 128)
+CACHED_STATEMENTS = 256
+
+_LOCK = threading.Lock()
+_CONNS = {}          # path -> {thread: connection}
+_RETIRED = {}        # thread -> [connections], dropped by close_all() while their thread was alive
+_WRITE_LOCKS = {}    # path -> RLock serializing writers within this process
+_depth = threading.local()   # path -> open db.write() blocks on this thread
+
+
+def _key(path):
+    return str(path)
+
+
+def _open(path):
+    conn = sqlite3.connect(path, timeout=5.0, check_same_thread=False, cached_statements=CACHED_STATEMENTS)
+    conn.row_factory = sqlite3.Row
+    for pragma in PRAGMAS:
+        try:
+            conn.execute(pragma)
+        except sqlite3.DatabaseError:
+            pass
+    return conn
+
+
+def _close(conns):
+    for conn in conns:
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
+def _prune(conns):
+    """Closes connections owned by threads that have exited (tool workers are short-lived)."""
+    _close([conns.pop(t) for t in list(conns) if not t.is_alive()])
+    _close([c for t in [t for t in _RETIRED if not t.is_alive()] for c in _RETIRED.pop(t)])
+
+
+def connect(path):
+    """
+    Returns this thread's pooled connection to `path`, opening it on first use.
+    Do not close it; use close_all() when the files must be released.
+    """
+    key, thread = _key(path), threading.current_thread()
+    with _LOCK:
+        # Connections close_all() took away from this thread are closed by their owner
+        _close(_RETIRED.pop(thread, ()))
+        conns = _CONNS.setdefault(key, {})
+        conn = conns.get(thread)
+        if conn is None:
+            _prune(conns)
+            conn = conns[thread] = _open(key)
+    return conn
+
+
+def _write_lock(key):
+    with _LOCK:
+        lock = _WRITE_LOCKS.get(key)
+        if lock is None:
+            lock = _WRITE_LOCKS[key] = threading.RLock()
+    return lock
+
+
+@contextmanager
+def write(path):
+    """
+    Serialized write transaction: one writer per database at a time within the
+    process, committed on success and rolled back on error.
+
+        with db.write(DB_PATH) as conn:
+            conn.execute("INSERT ...")
+
+    A nested write() on the same thread becomes a savepoint inside the outer
+    transaction; only the outermost block commits.
+    """
+    key = _key(path)
+    with _write_lock(key):
+        conn = connect(key)
+        depths = _depth.__dict__.setdefault("paths", {})
+        depth = depths.get(key, 0)
+        depths[key] = depth + 1
+        try:
+            if depth:
+                savepoint = f"sentinel_write_{depth}"
+                conn.execute(f"SAVEPOINT {savepoint}")
+                try:
+                    yield conn
+                except BaseException:
+                    conn.execute(f"ROLLBACK TO {savepoint}")
+                    raise
+                finally:
+                    conn.execute(f"RELEASE {savepoint}")
+                return
+            # Explicit BEGIN: sqlite3 only opens a transaction before DML, so a
+            # savepoint taken first would otherwise run (and commit) on its own
+            if not conn.in_transaction:
+                conn.execute("BEGIN")
+            try:
+                yield conn
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+        finally:
+            depths[key] = depth
+
+
+def close_all(path=None):
+    """
+    Releases pooled connections (to one database, or all) so files can be deleted.
+    Connections of this thread and of exited threads are closed now. Those of
+    threads still running are closed by their owner on its next connect(), never
+    under it; stop such threads first when the files must go immediately.
+    """
+    me = threading.current_thread()
+    with _LOCK:
+        keys = [_key(path)] if path is not None else list(_CONNS)
+        for key in keys:
+            for thread, conn in _CONNS.pop(key, {}).items():
+                if thread is me or not thread.is_alive():
+                    _close([conn])
+                else:
+                    _RETIRED.setdefault(thread, []).append(conn)
+
+
+def stats():
+    with _LOCK:
+        return {key: len(conns) for key, conns in _CONNS.items()}
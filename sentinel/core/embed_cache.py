@@ -0,0 +1,213 @@
+import hashlib
+import threading
+import time
+import numpy as np
+from sentinel.core import db
+from sentinel.paths import USER_DATA_DIR
+
+CACHE_DB = USER_DATA_DIR / "embed_cache.db"
+
+# SQLite's default limit on bound parameters is 999
+_LOOKUP_CHUNK = 500
+# Vectors kept on disk; the least recently used beyond this are evicted
+MAX_ROWS = 50_000
+# Eviction has to count the table, so it runs once per this many stored vectors
+_EVICT_EVERY = 1000
+# Hits refresh last_used at most once a day, so warm lookups stay read-only
+_TOUCH_SECONDS = 86400
+_stored_since_evict = _EVICT_EVERY
+
+_STATS = {"hits": 0, "misses": 0}
+_STATS_LOCK = threading.Lock()
+_INIT_LOCK = threading.Lock()
+_initialized = False
+
+
+def _init():
+    global _initialized
+    if _initialized:
+        return
+    with _INIT_LOCK:
+        if _initialized:
+            return
+        with db.write(CACHE_DB) as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    namespace TEXT,
+                    hash TEXT,
+                    vector BLOB,
+                    last_used INTEGER DEFAULT 0,
+                    PRIMARY KEY (namespace, hash)
+                ) WITHOUT ROWID
+            ''')
+            # Caches from before the size cap lack the LRU column
+            columns = {row['name'] for row in conn.execute("PRAGMA table_info(embeddings)")}
+            if "last_used" not in columns:
+                conn.execute("ALTER TABLE embeddings ADD COLUMN last_used INTEGER DEFAULT 0")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings(last_used)")
+        _initialized = True
+
+
+def close():
+    """Releases the cache database so it can be deleted."""
+    global _initialized
+    db.close_all(CACHE_DB)
+    _initialized = False
+
+
+def _hash(text):
+    return hashlib.sha256(text.encode("utf-8", "ignore")).hexdigest()
+
+
+def lookup(namespace, texts):
+    """Returns {hash: vector} for every text already embedded under `namespace`."""
+    _init()
+    hashes = list({_hash(t) for t in texts})
+    found = {}
+    stale = []
+    now = int(time.time())
+    conn = db.connect(CACHE_DB)
+    for i in range(0, len(hashes), _LOOKUP_CHUNK):
+        chunk = hashes[i:i + _LOOKUP_CHUNK]
+        placeholders = ",".join("?" * len(chunk))
+        rows = conn.execute(
+            f"SELECT hash, vector, last_used FROM embeddings WHERE namespace = ? AND hash IN ({placeholders})",
+            [namespace, *chunk]
+        ).fetchall()
+        for row in rows:
+            found[row['hash']] = np.frombuffer(row['vector'], dtype="float32")
+            if (row['last_used'] or 0) < now - _TOUCH_SECONDS:
+                stale.append(row['hash'])
+
+    if stale:
+        try:
+            with db.write(CACHE_DB) as conn:
+                for i in range(0, len(stale), _LOOKUP_CHUNK):
+                    chunk = stale[i:i + _LOOKUP_CHUNK]
+                    placeholders = ",".join("?" * len(chunk))
+                    conn.execute(
+                        f"UPDATE embeddings SET last_used = ? WHERE namespace = ? AND hash IN ({placeholders})",
+                        [now, namespace, *chunk]
+                    )
+        except Exception:
+            pass
+    return found
+
+
+def store(namespace, texts, vectors):
+    global _stored_since_evict
+    _init()
+    now = int(time.time())
+    with db.write(CACHE_DB) as conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO embeddings (namespace, hash, vector, last_used) VALUES (?, ?, ?, ?)",
+            [(namespace, _hash(t), np.asarray(v, dtype="float32").tobytes(), now) for t, v in zip(texts, vectors)]
+        )
+        _stored_since_evict += len(texts)
+        if _stored_since_evict >= _EVICT_EVERY:
+            _stored_since_evict = 0
+            _evict(conn)
+
+
+def _evict(conn):
+    """Drops the least recently used vectors beyond MAX_ROWS. Call inside db.write()."""
+    excess = conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0] - MAX_ROWS
+    if excess > 0:
+        conn.execute('''
+            DELETE FROM embeddings WHERE (namespace, hash) IN (
+                SELECT namespace, hash FROM embeddings ORDER BY last_used LIMIT ?
+            )
+        ''', (excess,))
+
+
+def cached_embed(namespace, texts, embed_fn):
+    """
+    Embeds `texts`, serving repeats from the on-disk cache. Misses are
+    de-duplicated and sent to `embed_fn` in a single batch.
+    """
+    texts = list(texts)
+    if not texts:
+        return []
+
+    try:
+        found = lookup(namespace, texts)
+    except Exception:
+        found = {}
+
+    missing = list(dict.fromkeys(t for t in texts if _hash(t) not in found))
+    if missing:
+        fresh = embed_fn(missing)
+        for text, vector in zip(missing, fresh):
+            found[_hash(text)] = np.asarray(vector, dtype="float32")
+        try:
+            store(namespace, missing, fresh)
+        except Exception:
+            pass
+
+    with _STATS_LOCK:
+        _STATS["misses"] += len(missing)
+        _STATS["hits"] += len(texts) - len(missing)
+
+    return [found[_hash(t)] for t in texts]
+
+
+def stats():
+    with _STATS_LOCK:
+        hits, misses = _STATS["hits"], _STATS["misses"]
+    total = hits + misses
+    if not total:
+        return "Embedding cache: no lookups yet."
+    return f"Embedding cache: {hits}/{total} hits ({hits / total:.0%})"
+
+
+def _embeds_queries_differently(inner):
+    query_fn = getattr(type(inner), "embed_query", None)
+    if query_fn is None:
+        return False
+    try:
+        from chromadb import EmbeddingFunction
+    except ImportError:
+        return True
+    return query_fn is not EmbeddingFunction.embed_query
+
+
+class CachedEmbeddingFunction:
+    """
+    Wraps a Chroma embedding function with the persistent cache.
+
+    Reports the wrapped function's name and config, so collections created
+    before the cache existed open without an embedding-function conflict.
+    Duck-typed rather than subclassing chromadb's base, so the NumPy vector
+    backend can use it without importing chromadb.
+    """
+
+    def __init__(self, inner, namespace):
+        self._inner = inner
+        self.namespace = namespace
+        # Models that embed queries differently from documents get their own keyspace
+        self._query_namespace = f"{namespace}:query" if _embeds_queries_differently(inner) else namespace
+
+    def __call__(self, input):
+        return cached_embed(self.namespace, input, self._inner)
+
+    def embed_query(self, input):
+        query_fn = getattr(self._inner, "embed_query", self._inner)
+        return cached_embed(self._query_namespace, input, query_fn)
+
+    def name(self):
+        return self._inner.name()
+
+    def get_config(self):
+        return self._inner.get_config()
+
+    def build_from_config(self, config):
+        return self._inner.build_from_config(config)
+
+    def is_legacy(self):
+        return self._inner.is_legacy()
+
+    def default_space(self):
+        return self._inner.default_space()
+
+    def supported_spaces(self):
+        return self._inner.supported_spaces()
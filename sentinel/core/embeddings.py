@@ -0,0 +1,145 @@
+"""
+Process-wide local embedding service.
+
+One all-MiniLM-L6-v2 instance serves file search (smart_index), the intent
+router and long-term memory. Callers on different threads are coalesced:
+whatever requests arrive while the model is busy are encoded together in
+the next forward pass.
+"""
+import queue
+import threading
+from concurrent.futures import Future
+
+import numpy as np
+
+MODEL_NAME = "all-MiniLM-L6-v2"
+MAX_BATCH = 64
+
+_MODEL = None
+_MODEL_LOCK = threading.Lock()
+
+_REQUESTS: queue.Queue = queue.Queue()
+_WORKER = None
+_WORKER_LOCK = threading.Lock()
+
+_STATS = {"texts": 0, "batches": 0}
+
+
+def get_model():
+    """Lazy-loads the Transformer model once, thread-safe. Returns None if unavailable."""
+    global _MODEL
+    if _MODEL is None:
+        with _MODEL_LOCK:
+            if _MODEL is None:  # double-checked locking
+                print(f"\n[System] 🧠 Loading Neural Indexing Model ({MODEL_NAME})...")
+                try:
+                    from sentence_transformers import SentenceTransformer
+                    _MODEL = SentenceTransformer(MODEL_NAME)
+                    print("[System] ✅ Neural Model Loaded.\n")
+                except Exception as e:
+                    print(f"[System] ❌ Failed to load embedding model: {e}")
+    return _MODEL
+
+
+def _batch_worker():
+    while True:
+        pending = [_REQUESTS.get()]
+        size = len(pending[0][0])
+        # Everything that queued up during the previous encode rides along
+        while size < MAX_BATCH:
+            try:
+                request = _REQUESTS.get_nowait()
+            except queue.Empty:
+                break
+            pending.append(request)
+            size += len(request[0])
+
+        texts = [t for batch, _ in pending for t in batch]
+        try:
+            model = get_model()
+            if model is None:
+                raise RuntimeError("Embedding model unavailable.")
+            vectors = np.asarray(model.encode(texts, batch_size=MAX_BATCH), dtype="float32")
+        except Exception as e:
+            for _, future in pending:
+                future.set_exception(e)
+            continue
+
+        _STATS["texts"] += len(texts)
+        _STATS["batches"] += 1
+        start = 0
+        for batch, future in pending:
+            future.set_result(vectors[start:start + len(batch)])
+            start += len(batch)
+
+
+def _ensure_worker():
+    global _WORKER
+    if _WORKER is None:
+        with _WORKER_LOCK:
+            if _WORKER is None:
+                _WORKER = threading.Thread(target=_batch_worker, daemon=True, name="sentinel-embeddings")
+                _WORKER.start()
+
+
+def encode(texts):
+    """Encodes a list of texts into an (n, 384) float32 array. Raises if the model is unavailable."""
+    texts = list(texts)
+    if not texts:
+        return np.zeros((0, 0), dtype="float32")
+    _ensure_worker()
+    future = Future()
+    _REQUESTS.put((texts, future))
+    return future.result()
+
+
+def encode_one(text):
+    """Encodes a single text; returns None if the model is unavailable."""
+    try:
+        return encode([text])[0]
+    except Exception:
+        return None
+
+
+def available():
+    return get_model() is not None
+
+
+def stats():
+    texts, batches = _STATS["texts"], _STATS["batches"]
+    if not batches:
+        return "no encodes yet"
+    return f"{texts} texts in {batches} batches ({texts / batches:.1f}/batch)"
+
+
+class LocalEmbeddingFunction:
+    """
+    Chroma-compatible embedding function backed by the shared model.
+
+    Chroma's DefaultEmbeddingFunction is an ONNX export of this same
+    MiniLM model, so this reports the same name and config: collections
+    created with it open unchanged and their stored vectors stay comparable.
+    """
+
+    def __call__(self, input):
+        return list(encode(input))
+
+    @staticmethod
+    def name():
+        return "default"
+
+    def get_config(self):
+        return {}
+
+    @staticmethod
+    def build_from_config(config):
+        return LocalEmbeddingFunction()
+
+    def is_legacy(self):
+        return False
+
+    def default_space(self):
+        return "l2"
+
+    def supported_spaces(self):
+        return ["cosine", "l2", "ip"]
@@ -0,0 +1,221 @@
+import contextvars
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+# Seconds. None = no deadline (long jobs, or tools that enforce their own).
+DEFAULT_TIMEOUTS = {
+    "search_web": 30,
+    "open_url": 20,
+    "read_webpage": 20,
+    "listen": 30,
+    "read_emails": 45,
+    "send_email": 45,
+    "list_calendar_events": 30,
+    "get_calendar_range": 30,
+    "analyze_screen": 90,
+    "capture_webcam": 60,
+    "get_weather": 20,
+    "search_flights": 30,
+    "run_cmd": 30,
+    "build_index": None,
+    "rebuild_memory": None,
+    "compact_memory": None,
+    "organize_files": None,
+    "install_software": None,
+    "create_document": 300,
+}
+
+# Tools with side effects outside Sentinel. Abandoning one at its deadline
+# doesn't undo it, so the model is told not to retry rather than "timed out".
+NON_IDEMPOTENT = {
+    "send_email", "create_calendar_event", "calendar_quick_add", "run_cmd", "append_excel",
+    "schedule_task", "install_software", "organize_files", "bulk_rename", "kill_process",
+}
+
+_local = threading.local()
+
+
+class ToolTimeout(Exception):
+    def __init__(self, tool, seconds):
+        self.may_complete = tool in NON_IDEMPOTENT
+        note = "; it may still complete" if self.may_complete else ""
+        super().__init__(f"'{tool}' did not finish within {seconds}s{note}")
+        self.tool = tool
+        self.seconds = seconds
+
+
+class Cancelled(Exception):
+    """Raised in the caller when the user interrupts a running tool (Ctrl+C)."""
+
+
+class CancelToken:
+    """Cooperative cancellation flag handed to each managed worker."""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._callbacks = []
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def on_cancel(self, callback):
+        """Registers cleanup (close a socket, kill a subprocess). Runs at once if already cancelled."""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def cancel(self):
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:
+                pass
+
+
+class _Worker:
+    def __init__(self, token, interactive=True):
+        self.token = token
+        # Background jobs have nobody waiting on them to answer prompts
+        self.interactive = interactive
+        self.requests = queue.Queue()
+
+
+# ─── Helpers for code running inside a managed worker ─────────────────────────
+
+def current_token():
+    worker = getattr(_local, "worker", None)
+    return worker.token if worker else None
+
+
+def is_cancelled():
+    """Long-running tools poll this between units of work."""
+    token = current_token()
+    return token is not None and token.cancelled
+
+
+def on_cancel(callback):
+    """Registers cleanup for the current worker; no-op outside one."""
+    token = current_token()
+    if token is not None:
+        token.on_cancel(callback)
+
+
+def call_in_owner(fn, *args, **kwargs):
+    """
+    Runs `fn` on the thread that is waiting for this worker (normally the main thread).
+    Used for terminal prompts: input() must not run on a worker that Ctrl+C can't reach,
+    and the tool's deadline is paused while the user is answering.
+    """
+    worker = getattr(_local, "worker", None)
+    if worker is None:
+        return fn(*args, **kwargs)
+    if not worker.interactive:
+        raise RuntimeError("Background jobs cannot prompt the user; approve before starting the job.")
+
+    reply, answered = {}, threading.Event()
+    worker.requests.put((fn, args, kwargs, reply, answered))
+    while not answered.wait(0.1):
+        if worker.token.cancelled:
+            raise Cancelled("Cancelled while waiting for the user.")
+    if "error" in reply:
+        raise reply["error"]
+    return reply["result"]
+
+
+# ─── Caller side ──────────────────────────────────────────────────────────────
+
+@contextmanager
+def bind_worker(token, interactive=True):
+    """
+    Makes the current thread a managed worker for `token` until the block exits,
+    for threads run_tool didn't start (background jobs). Non-interactive workers
+    refuse call_in_owner, since nobody is waiting to answer.
+    """
+    previous = getattr(_local, "worker", None)
+    _local.worker = _Worker(token, interactive)
+    try:
+        yield _local.worker
+    finally:
+        _local.worker = previous
+
+
+def resolve_timeout(tool_name, config_manager=None):
+    if config_manager is not None:
+        overrides = config_manager.get("tools.timeouts", {}) or {}
+        if tool_name in overrides:
+            return overrides[tool_name]
+        default = config_manager.get("tools.default_timeout", 60)
+    else:
+        default = 60
+    return DEFAULT_TIMEOUTS.get(tool_name, default)
+
+
+def run_tool(tool_name, func, args, timeout=None):
+    """
+    Runs a tool in a managed worker thread and waits for it.
+
+    Raises:
+        ToolTimeout: the deadline passed; the worker is told to cancel.
+        Cancelled: the user pressed Ctrl+C; the worker is told to cancel.
+    """
+    token = CancelToken()
+    worker = _Worker(token)
+    ctx = contextvars.copy_context()
+    box = {}
+    done = threading.Event()
+
+    def _target():
+        _local.worker = worker
+        try:
+            box["result"] = ctx.run(func, **args)
+        except BaseException as e:
+            box["error"] = e
+        finally:
+            done.set()
+
+    thread = threading.Thread(target=_target, daemon=True, name=f"sentinel-tool-{tool_name}")
+    thread.start()
+
+    deadline = time.monotonic() + timeout if timeout else None
+    try:
+        while not done.wait(0.05):
+            try:
+                fn, f_args, f_kwargs, reply, answered = worker.requests.get_nowait()
+            except queue.Empty:
+                pass
+            else:
+                started = time.monotonic()
+                try:
+                    reply["result"] = fn(*f_args, **f_kwargs)
+                except KeyboardInterrupt:
+                    reply["error"] = Cancelled("Cancelled by user.")
+                    raise
+                except Exception as e:
+                    reply["error"] = e
+                finally:
+                    answered.set()
+                if deadline:
+                    deadline += time.monotonic() - started
+                continue
+
+            if deadline and time.monotonic() > deadline:
+                token.cancel()
+                raise ToolTimeout(tool_name, timeout)
+    except KeyboardInterrupt:
+        token.cancel()
+        raise Cancelled(f"'{tool_name}' cancelled by user.")
+
+    if "error" in box:
+        raise box["error"]
+    return box.get("result")
@@ -0,0 +1,63 @@
+import threading
+import numpy as np
+
+
+class HotTier:
+    """
+    In-RAM working set of the most frequently recalled memories.
+
+    Holds normalized embeddings in one float32 matrix so a lookup is a single
+    dot product. Contents are replaced wholesale by load(); readers always see
+    either the old or the new snapshot, never a mix.
+    """
+
+    def __init__(self):
+        self._snapshot = ([], [], np.zeros((0, 0), dtype="float32"))
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._snapshot[0])
+
+    def load(self, ids, texts, embeddings):
+        matrix = np.asarray(embeddings, dtype="float32").reshape(len(ids), -1) if ids else np.zeros((0, 0), dtype="float32")
+        if len(matrix):
+            matrix /= np.linalg.norm(matrix, axis=1, keepdims=True) + 1e-12
+        with self._lock:
+            self._snapshot = (list(ids), list(texts), matrix)
+
+    def discard(self, ids):
+        ids = set(ids)
+        with self._lock:
+            keep_ids, texts, matrix = self._snapshot
+            keep = [i for i, mem_id in enumerate(keep_ids) if mem_id not in ids]
+            if len(keep) != len(keep_ids):
+                self._snapshot = ([keep_ids[i] for i in keep], [texts[i] for i in keep], matrix[keep])
+
+    def clear(self):
+        self.load([], [], [])
+
+    def search(self, query_vector, k=5):
+        """Returns [(mem_id, text, cosine)] best first."""
+        ids, texts, matrix = self._snapshot
+        if not ids:
+            return []
+        q = np.asarray(query_vector, dtype="float32")
+        if q.shape[0] != matrix.shape[1]:
+            return []
+        sims = matrix @ (q / (np.linalg.norm(q) + 1e-12))
+        top = np.argsort(-sims)[:k]
+        return [(ids[i], texts[i], float(sims[i])) for i in top]
+
+    def record(self, hit):
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+    def stats(self):
+        total = self.hits + self.misses
+        if not total:
+            return f"{len(self)} hot memories, no lookups yet"
+        return f"{len(self)} hot memories, {self.hits}/{total} served from RAM"
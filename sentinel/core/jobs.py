@@ -0,0 +1,202 @@
+import contextvars
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from sentinel.core import executor
+
+# Set by SessionManager so a job's completion is announced to the session that started it.
+# Signature: notifier(message) -> None. Falls back to the terminal UI.
+NOTIFIER = contextvars.ContextVar("sentinel_job_notifier", default=None)
+
+_POOL = None
+_POOL_LOCK = threading.Lock()
+_JOBS = {}
+_JOBS_LOCK = threading.Lock()
+_IDS = itertools.count(1)
+_local = threading.local()
+
+# Finished jobs kept around for job_status/job_result
+MAX_FINISHED = 50
+
+
+class Job:
+    def __init__(self, job_id, tool, args):
+        self.id = job_id
+        self.tool = tool
+        self.args = args
+        self.status = "queued"      # queued | running | done | failed | cancelled
+        self.progress = None        # 0.0 - 1.0, or None if the tool doesn't report it
+        self.message = ""
+        self.result = None
+        self.error = None
+        self.token = executor.CancelToken()
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.future = None
+
+    @property
+    def finished(self):
+        return self.status in ("done", "failed", "cancelled")
+
+    def describe(self):
+        elapsed = (self.finished_at or time.time()) - (self.started_at or self.created_at)
+        line = f"Job {self.id} [{self.tool}]: {self.status}"
+        if self.progress is not None and not self.finished:
+            line += f" ({self.progress:.0%})"
+        if self.message:
+            line += f" - {self.message}"
+        return f"{line} ({elapsed:.0f}s)"
+
+
+def _pool(max_workers=None):
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            if max_workers is None:
+                from sentinel.core.config import ConfigManager
+                max_workers = ConfigManager().get("jobs.max_workers", 2)
+            _POOL = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="sentinel-job")
+        return _POOL
+
+
+def _notify(notifier, message):
+    try:
+        if notifier is not None:
+            notifier(message)
+        else:
+            from sentinel.core.ui import UI
+            UI.print_system(message)
+    except Exception:
+        pass
+
+
+def _prune():
+    finished = sorted((j for j in _JOBS.values() if j.finished), key=lambda j: j.finished_at)
+    for job in finished[:-MAX_FINISHED]:
+        del _JOBS[job.id]
+
+
+def _run(job, func, notifier):
+    if job.token.cancelled:
+        return
+
+    # Background workers share the executor's cancellation plumbing, so tools that
+    # poll executor.is_cancelled() stop the same way whether foreground or not.
+    _local.job = job
+    job.status = "running"
+    job.started_at = time.time()
+    try:
+        with executor.bind_worker(job.token, interactive=False):
+            job.result = func(**job.args)
+        job.status = "cancelled" if job.token.cancelled else "done"
+    except executor.Cancelled:
+        job.status = "cancelled"
+    except Exception as e:
+        job.error = str(e)
+        job.status = "failed"
+    finally:
+        job.finished_at = time.time()
+        _local.job = None
+
+    if job.status == "done":
+        job.progress = 1.0
+    _notify(notifier, f"Background job {job.id} ({job.tool}) {job.status}. Use job_result(\"{job.id}\") to see the output.")
+
+
+# ─── API ──────────────────────────────────────────────────────────────────────
+
+def submit(tool_name, func, args=None):
+    """Queues `func(**args)` on the bounded job pool and returns the job id immediately."""
+    job = Job(f"j{next(_IDS)}", tool_name, dict(args or {}))
+    ctx = contextvars.copy_context()
+    notifier = NOTIFIER.get()
+
+    with _JOBS_LOCK:
+        _prune()
+        _JOBS[job.id] = job
+    job.future = _pool().submit(ctx.run, _run, job, func, notifier)
+    return job.id
+
+
+def get(job_id):
+    with _JOBS_LOCK:
+        return _JOBS.get(str(job_id).strip())
+
+
+def report_progress(fraction=None, message=""):
+    """
+    Called from inside a long-running tool. No-op when the tool isn't running as a job,
+    so tools can report unconditionally.
+    """
+    job = getattr(_local, "job", None)
+    if job is None:
+        return
+    if fraction is not None:
+        job.progress = max(0.0, min(1.0, float(fraction)))
+    if message:
+        job.message = str(message)[:200]
+
+
+def cancel(job_id):
+    job = get(job_id)
+    if job is None:
+        return False
+    job.token.cancel()
+    if job.future is not None and job.future.cancel():
+        # Never started: settle it here since _run won't
+        job.status = "cancelled"
+        job.finished_at = time.time()
+    return True
+
+
+def list_all():
+    with _JOBS_LOCK:
+        return sorted(_JOBS.values(), key=lambda j: j.created_at)
+
+
+# ─── Tools ────────────────────────────────────────────────────────────────────
+
+def job_status(job_id=None):
+    """Status of one job, or of every job if no id is given."""
+    if job_id:
+        job = get(job_id)
+        return job.describe() if job else f"No job with id '{job_id}'."
+
+    jobs = list_all()
+    if not jobs:
+        return "No background jobs."
+    return "\n".join(j.describe() for j in jobs)
+
+
+def job_result(job_id):
+    job = get(job_id)
+    if job is None:
+        return f"No job with id '{job_id}'."
+    if not job.finished:
+        return f"Job {job.id} is still {job.status}" + (f" ({job.progress:.0%})." if job.progress is not None else ".")
+    if job.status == "failed":
+        return f"Job {job.id} failed: {job.error}"
+    if job.status == "cancelled":
+        return f"Job {job.id} was cancelled." + (f" Partial result: {job.result}" if job.result else "")
+    return str(job.result)
+
+
+def job_cancel(job_id=None):
+    """Cancels one job, or every unfinished job if no id is given."""
+    if not job_id:
+        running = [j for j in list_all() if not j.finished]
+        if not running:
+            return "No running jobs."
+        for job in running:
+            cancel(job.id)
+        return f"Cancellation requested for {len(running)} job(s): {', '.join(j.id for j in running)}."
+
+    job = get(job_id)
+    if job is None:
+        return f"No job with id '{job_id}'."
+    if job.finished:
+        return f"Job {job.id} already {job.status}."
+    cancel(job_id)
+    return f"Cancellation requested for job {job.id}."
@@ -2,6 +2,11 @@ from openai import OpenAI
 import anthropic
 from sentinel.core.ui import UI
 from sentinel.core.audit import audit
+from sentinel.core import executor, tool_schema
+from collections import deque
+import json
+import re
+import threading
 import time
 
 try:
@@ -9,6 +14,49 @@ try:
 except ImportError:
     Groq = None
 
+# Process-wide SDK client pool, keyed by (provider, api_key, base_url).
+# Engines are cheap to build; the HTTP connection pools behind these clients are not.
+_CLIENTS = {}
+_CLIENTS_LOCK = threading.Lock()
+_HTTP_SESSION = None
+
+# (provider, model) pairs that rejected native tools; they use the free-text JSON protocol
+_NO_NATIVE_TOOLS = set()
+_TOOL_REJECTION = re.compile(r"tool|function", re.IGNORECASE)
+
+# Small default models for the cheap tier of the cascade
+FAST_DEFAULTS = {
+    "groq": "llama-3.1-8b-instant",
+    "ollama": "llama3.2",
+    "openai": "gpt-4o-mini",
+    "anthropic": "claude-3-5-haiku-latest",
+}
+
+
+class LLMError(Exception):
+    """A query failed; raised instead of yielding the error text when raise_errors=True."""
+
+
+class ToolsUnsupported(Exception):
+    """The provider or model refused a request because it carried tool schemas."""
+
+
+def _rejects_tools(e):
+    """True for a 4xx from an SDK whose message is about tools, not auth, quota or the network."""
+    status = getattr(e, "status_code", None)
+    return status in (400, 404, 422) and bool(_TOOL_REJECTION.search(str(e)))
+
+
+def _call_args(raw):
+    """Tool-call arguments as a dict; malformed JSON becomes {} and the tool reports what's missing."""
+    if isinstance(raw, dict):
+        return raw
+    try:
+        args = json.loads(raw or "{}")
+    except ValueError:
+        return {}
+    return args if isinstance(args, dict) else {}
+
 
 class LLMEngine:
     def __init__(self, config_manager, verbose=True):
@@ -21,6 +69,9 @@ class LLMEngine:
         self.provider = None
         self.model = None
         self.api_key = None
+        self.fast_provider = None
+        self.fast_model = None
+        self.step_log = deque(maxlen=500)
         self.reload_config(verbose=verbose)
 
     def reload_config(self, verbose=False):
@@ -32,17 +83,90 @@ class LLMEngine:
         self.model = llm_settings.get("model", "gpt-4o")
         self.api_key = self.cfg_manager.get_key(self.provider)
 
+        # Optional cheap tier. Cascade is off unless a fast provider is configured.
+        self.fast_provider = (llm_settings.get("fast_provider") or "").lower() or None
+        self.fast_model = llm_settings.get("fast_model") or FAST_DEFAULTS.get(self.fast_provider)
+        self.complex_chars = llm_settings.get("complex_chars", 400)
+
+        # Native function calling (falls back to free-text JSON if a provider rejects it)
+        self.native_tools = llm_settings.get("native_tools", True)
+        # Per-provider endpoint overrides, e.g. {"ollama": "http://gpu-box:11434"}
+        self.base_urls = llm_settings.get("base_urls", {})
+        # Seconds before a silent provider is abandoned (per request, not per stream)
+        self.timeout = llm_settings.get("timeout", 120)
+
         if verbose:
             is_ready = self.api_key is not None or self.provider == "ollama"
             if is_ready:
                 pass
 
-    def stream_query(self, system_prompt, history):
+    def _client(self, provider, api_key):
+        """Returns a pooled SDK client shared by every engine in the process."""
+        base_url = self.base_urls.get(provider)
+        key = (provider, api_key, base_url, self.timeout)
+
+        with _CLIENTS_LOCK:
+            client = _CLIENTS.get(key)
+            if client is not None:
+                return client
+
+            kwargs = {"api_key": api_key, "timeout": self.timeout}
+            if base_url:
+                kwargs["base_url"] = base_url
+
+            if provider == "groq":
+                client = Groq(**kwargs)
+            elif provider == "openai":
+                client = OpenAI(**kwargs)
+            elif provider == "anthropic":
+                client = anthropic.Anthropic(**kwargs)
+            else:
+                raise ValueError(f"No SDK client for provider '{provider}'")
+
+            _CLIENTS[key] = client
+            return client
+
+    @staticmethod
+    def _http():
+        """Shared keep-alive session for Ollama's HTTP API."""
+        global _HTTP_SESSION
+        if _HTTP_SESSION is None:
+            import requests
+            with _CLIENTS_LOCK:
+                if _HTTP_SESSION is None:
+                    _HTTP_SESSION = requests.Session()
+        return _HTTP_SESSION
+
+    def _ollama_url(self):
+        return self.base_urls.get("ollama", "http://localhost:11434").rstrip("/")
+
+    @staticmethod
+    def _error_message(provider, e):
+        error_str = str(e)
+        if "401" in error_str or "invalid_api_key" in error_str:
+            return f"\n[bold red]🔑 Authentication Failed:[/bold red] The API key for [cyan]{provider.upper()}[/cyan] is invalid or expired."
+        elif "429" in error_str or "rate_limit_exceeded" in error_str:
+            return f"\n[bold yellow]⏳ Rate Limit Reached:[/bold yellow] {provider.upper()} is busy."
+        return f"\n[bold red]System Error ({provider}):[/bold red] {error_str}"
+
+    def stream_query(self, system_prompt, history, provider=None, model=None, raise_errors=False):
+        """
+        Streams a completion. `provider`/`model` override the configured brain
+        for a single call (used by the cascade's fast tier). Failures are
+        yielded as display text, or raised as LLMError with raise_errors=True
+        (for background callers that must not mistake them for output).
+        """
         self.reload_config(verbose=False)
 
-        if not self.api_key and self.provider != "ollama":
-            yield f"\n[bold red]Error:[/bold red] No API key found for '{self.provider}'.\n"
-            yield f"Please run: [cyan]/setkey {self.provider} YOUR_KEY_HERE[/cyan]"
+        provider = provider or self.provider
+        model = model or self.model
+        api_key = self.api_key if provider == self.provider else self.cfg_manager.get_key(provider)
+
+        if not api_key and provider != "ollama":
+            if raise_errors:
+                raise LLMError(f"No API key found for '{provider}'.")
+            yield f"\n[bold red]Error:[/bold red] No API key found for '{provider}'.\n"
+            yield f"Please run: [cyan]/setkey {provider} YOUR_KEY_HERE[/cyan]"
             return
 
         messages = []
@@ -52,84 +176,270 @@ class LLMEngine:
                 messages.append(msg)
 
         try:
-            if self.provider == "groq":
+            if provider == "groq":
                 if not Groq:
+                    if raise_errors:
+                        raise LLMError("'groq' library not installed.")
                     yield "Error: 'groq' library not installed. Run 'pip install groq'."
                     return
                 # Groq (via OpenAI client) EXPECTS system message in list
                 groq_msgs = [{"role": "system", "content": system_prompt}] + history
 
-                client = Groq(api_key=self.api_key)
+                client = self._client(provider, api_key)
                 stream = client.chat.completions.create(
-                    messages=groq_msgs, model=self.model, temperature=0.1, stream=True
+                    messages=groq_msgs, model=model, temperature=0.1, stream=True
                 )
-                for chunk in stream:
-                    if chunk.choices[0].delta.content:
-                        yield chunk.choices[0].delta.content
+                try:
+                    for chunk in stream:
+                        if chunk.choices[0].delta.content:
+                            yield chunk.choices[0].delta.content
+                finally:
+                    # Releases the connection when the consumer stops early (Ctrl+C)
+                    stream.close()
 
-            elif self.provider == "openai":
+            elif provider == "openai":
                 # OpenAI EXPECTS system message in list
                 openai_msgs = [{"role": "system", "content": system_prompt}] + history
 
-                client = OpenAI(api_key=self.api_key)
+                client = self._client(provider, api_key)
                 stream = client.chat.completions.create(
-                    model=self.model, messages=openai_msgs, temperature=0.1, stream=True
+                    model=model, messages=openai_msgs, temperature=0.1, stream=True
                 )
-                for chunk in stream:
-                    if chunk.choices[0].delta.content:
-                        yield chunk.choices[0].delta.content
+                try:
+                    for chunk in stream:
+                        if chunk.choices[0].delta.content:
+                            yield chunk.choices[0].delta.content
+                finally:
+                    stream.close()
 
-            elif self.provider == "anthropic":
+            elif provider == "anthropic":
                 # --- ANTHROPIC SPECIFIC FIX ---
                 # Pass 'system' as a top-level parameter
-                client = anthropic.Anthropic(api_key=self.api_key)
+                client = self._client(provider, api_key)
 
                 with client.messages.stream(
                         max_tokens=4096,
                         system=system_prompt,
                         messages=messages,
-                        model=self.model
+                        model=model
                 ) as stream:
                     for text in stream.text_stream:
                         yield text
 
-            elif self.provider == "ollama":
+            elif provider == "ollama":
                 # Ollama likes system message in list
                 ollama_msgs = [{"role": "system", "content": system_prompt}] + history
-                import requests
-                import json
-                payload = {"model": self.model, "messages": ollama_msgs, "stream": True}
-                with requests.post("http://localhost:11434/api/chat", json=payload, stream=True) as r:
+                payload = {"model": model, "messages": ollama_msgs, "stream": True}
+                with self._http().post(f"{self._ollama_url()}/api/chat", json=payload, stream=True,
+                                       timeout=self.timeout) as r:
                     for line in r.iter_lines():
                         if line:
                             body = json.loads(line)
                             if "message" in body and "content" in body["message"]:
                                 yield body["message"]["content"]
 
+        except LLMError:
+            raise
         except Exception as e:
-            error_str = str(e)
-            if "401" in error_str or "invalid_api_key" in error_str:
-                yield f"\n[bold red]🔑 Authentication Failed:[/bold red] The API key for [cyan]{self.provider.upper()}[/cyan] is invalid or expired."
-            elif "429" in error_str or "rate_limit_exceeded" in error_str:
-                yield f"\n[bold yellow]⏳ Rate Limit Reached:[/bold yellow] {self.provider.upper()} is busy."
-            else:
-                yield f"\n[bold red]System Error ({self.provider}):[/bold red] {error_str}"
+            if raise_errors:
+                raise LLMError(str(e)) from e
+            yield self._error_message(provider, e)
 
-    def query(self, system_prompt, history):
+    def query(self, system_prompt, history, provider=None, model=None, raise_errors=False):
         start_time = time.time()
         full_response = ""
-        for token in self.stream_query(system_prompt, history):
-            full_response += token
+        stream = self.stream_query(system_prompt, history, provider=provider, model=model,
+                                   raise_errors=raise_errors)
+        try:
+            for token in stream:
+                full_response += token
+        finally:
+            stream.close()
 
         duration = (time.time() - start_time) * 1000
 
         audit.log_event(
             event_type="LLM_QUERY",
-            provider=self.provider,
-            model=self.model,
+            provider=provider or self.provider,
+            model=model or self.model,
             input_data=[{"role": "system", "content": system_prompt}] + history,
             output_data=full_response,
             duration_ms=duration
         )
 
-        return full_response
\ No newline at end of file
+        return full_response
+
+    def query_tools(self, system_prompt, history, tool_specs, provider=None, model=None):
+        """
+        Non-streaming query with the tools attached as native function schemas.
+
+        Returns:
+            (text, calls) where calls is a list of {"tool": name, "args": dict},
+            possibly several when the model issues parallel calls.
+
+        Only a rejection of the tool schemas falls back to query(); the
+        (provider, model) pair is then remembered for later steps. Network and
+        auth errors are raised.
+        """
+        self.reload_config(verbose=False)
+
+        provider = provider or self.provider
+        model = model or self.model
+        api_key = self.api_key if provider == self.provider else self.cfg_manager.get_key(provider)
+
+        if (not api_key and provider != "ollama") or (provider, model) in _NO_NATIVE_TOOLS:
+            return self.query(system_prompt, history, provider=provider, model=model), []
+
+        start_time = time.time()
+        text, calls = "", []
+        try:
+            if provider in ("openai", "groq"):
+                if provider == "groq" and not Groq:
+                    raise ImportError("'groq' library not installed")
+                client = self._client(provider, api_key)
+                resp = client.chat.completions.create(
+                    model=model,
+                    messages=[{"role": "system", "content": system_prompt}] + history,
+                    tools=tool_schema.to_openai(tool_specs),
+                    tool_choice="auto",
+                    temperature=0.1,
+                )
+                msg = resp.choices[0].message
+                text = msg.content or ""
+                for tc in msg.tool_calls or []:
+                    calls.append({"tool": tc.function.name, "args": _call_args(tc.function.arguments)})
+
+            elif provider == "anthropic":
+                client = self._client(provider, api_key)
+                resp = client.messages.create(
+                    max_tokens=4096,
+                    system=system_prompt,
+                    messages=[m for m in history if m["role"] != "system"],
+                    model=model,
+                    tools=tool_schema.to_anthropic(tool_specs),
+                )
+                for block in resp.content:
+                    if block.type == "text":
+                        text += block.text
+                    elif block.type == "tool_use":
+                        calls.append({"tool": block.name, "args": dict(block.input or {})})
+
+            elif provider == "ollama":
+                payload = {
+                    "model": model,
+                    "messages": [{"role": "system", "content": system_prompt}] + history,
+                    "tools": tool_schema.to_openai(tool_specs),
+                    "stream": False,
+                }
+                r = self._http().post(f"{self._ollama_url()}/api/chat", json=payload, timeout=self.timeout)
+                if r.status_code == 400 and _TOOL_REJECTION.search(r.text):
+                    raise ToolsUnsupported(r.text)
+                r.raise_for_status()
+                message = r.json().get("message", {})
+                text = message.get("content") or ""
+                for tc in message.get("tool_calls") or []:
+                    fn = tc.get("function", {})
+                    calls.append({"tool": fn.get("name"), "args": _call_args(fn.get("arguments"))})
+
+            else:
+                raise ToolsUnsupported(f"Native tools unsupported for '{provider}'")
+
+        except Exception as e:
+            if not isinstance(e, ToolsUnsupported) and not _rejects_tools(e):
+                raise
+            # Model or endpoint without tool support: remember it and use the free-text JSON protocol
+            _NO_NATIVE_TOOLS.add((provider, model))
+            return self.query(system_prompt, history, provider=provider, model=model), []
+
+        audit.log_event(
+            event_type="LLM_TOOLS",
+            provider=provider,
+            model=model,
+            input_data=[{"role": "system", "content": system_prompt}] + history,
+            output_data={"text": text, "calls": calls},
+            duration_ms=(time.time() - start_time) * 1000
+        )
+        return text, calls
+
+    def has_fast_tier(self):
+        if not self.fast_provider or not self.fast_model:
+            return False
+        if (self.fast_provider, self.fast_model) == (self.provider, self.model):
+            return False
+        return self.fast_provider == "ollama" or self.cfg_manager.get_key(self.fast_provider) is not None
+
+    def _record_step(self, tier, provider, model, started, response, reason=None):
+        self.step_log.append({
+            "tier": tier,
+            "provider": provider,
+            "model": model,
+            "duration_ms": round((time.time() - started) * 1000, 2),
+            "chars_out": len(str(response or "")),
+            "escalation_reason": reason,
+        })
+
+    def query_step(self, system_prompt, history, validate=None, complex_step=False, tool_specs=None):
+        """
+        One tool-loop step through the model cascade.
+
+        Args:
+            validate (callable): Takes the raw response, returns None if usable
+                                 or a short reason string ("parse_failed", "unknown_tool").
+            complex_step (bool): Skip the fast tier and go straight to the primary model.
+            tool_specs (list): If given (and llm.native_tools is on), tools are sent as native
+                               function schemas and the response is a (text, calls) tuple.
+
+        Returns:
+            (response, tier) where tier is "fast" or "primary".
+        """
+        self.reload_config(verbose=False)
+
+        def ask(provider=None, model=None):
+            if tool_specs and self.native_tools:
+                return self.query_tools(system_prompt, history, tool_specs, provider=provider, model=model)
+            return self.query(system_prompt, history, provider=provider, model=model)
+
+        reason = "complex" if complex_step else None
+        if not complex_step and self.has_fast_tier():
+            started = time.time()
+            try:
+                response = ask(self.fast_provider, self.fast_model)
+                reason = validate(response) if validate else None
+            except executor.Cancelled:
+                raise
+            except Exception as e:
+                # A failing fast tier escalates to the primary
+                response, reason = str(e), "error"
+            self._record_step("fast", self.fast_provider, self.fast_model, started, response, reason)
+            if reason is None:
+                return response, "fast"
+
+        started = time.time()
+        try:
+            response = ask()
+        except executor.Cancelled:
+            raise
+        except Exception as e:
+            # Shown to the user like any other failed query, not as a bare crash
+            response = self._error_message(self.provider, e)
+        self._record_step("primary", self.provider, self.model, started, response, reason)
+        return response, "primary"
+
+    def cascade_stats(self):
+        """Summarises which tier answered recent steps and how long each took."""
+        if not self.step_log:
+            return "No steps recorded."
+
+        lines = []
+        for tier in ("fast", "primary"):
+            steps = [s for s in self.step_log if s["tier"] == tier]
+            if not steps:
+                continue
+            avg = sum(s["duration_ms"] for s in steps) / len(steps)
+            lines.append(f"{tier}: {len(steps)} calls, avg {avg:.0f} ms")
+
+        fast_calls = [s for s in self.step_log if s["tier"] == "fast"]
+        if fast_calls:
+            kept = sum(1 for s in fast_calls if s["escalation_reason"] is None)
+            lines.append(f"fast tier kept {kept}/{len(fast_calls)} steps")
+        return " | ".join(lines)
@@ -2,6 +2,8 @@ import platform
 import datetime
 import threading
 import os
+import contextvars
+import functools
 from sentinel.core.config import ConfigManager
 import schedule
 from sentinel.tools.smart_index import smart_find
@@ -12,7 +14,7 @@ from sentinel.tools import (
     context, calendar_ops, memory_ops, weather_ops, organizer, macros,
     factory, installer
 )
-from sentinel.core import scheduler, cognitive
+from sentinel.core import scheduler, cognitive, executor, jobs
 
 CURRENT_OS = platform.system()
 OS_VERSION = platform.release()
@@ -21,6 +23,10 @@ NOW = datetime.datetime.now()
 cfg = ConfigManager()
 settings = cfg.load() if cfg.exists() else {}
 
+# Set by SessionManager so approvals go to the session that issued the call,
+# not the terminal. Signature: handler(tool_name, display_args, high_risk=False) -> bool
+PERMISSION_HANDLER = contextvars.ContextVar("sentinel_permission_handler", default=None)
+
 
 def initialize_tools():
     print("\n[System] 🔄 Initializing File Systems...")
@@ -39,21 +45,36 @@ def initialize_tools():
     # (catches anything the watcher might miss, e.g. network drives).
     schedule.every(60).minutes.do(sql_index.build_index, True)
 
+    # Daily memory compaction on the job pool, off the scheduler thread
+    schedule.every(24).hours.do(jobs.submit, "compact_memory", memory_ops.compact_memory)
+
     from sentinel.core import scheduler
     scheduler.start_scheduler_service()
 
+def _terminal_approval(tool_name, display_args):
+    print(f"\n[🛑 SECURITY ALERT] Agent wants to run: {tool_name}")
+    print(f"   Arguments: {display_args}")
+    return input(f"   >>> Allow this? (y/N): ").lower() == 'y'
+
+
+def _terminal_confirm_high_risk(cmd):
+    print(f"\n[⚠️ HIGH RISK] Command contains dangerous keywords: '{cmd}'")
+    return input("   >>> TYPE 'CONFIRM' TO EXECUTE: ") == "CONFIRM"
+
+
 def ask_permission(tool_name, func, **kwargs):
     """
     Intervention Layer: Pauses execution to ask the user for confirmation.
     """
-    print(f"\n[🛑 SECURITY ALERT] Agent wants to run: {tool_name}")
     # Hide agent_config from display
     display_args = {k: v for k, v in kwargs.items() if k != 'agent_config'}
-    print(f"   Arguments: {display_args}")
 
-    choice = input(f"   >>> Allow this? (y/N): ").lower()
+    # Tools run on managed workers; the prompt itself belongs on the waiting thread,
+    # which also pauses the tool's deadline while the user decides.
+    handler = PERMISSION_HANDLER.get() or _terminal_approval
+    allowed = executor.call_in_owner(handler, tool_name, display_args)
 
-    if choice == 'y':
+    if allowed:
         try:
             log_args = {k: v for k, v in kwargs.items() if k != 'agent_config'}
             memory_ops.log_activity(tool_name, str(log_args))
@@ -64,13 +85,39 @@ def ask_permission(tool_name, func, **kwargs):
         return f"Action '{tool_name}' denied by user."
 
 
+def _approved(tool_name, func):
+    """ask_permission wrapper that keeps `func`'s signature, so the tool schema has real types."""
+    @functools.wraps(func)
+    def wrapper(**kwargs):
+        return ask_permission(tool_name, func, **kwargs)
+    return wrapper
+
+
+def _schedule_task(interval: int, task: str):
+    return ask_permission(
+        "schedule_task",
+        scheduler.schedule_task,
+        interval_minutes=interval,
+        task_description=task,
+        agent_config=settings
+    )
+
+
 def safe_run_cmd(cmd):
     """Extra guardrails for terminal commands."""
     dangerous_keywords = ["del", "rm", "format", "shutdown", "reboot", ">"]
     if any(k in cmd.lower() for k in dangerous_keywords):
-        print(f"\n[⚠️ HIGH RISK] Command contains dangerous keywords: '{cmd}'")
-        confirm = input("   >>> TYPE 'CONFIRM' TO EXECUTE: ")
-        if confirm != "CONFIRM":
+        handler = PERMISSION_HANDLER.get()
+        if handler is not None:
+            if not executor.call_in_owner(handler, "run_cmd", {"cmd": cmd}, high_risk=True):
+                return "Safety block: Command denied."
+            try:
+                memory_ops.log_activity("run_cmd", str({"cmd": cmd}))
+            except:
+                pass
+            return system_ops.run_cmd(cmd)
+
+        if not executor.call_in_owner(_terminal_confirm_high_risk, cmd):
             return "Safety block: Command denied."
 
     return ask_permission("run_cmd", system_ops.run_cmd, cmd=cmd)
@@ -86,13 +133,46 @@ def draft_code(filename, content):
     except Exception as e:
         return f"Error drafting code: {e}"
 
+# Tools that may run as background jobs: name -> (function, needs approval)
+BACKGROUND_TOOLS = {
+    "build_index": (indexer.build_index, False),
+    "rebuild_memory": (sql_index.build_index, False),
+    "compact_memory": (memory_ops.compact_memory, True),
+    "organize_files": (organizer.organize_files, True),
+    "create_document": (factory.create_document, False),
+    "install_software": (installer.install_software, False),
+}
+
+
+def start_job(tool: str, args: dict = None):
+    """Starts a long-running tool in the background and returns its job id at once."""
+    if tool not in BACKGROUND_TOOLS:
+        return f"'{tool}' can't run as a background job. Supported: {', '.join(BACKGROUND_TOOLS)}"
+
+    func, needs_approval = BACKGROUND_TOOLS[tool]
+    args = args or {}
+
+    # Jobs can't prompt once they're running, so approval happens up front
+    if needs_approval:
+        handler = PERMISSION_HANDLER.get() or _terminal_approval
+        if not executor.call_in_owner(handler, tool, args):
+            return f"Action '{tool}' denied by user."
+        try:
+            memory_ops.log_activity(tool, str(args))
+        except:
+            pass
+
+    job_id = jobs.submit(tool, func, args)
+    return f"Started background job {job_id} ({tool}). Check it with job_status(\"{job_id}\")."
+
+
 TOOLS = {
     # System & Apps
     "open_app": apps.open_app,
-    "close_app": lambda **k: ask_permission("close_app", apps.close_app, **k),
+    "close_app": _approved("close_app", apps.close_app),
     "run_cmd": safe_run_cmd,
     "get_clipboard": system_ops.get_clipboard,
-    "kill_process": lambda **k: ask_permission("kill_process", system_ops.kill_process, **k),
+    "kill_process": _approved("kill_process", system_ops.kill_process),
     "get_system_stats": system_ops.get_system_stats,
     "play_music": apps.play_music,
 
@@ -108,9 +188,11 @@ TOOLS = {
     "build_index": indexer.build_index,
     "search_index": indexer.search_index,
     "find_file": sql_index.search_db,
+    "fuzzy_find_file": sql_index.fuzzy_search,
+    "query_files": sql_index.query_files,
     "rebuild_memory": sql_index.build_index,
-    "organize_files": lambda **k: ask_permission("organize_files", organizer.organize_files, **k),
-    "bulk_rename": lambda **k: ask_permission("bulk_rename", organizer.bulk_rename, **k),
+    "organize_files": _approved("organize_files", organizer.organize_files),
+    "bulk_rename": _approved("bulk_rename", organizer.bulk_rename),
 
     # Office & Documents
     "create_word": office.create_word,
@@ -123,7 +205,7 @@ TOOLS = {
     "get_time": clock.get_time,
     "set_timer": clock.set_timer,
     "set_alarm": clock.set_alarm,
-    "send_email": lambda **k: ask_permission("send_email", email_ops.send_email, **k),
+    "send_email": _approved("send_email", email_ops.send_email),
     "read_emails": email_ops.read_emails,
 
     # Memory & Cognitive
@@ -132,10 +214,13 @@ TOOLS = {
     "store_fact": memory_ops.store_fact,
     "delete_fact": memory_ops.delete_fact,
     "retrieve_knowledge": lambda **kwargs: memory_ops.retrieve_relevant_context(
-        query=" ".join([str(v) for v in kwargs.values() if v])
+        query=" ".join([str(v) for v in kwargs.values() if v]),
+        subject=kwargs.get("subject"),
+        predicate=kwargs.get("predicate")
     ),
 
     "reflect_on_day": memory_ops.reflect_on_day,
+    "compact_memory": _approved("compact_memory", memory_ops.compact_memory),
     "daily_briefing": lambda: cognitive.get_daily_briefing(cfg),
 
     # Navigation & Flights
@@ -162,20 +247,14 @@ TOOLS = {
     "get_weather": weather_ops.get_current_weather,
 
     # Autonomy (Scheduler)
-    "schedule_task": lambda interval, task: ask_permission(
-        "schedule_task",
-        scheduler.schedule_task,
-        interval_minutes=interval,
-        task_description=task,
-        agent_config=settings
-    ),
+    "schedule_task": _schedule_task,
     "stop_tasks": scheduler.stop_all_jobs,
 
     # Calendar
     "list_calendar_events": calendar_ops.list_upcoming_events,
     "get_calendar_range": calendar_ops.get_events_in_frame,
-    "create_calendar_event": lambda **k: ask_permission("create_event", calendar_ops.create_event, **k),
-    "calendar_quick_add": lambda **k: ask_permission("quick_add", calendar_ops.quick_add, **k),
+    "create_calendar_event": _approved("create_event", calendar_ops.create_event),
+    "calendar_quick_add": _approved("quick_add", calendar_ops.quick_add),
 
     # Macros & Installers
     "run_macro": macros.run_macro,
@@ -184,6 +263,12 @@ TOOLS = {
 
     "find_my_file": lambda query: "\n".join(smart_find(query)),
 
+    # Background Jobs
+    "start_job": start_job,
+    "job_status": jobs.job_status,
+    "job_result": jobs.job_result,
+    "job_cancel": jobs.job_cancel,
+
 }
 
 # --- PROMPT ---
@@ -269,9 +354,11 @@ FILES & INDEX:
 - draft_code(filename, content): save code safely
 - build_index(verbose): scan filesystem
 - search_index(query): semantic file search
-- find_file(query): exact filename search (SQL, literal)
+- find_file(query, limit): filename substring search (indexed; exact and prefix matches rank first)
+- fuzzy_find_file(query, limit): typo-tolerant filename search ("reciept.pdf", "quartely report")
+- query_files(name, extension, min_mb, max_mb, modified_after, modified_before, folder, sort, descending, limit, page): filtered file listing; all optional. Dates: YYYY-MM-DD, "today", "this week", "this month", "7d". sort: modified | size | name. e.g. PDFs over 50 MB this month in Downloads -> query_files(extension="pdf", min_mb=50, modified_after="this month", folder="Downloads")
 - find_my_file(query): semantic + recency search (vague queries like "that pdf I edited last week")
-- rebuild_memory(verbose): rebuild index
+- rebuild_memory(verbose, full): rebuild index; full=true re-checks every file instead of only changed folders
 - organize_files(directory, strategy): strategy must be "extension" or "date" [REQUIRES APPROVAL]
 - bulk_rename(directory, pattern, replace_with): rename files [REQUIRES APPROVAL]
 
@@ -295,7 +382,8 @@ MEMORY & COGNITIVE:
 - store_fact(subject, predicate, obj)
 - delete_fact(subject, predicate, obj): remove stored memory facts
 - retrieve_knowledge(subject, predicate, obj)
-- reflect_on_day(date_str)
+- reflect_on_day(date_str, page): day summary plus raw activity entries (50 per page)
+- compact_memory(): merge duplicate memories and evict stale ones (runs daily on its own) [REQUIRES APPROVAL]
 - daily_briefing()
 
 NAVIGATION & FLIGHTS:
@@ -324,7 +412,7 @@ PERCEPTION:
 
 AUTONOMY:
 - schedule_task(interval, task) [REQUIRES APPROVAL]
-- stop_tasks()
+- stop_tasks(): stop all scheduled tasks
 
 CALENDAR:
 - list_calendar_events(max_results)
@@ -337,6 +425,12 @@ MACROS & INSTALLERS:
 - install_software(package_names): install Windows apps via winget (arg is a list of strings)
 - list_installed_apps(): list installed applications
 
+BACKGROUND JOBS:
+- start_job(tool, args): run build_index, rebuild_memory, compact_memory, organize_files, create_document or install_software in the background; returns a job id immediately
+- job_status(job_id): progress of a job (omit job_id to list all jobs)
+- job_result(job_id): output of a finished job
+- job_cancel(job_id): stop a running job (omit job_id to stop all background jobs)
+
 
 FINAL RULE:
 Your response MUST ALWAYS be one of:
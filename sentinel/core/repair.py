@@ -0,0 +1,217 @@
+import ast
+import re
+import json
+import difflib
+from sentinel.core.schema import AgentAction
+
+# How often each repair path produced a usable action
+REPAIR_STATS = {
+    "attempts": 0,
+    "fenced": 0,
+    "trailing_commas": 0,
+    "python_literal": 0,
+    "truncated": 0,
+    "key_aliases": 0,
+    "tool_name": 0,
+    "llm": 0,
+    "failed": 0,
+}
+
+_FENCE = re.compile(r"```(?:json|JSON)?\s*(.*?)(?:```|$)", re.DOTALL)
+_TRAILING_COMMA = re.compile(r",\s*([}\]])")
+
+# Shapes models produce when they imitate other function-calling formats
+_TOOL_KEYS = ("tool", "name", "action", "function", "tool_name")
+_ARGS_KEYS = ("args", "arguments", "parameters", "input", "params")
+_TOOL_KEY = re.compile(r"""["'](?:%s)["']\s*:""" % "|".join(_TOOL_KEYS))
+
+REPAIR_PROMPT = (
+    "You repair malformed tool calls. Reply with ONLY one JSON object of the form "
+    '{"tool": "<name>", "args": {...}} — no prose, no markdown. '
+    'If the text is a plain answer rather than a tool call, use {"tool": "response", "args": {"text": "..."}}.'
+)
+
+
+def _open_brackets(text):
+    """(closers still owed, whether the text ends inside a string literal)."""
+    stack, in_str, escaped = [], False, False
+    for ch in text:
+        if in_str:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_str = False
+        elif ch == '"':
+            in_str = True
+        elif ch in "{[":
+            stack.append("}" if ch == "{" else "]")
+        elif ch in "}]" and stack:
+            stack.pop()
+    return stack, in_str
+
+
+def _close_truncated(text):
+    """
+    Appends missing brackets to JSON that was cut off between values. A cut
+    inside a string (half a command, half a file body) is never closed: the
+    result would be a valid call that does something else.
+    """
+    stack, in_str = _open_brackets(text)
+    if not stack or in_str:
+        return None
+    return text.rstrip().rstrip(",") + "".join(reversed(stack))
+
+
+def _cut_in_string(text):
+    start = text.find("{")
+    return start != -1 and _open_brackets(text[start:])[1]
+
+
+def looks_like_tool_call(text):
+    """True if the text has a tool-call key ("tool": / "name": ...), not just a stray brace in prose."""
+    return bool(_TOOL_KEY.search(text or ""))
+
+
+def _load(candidate):
+    try:
+        return json.loads(candidate)
+    except Exception:
+        pass
+    try:
+        value = ast.literal_eval(candidate)
+        return value if isinstance(value, dict) else None
+    except Exception:
+        return None
+
+
+def _normalize(data):
+    """Maps {"name": .., "arguments": ..} style objects onto {"tool": .., "args": ..}."""
+    if not isinstance(data, dict):
+        return None, False
+    if "tool" in data and isinstance(data.get("args", {}), dict):
+        return data, False
+
+    tool = next((data[k] for k in _TOOL_KEYS if isinstance(data.get(k), str)), None)
+    if tool is None and isinstance(data.get("function"), dict):
+        inner = data["function"]
+        tool, args = inner.get("name"), inner.get("arguments", {})
+    else:
+        args = next((data[k] for k in _ARGS_KEYS if k in data), {})
+
+    if isinstance(args, str):
+        args = _load(args) or {}
+    if not tool or not isinstance(args, dict):
+        return None, False
+    return {"tool": tool, "args": args}, True
+
+
+def _candidates(text):
+    """Yields (repair_path, candidate_string) from least to most invasive."""
+    start = text.find("{")
+    body = text[start:] if start != -1 else text
+    # Drop prose after the last closing brace ("{...} hope that helps")
+    trimmed = body[:body.rfind("}") + 1] if "}" in body else body
+
+    fenced = _FENCE.search(text)
+    if fenced:
+        yield "fenced", fenced.group(1).strip()
+
+    no_commas = _TRAILING_COMMA.sub(r"\1", trimmed)
+    if no_commas != trimmed:
+        yield "trailing_commas", no_commas
+
+    yield "python_literal", trimmed
+
+    closed = _close_truncated(_TRAILING_COMMA.sub(r"\1", body))
+    if closed:
+        yield "truncated", closed
+
+
+def local_repair(text, tool_names):
+    """
+    Cheap, offline recovery of an AgentAction from malformed output.
+    Returns (AgentAction, path) or (None, None).
+    """
+    if not text or "{" not in text:
+        return None, None
+
+    known = set(tool_names) | {"response"}
+    for path, candidate in _candidates(text):
+        data, aliased = _normalize(_load(candidate))
+        if data is None:
+            continue
+
+        if data["tool"] not in known:
+            close = difflib.get_close_matches(data["tool"].strip().lower(), list(known), n=1, cutoff=0.75)
+            if not close:
+                continue
+            data["tool"] = close[0]
+            path = "tool_name"
+        elif aliased:
+            path = "key_aliases"
+
+        try:
+            return AgentAction(**data), path
+        except Exception:
+            continue
+    return None, None
+
+
+def _schema_hint(text, tool_specs):
+    """The schema of the tool the output seems to name, or a one-line catalogue."""
+    names = [s["name"] for s in tool_specs]
+    mentioned = [n for n in names if n in text]
+    if not mentioned:
+        words = re.findall(r"[a-z_]{4,}", text.lower())
+        mentioned = [m for w in words for m in difflib.get_close_matches(w, names, n=1, cutoff=0.8)]
+
+    if mentioned:
+        spec = next(s for s in tool_specs if s["name"] == mentioned[0])
+        return json.dumps({"name": spec["name"], "parameters": spec["parameters"]})
+
+    return ", ".join(f"{s['name']}({', '.join(s['parameters']['properties'])})" for s in tool_specs)
+
+
+def repair_action(text, tool_specs, brain=None):
+    """
+    Local fixes first; then a tiny LLM repair prompt containing only the bad
+    output and the relevant schema (never the conversation history).
+    Returns an AgentAction or None.
+    """
+    REPAIR_STATS["attempts"] += 1
+    tool_names = [s["name"] for s in tool_specs]
+
+    action, path = local_repair(text, tool_names)
+    if action:
+        REPAIR_STATS[path] += 1
+        return action
+
+    # Output cut off mid-string is rejected rather than completed by a model guessing the rest
+    if brain is not None and not _cut_in_string(text):
+        prompt = f"MALFORMED OUTPUT:\n{text[:2000]}\n\nTOOL SCHEMA:\n{_schema_hint(text, tool_specs)}"
+        try:
+            if brain.has_fast_tier():
+                fixed = brain.query(REPAIR_PROMPT, [{"role": "user", "content": prompt}],
+                                    provider=brain.fast_provider, model=brain.fast_model)
+            else:
+                fixed = brain.query(REPAIR_PROMPT, [{"role": "user", "content": prompt}])
+            action, _ = local_repair(fixed, tool_names)
+            if action:
+                REPAIR_STATS["llm"] += 1
+                return action
+        except Exception:
+            pass
+
+    REPAIR_STATS["failed"] += 1
+    return None
+
+
+def repair_stats():
+    attempts = REPAIR_STATS["attempts"]
+    if not attempts:
+        return "No repairs needed."
+    fixed = attempts - REPAIR_STATS["failed"]
+    paths = ", ".join(f"{k}={v}" for k, v in REPAIR_STATS.items() if k not in ("attempts", "failed") and v)
+    return f"{fixed}/{attempts} repaired" + (f" ({paths})" if paths else "")
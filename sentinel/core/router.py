@@ -0,0 +1,182 @@
+import re
+import time
+from sentinel.core.audit import audit
+from sentinel.core.schema import AgentAction
+
+# Polite wrappers that never change the intent ("please open spotify", "sentinel, volume 40")
+_PREFIXES = re.compile(r"^(?:hey |ok |okay )?(?:sentinel[,:]? )?(?:please |can you |could you )?")
+_SUFFIXES = re.compile(r"(?: please| for me| now)+$")
+
+# Words that mean "open" is about a file/document, not an app — leave those to the LLM.
+_OPEN_BLOCKLIST = {
+    "the", "my", "a", "an", "that", "this", "file", "folder", "document", "and", "then",
+    "last", "recent", "latest", "it", "url", "website", "link", "email", "emails"
+}
+
+
+def _level(match):
+    level = int(match.group(1))
+    return {"level": level} if 0 <= level <= 100 else None
+
+
+def _app(match):
+    name = match.group(1).strip()
+    words = name.split()
+    if not words or len(words) > 3 or any(w in _OPEN_BLOCKLIST for w in words):
+        return None
+    return {"name": name}
+
+
+def _filename(match):
+    return {"query": match.group(1)}
+
+
+# (pattern, tool, arg builder, confidence). A builder returning None rejects the match.
+RULES = [
+    (r"what(?:'s| is) the time|what time is it|(?:tell me )?the time|current time|time", "get_time", None, 1.0),
+    (r"(?:set |change |turn )?(?:the )?volume(?: to| at)? (\d{1,3}) ?%?", "set_volume", _level, 1.0),
+    (r"(?:set |change |turn )?(?:the )?brightness(?: to| at)? (\d{1,3}) ?%?", "set_brightness", _level, 1.0),
+    (r"(?:open|launch) ([a-z0-9][\w .+-]*)", "open_app", _app, 0.9),
+    (r"(?:find|locate|where is|search for) (?:the )?(?:file )?([\w .()-]+\.[a-z0-9]{1,5})", "find_file", _filename, 0.95),
+    (r"(?:stop|cancel) (?:all )?(?:the )?scheduled tasks", "stop_tasks", None, 1.0),
+    (r"(?:stop|cancel) (?:all )?(?:the )?(?:background (?:tasks|jobs)|(?:running )?jobs)", "job_cancel", None, 1.0),
+    (r"(?:show |get )?(?:system stats|cpu usage|ram usage|system status)", "get_system_stats", None, 0.95),
+    (r"(?:what(?:'s| is) )?(?:the )?(?:active|current) app", "get_active_app", None, 0.9),
+]
+
+# Zero-argument intents the optional embedding classifier may pick.
+# Argument-bearing intents are regex-only: a nearest neighbour cannot extract "40" from "volume 40".
+EXAMPLES = {
+    "get_time": ["what time is it", "tell me the time", "what's the time right now", "current time please"],
+    "get_system_stats": ["how is my cpu doing", "show memory usage", "how much ram am i using", "system health"],
+    "stop_tasks": ["stop all scheduled tasks", "cancel my recurring tasks", "kill the scheduler"],
+    "job_cancel": ["stop all background jobs", "cancel whatever is running in the background"],
+    "get_active_app": ["which app am i using", "what window is focused"],
+    "list_calendar_events": ["what's on my calendar", "show my upcoming events", "what meetings do i have"],
+    "daily_briefing": ["give me my daily briefing", "brief me on today"],
+}
+
+
+class IntentRouter:
+    """
+    Local fast path in front of `brain.query`.
+    Maps trivial commands straight onto a TOOLS entry without an LLM round trip,
+    and falls through (returns None) whenever it is not confident.
+    """
+
+    def __init__(self, config_manager, tools):
+        self.cfg = config_manager
+        self.tools = tools
+        self.enabled = self.cfg.get("router.enabled", True)
+        self.threshold = self.cfg.get("router.threshold", 0.85)
+        self.use_embeddings = self.cfg.get("router.embeddings", False)
+        self.embedding_threshold = self.cfg.get("router.embedding_threshold", 0.8)
+
+        self.rules = [
+            (re.compile(rf"^(?:{pattern})$"), tool, builder, confidence)
+            for pattern, tool, builder, confidence in RULES
+            if tool in tools
+        ]
+
+        self._labels = None
+        self._matrix = None
+
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def normalize(text):
+        text = " ".join(text.lower().strip().split())
+        text = text.rstrip("?!. ")
+        text = _PREFIXES.sub("", text)
+        return _SUFFIXES.sub("", text).strip()
+
+    def _match_rules(self, text):
+        for pattern, tool, builder, confidence in self.rules:
+            match = pattern.match(text)
+            if not match:
+                continue
+            args = builder(match) if builder else {}
+            if args is None:
+                continue
+            return tool, args, confidence
+        return None
+
+    def _load_examples(self):
+        """Embeds the example phrases once. Returns False if no model is available."""
+        if self._matrix is not None:
+            return True
+        try:
+            import numpy as np
+            from sentinel.core import embeddings
+            if not embeddings.available():
+                return False
+
+            labels, phrases = [], []
+            for tool, examples in EXAMPLES.items():
+                if tool in self.tools:
+                    labels.extend([tool] * len(examples))
+                    phrases.extend(examples)
+
+            matrix = embeddings.encode(phrases)
+            matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+            self._labels, self._matrix = labels, matrix
+            return True
+        except Exception:
+            self.use_embeddings = False
+            return False
+
+    def _match_embedding(self, text):
+        if not self._load_examples():
+            return None
+        import numpy as np
+        from sentinel.core import embeddings
+
+        vec = embeddings.encode_one(text)
+        if vec is None:
+            return None
+        norm = np.linalg.norm(vec)
+        if norm == 0:
+            return None
+        sims = self._matrix @ (vec / norm)
+        best = int(np.argmax(sims))
+        score = float(sims[best])
+        if score < self.embedding_threshold:
+            return None
+        return self._labels[best], {}, score
+
+    def route(self, user_input):
+        """Returns an AgentAction to execute directly, or None to fall through to the LLM."""
+        if not self.enabled or not user_input:
+            return None
+
+        start_time = time.time()
+        text = self.normalize(user_input)
+
+        match = self._match_rules(text)
+        if match is None and self.use_embeddings and len(text.split()) <= 8:
+            match = self._match_embedding(text)
+
+        action = None
+        if match and match[2] >= self.threshold:
+            action = AgentAction(tool=match[0], args=match[1])
+            self.hits += 1
+        else:
+            self.misses += 1
+
+        audit.log_event(
+            event_type="ROUTER",
+            provider="local",
+            model="intent-router",
+            input_data=user_input,
+            output_data=f"{action.tool if action else 'fallthrough'} (hit rate {self.hit_rate():.0%})",
+            duration_ms=(time.time() - start_time) * 1000
+        )
+        return action
+
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self):
+        return f"{self.hits}/{self.hits + self.misses} routed locally ({self.hit_rate():.0%})"
@@ -0,0 +1,175 @@
+import threading
+import time
+import uuid
+from sentinel.core.config import ConfigManager
+from sentinel.core.agent import SentinelAgent
+from sentinel.core.registry import TOOLS, SYSTEM_PROMPT, PERMISSION_HANDLER
+from sentinel.core.tool_schema import build_tool_specs
+from sentinel.core import jobs
+
+# A permission handler may return this instead of True to approve the tool for
+# the rest of the session. High-risk commands are still asked about every time.
+ALWAYS_ALLOW = "always"
+
+
+class SessionUI:
+    """
+    Drop-in for the terminal UI that collects a session's output as events
+    instead of printing it, so many conversations can share one process.
+    """
+
+    def __init__(self):
+        self.events = []
+        self._lock = threading.Lock()
+
+    def _emit(self, kind, text, **extra):
+        with self._lock:
+            self.events.append({"type": kind, "text": str(text), "time": time.time(), **extra})
+
+    def print_agent(self, text, model=None):
+        self._emit("agent", text, model=model)
+
+    def print_tool(self, tool_name):
+        self._emit("tool", tool_name)
+
+    def print_result(self, result):
+        self._emit("result", result)
+
+    def print_error(self, msg):
+        self._emit("error", msg)
+
+    def print_system(self, msg):
+        self._emit("system", msg)
+
+    def print_success(self, msg):
+        self._emit("success", msg)
+
+    def print_warning(self, msg):
+        self._emit("warning", msg)
+
+    def drain(self):
+        with self._lock:
+            events, self.events = self.events, []
+        return events
+
+
+class Session:
+    """One independent conversation: its own history, context window and approvals."""
+
+    def __init__(self, session_id, config_manager, tool_specs, permission_handler=None, window_size=None):
+        """
+        Args:
+            permission_handler (callable): handler(tool_name, args, high_risk) -> bool or ALWAYS_ALLOW.
+                                           Without one, every gated tool is denied.
+        """
+        self.id = session_id
+        self.ui = SessionUI()
+        self.agent = SentinelAgent(config_manager, ui=self.ui, tool_specs=tool_specs)
+        if window_size:
+            self.agent.window_size = int(window_size)
+
+        self.permission_handler = permission_handler
+        self.always_allow = set()
+        self.lock = threading.Lock()
+        self.created_at = time.time()
+        self.last_active = self.created_at
+        self.turns = 0
+
+    def check_permission(self, tool_name, args, high_risk=False):
+        if not high_risk and tool_name in self.always_allow:
+            return True
+        if self.permission_handler is None:
+            return False
+        decision = self.permission_handler(tool_name, args, high_risk)
+        if decision == ALWAYS_ALLOW:
+            if not high_risk:
+                self.allow_always(tool_name)
+            return True
+        return bool(decision)
+
+    def allow_always(self, tool_name):
+        """Skips the approval prompt for `tool_name` for the rest of this session."""
+        # Not under self.lock: that is held for the whole turn this is called from
+        self.always_allow.add(tool_name)
+
+
+class SessionManager:
+    """
+    Hosts many conversations in one warm process.
+
+    Sessions share everything that is expensive to build — the pooled LLM clients,
+    the embedding model, the Chroma collection, the tool schemas — and keep only
+    history, window size and permission state to themselves. At most
+    `sessions.max_concurrent_turns` turns run at once; the rest wait for a slot.
+    """
+
+    def __init__(self, config_manager=None, max_concurrent_turns=None):
+        self.cfg = config_manager or ConfigManager()
+        self.max_concurrent_turns = max_concurrent_turns or self.cfg.get("sessions.max_concurrent_turns", 4)
+        self.tool_specs = build_tool_specs(TOOLS, SYSTEM_PROMPT)
+
+        self._turn_slots = threading.BoundedSemaphore(self.max_concurrent_turns)
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self.active_turns = 0
+
+    def create(self, session_id=None, permission_handler=None, window_size=None):
+        session_id = session_id or uuid.uuid4().hex[:12]
+        with self._lock:
+            if session_id in self._sessions:
+                raise ValueError(f"Session '{session_id}' already exists.")
+            session = Session(session_id, self.cfg, self.tool_specs, permission_handler, window_size)
+            self._sessions[session_id] = session
+        return session
+
+    def get(self, session_id):
+        with self._lock:
+            session = self._sessions.get(session_id)
+        if session is None:
+            raise KeyError(f"Unknown session '{session_id}'.")
+        return session
+
+    def close(self, session_id):
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def list(self):
+        with self._lock:
+            return [
+                {"id": s.id, "turns": s.turns, "messages": len(s.agent.history), "last_active": s.last_active}
+                for s in self._sessions.values()
+            ]
+
+    def run_turn(self, session_id, user_input, timeout=None):
+        """
+        Runs one turn for a session in the calling thread.
+        Turns within a session are serialized; across sessions they run in parallel up to the cap.
+
+        Returns:
+            {"reply": str | None, "events": [...]} or {"error": ...} if no slot freed up in time.
+        """
+        session = self.get(session_id)
+
+        with session.lock:
+            if not self._turn_slots.acquire(timeout=timeout):
+                return {"error": "busy", "reply": None, "events": []}
+
+            with self._lock:
+                self.active_turns += 1
+            token = PERMISSION_HANDLER.set(session.check_permission)
+            notifier_token = jobs.NOTIFIER.set(session.ui.print_system)
+            try:
+                reply = session.agent.handle_turn(user_input)
+            except Exception as e:
+                session.ui.print_error(f"System Error: {e}")
+                reply = None
+            finally:
+                jobs.NOTIFIER.reset(notifier_token)
+                PERMISSION_HANDLER.reset(token)
+                with self._lock:
+                    self.active_turns -= 1
+                self._turn_slots.release()
+
+            session.turns += 1
+            session.last_active = time.time()
+            return {"reply": reply, "events": session.ui.drain()}
@@ -0,0 +1,114 @@
+import threading
+from sentinel.core.llm import LLMEngine
+
+SUMMARY_PROMPT = (
+    "You maintain a running summary of a conversation between a user and Sentinel, "
+    "an OS assistant. Merge the new turns into the existing summary. Keep decisions, "
+    "open tasks, names, file paths and preferences; drop chit-chat and tool noise. "
+    "Write terse bullet points, at most {words} words in total. Output the summary only."
+)
+
+
+def estimate_tokens(text):
+    """Rough token count (~4 chars per token) — good enough for budgeting."""
+    return len(text) // 4
+
+
+class RollingSummary:
+    """
+    Incrementally maintained summary of turns evicted from the context window.
+
+    Evicted pairs are queued and folded into the summary by a background thread,
+    so the interactive turn never waits on the summarizer. The summary is kept
+    under `memory.summary_tokens` and sent to the model as one compact block.
+    """
+
+    def __init__(self, config_manager):
+        self.cfg = config_manager
+        self.max_tokens = self.cfg.get("memory.summary_tokens", 300)
+        self.text = ""
+        self._pending = []
+        self._lock = threading.Lock()
+        self._worker = None
+        self._generation = 0
+
+    def add(self, user_text, ai_text):
+        """Queues an evicted turn and makes sure the background updater is running."""
+        if not user_text and not ai_text:
+            return
+        with self._lock:
+            self._pending.append((str(user_text)[:2000], str(ai_text)[:2000]))
+            # The worker clears _worker under this lock before exiting, so a turn
+            # queued here is either picked up by it or starts a new one
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._drain, daemon=True, name="sentinel-summary")
+                self._worker.start()
+
+    def _drain(self):
+        try:
+            self._summarize_pending()
+        finally:
+            # Normally cleared below when the queue runs dry; this covers a crash
+            with self._lock:
+                if self._worker is threading.current_thread():
+                    self._worker = None
+
+    def _summarize_pending(self):
+        brain = LLMEngine(self.cfg, verbose=False)
+        while True:
+            with self._lock:
+                batch, self._pending = self._pending, []
+                current, generation = self.text, self._generation
+                if not batch:
+                    self._worker = None
+                    return
+
+            turns = "\n".join(f"User: {u}\nSentinel: {a}" for u, a in batch)
+            prompt = SUMMARY_PROMPT.format(words=int(self.max_tokens * 0.75))
+            content = f"EXISTING SUMMARY:\n{current or '(empty)'}\n\nNEW TURNS:\n{turns}"
+
+            try:
+                if brain.has_fast_tier():
+                    updated = brain.query(prompt, [{"role": "user", "content": content}],
+                                          provider=brain.fast_provider, model=brain.fast_model, raise_errors=True)
+                else:
+                    updated = brain.query(prompt, [{"role": "user", "content": content}], raise_errors=True)
+            except Exception:
+                updated = None
+
+            updated = self._truncate(updated.strip()) if updated and updated.strip() else current
+            with self._lock:
+                # A /clear while we were summarizing wins
+                if generation == self._generation:
+                    self.text = updated
+
+    def _truncate(self, text):
+        limit = self.max_tokens * 4
+        if len(text) <= limit:
+            return text
+        cut = text[:limit]
+        end = max(cut.rfind("\n"), cut.rfind(". "))
+        return cut[:end + 1] if end > limit // 2 else cut
+
+    def context_block(self):
+        """The block to append to the system prompt, or "" if nothing has been evicted yet."""
+        with self._lock:
+            text, pending = self.text, list(self._pending)
+
+        # Turns still waiting for the summarizer ride along in abbreviated form
+        if pending:
+            tail = "\n".join(f"- User: {u[:150]} | Sentinel: {a[:150]}" for u, a in pending[-3:])
+            text = f"{text}\n{tail}".strip()
+
+        if not text:
+            return ""
+        return f"\n\n[CONVERSATION SUMMARY]\n{text}\n"
+
+    def tokens(self):
+        return estimate_tokens(self.text)
+
+    def clear(self):
+        with self._lock:
+            self.text = ""
+            self._pending = []
+            self._generation += 1
@@ -0,0 +1,146 @@
+import re
+import inspect
+import typing
+
+# Catalogue lines in SYSTEM_PROMPT look like: "- set_volume(level): integer 0-100"
+_CATALOGUE_HEAD = re.compile(r"^- (\w+)\(")
+
+_SIMPLE_TYPES = ((bool, "boolean"), (int, "integer"), (float, "number"), (str, "string"),
+                 (list, "array"), (dict, "object"))
+
+NATIVE_PROMPT_NOTE = (
+    "\n\nNATIVE TOOL CALLING:\n"
+    "The tools above are also attached as callable functions. Call them directly "
+    "(several at once if they are independent). For a final answer, reply with plain text."
+)
+
+
+def _annotation_type(annotation):
+    """JSON schema for a type annotation such as int, float or list[str]; None if unknown."""
+    origin = typing.get_origin(annotation)
+    if origin is typing.Union:
+        # Optional[X] -> X
+        args = [a for a in typing.get_args(annotation) if a is not type(None)]
+        return _annotation_type(args[0]) if len(args) == 1 else None
+    if origin is list:
+        args = typing.get_args(annotation)
+        items = _annotation_type(args[0]) if args else None
+        return {"type": "array", "items": items or {}}
+    for py_type, json_type in _SIMPLE_TYPES:
+        if annotation is py_type or origin is py_type:
+            return {"type": "array", "items": {}} if json_type == "array" else {"type": json_type}
+    return None
+
+
+def _json_type(default=inspect.Parameter.empty, annotation=inspect.Parameter.empty):
+    """Parameter type from the tool's own annotation, else its default; strings otherwise."""
+    if annotation is not inspect.Parameter.empty:
+        schema = _annotation_type(annotation)
+        if schema:
+            return schema
+    if default is not inspect.Parameter.empty and default is not None:
+        schema = _annotation_type(type(default))
+        if schema:
+            return schema
+    return {"type": "string"}
+
+
+def _parse_catalogue(prompt):
+    """Returns {tool: (param_names, optional_names, description)} from the prompt's tool list."""
+    catalogue = {}
+    for line in prompt.splitlines():
+        line = line.strip()
+        match = _CATALOGUE_HEAD.match(line)
+        if not match:
+            continue
+
+        # Find the matching ")" — defaults like html=(true/false) nest parentheses
+        depth, end = 0, None
+        for i in range(match.end() - 1, len(line)):
+            if line[i] == "(":
+                depth += 1
+            elif line[i] == ")":
+                depth -= 1
+                if depth == 0:
+                    end = i
+                    break
+        if end is None:
+            continue
+
+        name = match.group(1)
+        raw_params = line[match.end():end]
+        desc = line[end + 1:].replace("[REQUIRES APPROVAL]", "").strip().lstrip(":").strip()
+        params, optional = [], set()
+        for raw in filter(None, (p.strip() for p in re.split(r",(?![^(]*\))", raw_params))):
+            pname = raw.split("=")[0].strip()
+            params.append(pname)
+            if "=" in raw:
+                optional.add(pname)
+        title = name.replace("_", " ").capitalize()
+        desc = f"{title}: {desc}" if desc else title
+        if "[REQUIRES APPROVAL]" in line:
+            desc += " (requires user approval)"
+        catalogue[name] = (params, optional, desc)
+    return catalogue
+
+
+def _signature_params(func):
+    """Real signature of a tool (approval wrappers expose the wrapped one), or None for **kwargs-only lambdas."""
+    try:
+        sig = inspect.signature(func)
+    except (TypeError, ValueError):
+        return None
+    params = [p for p in sig.parameters.values()
+              if p.kind not in (p.VAR_KEYWORD, p.VAR_POSITIONAL) and p.name != "agent_config"]
+    if not params and any(p.kind == p.VAR_KEYWORD for p in sig.parameters.values()):
+        return None
+    return params
+
+
+def build_tool_specs(tools, prompt):
+    """
+    Builds provider-neutral function specs for every TOOLS entry.
+    Names, descriptions and parameter lists come from the prompt catalogue (what the
+    model is already told); types and defaults come from the Python signature when one exists.
+
+    Returns: [{"name": str, "description": str, "parameters": JSON schema}]
+    """
+    catalogue = _parse_catalogue(prompt)
+    specs = []
+
+    for name, func in tools.items():
+        sig_params = _signature_params(func)
+        listed, optional, desc = catalogue.get(name, (None, set(), None))
+
+        if desc is None:
+            doc = inspect.getdoc(func) or ""
+            desc = doc.splitlines()[0] if doc else name.replace("_", " ")
+
+        properties, required = {}, []
+        if sig_params is not None:
+            for p in sig_params:
+                properties[p.name] = _json_type(p.default, p.annotation)
+                if p.default is inspect.Parameter.empty:
+                    required.append(p.name)
+        else:
+            for pname in listed or []:
+                properties[pname] = _json_type()
+                if pname not in optional:
+                    required.append(pname)
+
+        specs.append({
+            "name": name,
+            "description": desc,
+            "parameters": {"type": "object", "properties": properties, "required": required},
+        })
+
+    return specs
+
+
+def to_openai(specs):
+    """OpenAI / Groq / Ollama `tools` format."""
+    return [{"type": "function", "function": spec} for spec in specs]
+
+
+def to_anthropic(specs):
+    return [{"name": s["name"], "description": s["description"], "input_schema": s["parameters"]} for s in specs]
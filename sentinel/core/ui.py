@@ -92,11 +92,14 @@ class UI:
         table.add_row("/memory [n]", "Set Context Window size (e.g., /memory 5)")
         table.add_row("/log [on/off]", "Toggle audit logging (Default: OFF)")
 
+        table.add_row("/jobs [id]", "List background jobs, or /jobs cancel [id]")
         table.add_row("/clear", "Clear active chat memory (RAM only)")
+        table.add_row("/vectors [backend]", "Show or switch the memory vector backend (chroma | numpy)")
         table.add_row("/wipe", "Wipe long-term memory (Vector DB + brain.db)")
         table.add_row("/factory_reset", "[bold red]FULL FACTORY RESET[/bold red] (Deletes EVERYTHING)")
 
         table.add_row("/switch [p] [m]", "Switch Brain (e.g., /switch groq llama3)")
+        table.add_row("/cascade [p] [m]", "Set fast first-pass model (e.g., /cascade groq) or /cascade off")
         table.add_row("/setkey [p] [k]", "Update API Key")
 
         UI.console.print(table)
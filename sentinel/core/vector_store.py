@@ -0,0 +1,212 @@
+import json
+import threading
+import numpy as np
+from sentinel.core import db
+
+# Backends selectable through `memory.vector_backend`
+BACKENDS = ("chroma", "numpy")
+
+
+def _matches(metadata, where):
+    """Equality filter in Chroma's simple form: {"key": value, ...}."""
+    if not where:
+        return True
+    metadata = metadata or {}
+    for key, value in where.items():
+        if isinstance(value, dict):
+            if "$eq" in value and metadata.get(key) != value["$eq"]:
+                return False
+            if "$in" in value and metadata.get(key) not in value["$in"]:
+                return False
+        elif metadata.get(key) != value:
+            return False
+    return True
+
+
+class NumpyVectorStore:
+    """
+    Built-in vector store: float32 vectors in SQLite, brute-force top-k with NumPy.
+
+    Implements the subset of Chroma's collection API that memory_ops uses
+    (add / get / query / delete / count) and returns results in the same shape,
+    including squared-L2 distances, so the two backends are interchangeable.
+    Exact search over a few thousand memories is a single matrix-vector product.
+    """
+
+    def __init__(self, path, embedding_function=None):
+        self.path = path
+        self.embedding_function = embedding_function
+        self._lock = threading.RLock()
+        self._loaded = False
+
+        with db.write(self.path) as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS vectors (
+                    id TEXT PRIMARY KEY,
+                    document TEXT,
+                    metadata TEXT,
+                    embedding BLOB
+                )
+            ''')
+
+    # ─── In-memory mirror ─────────────────────────────────────────────────────
+
+    def _load(self):
+        if self._loaded:
+            return
+        rows = db.connect(self.path).execute("SELECT id, document, metadata, embedding FROM vectors").fetchall()
+        self._ids = [r['id'] for r in rows]
+        self._docs = [r['document'] for r in rows]
+        self._metas = [json.loads(r['metadata']) if r['metadata'] else None for r in rows]
+        self._index = {mem_id: i for i, mem_id in enumerate(self._ids)}
+        if rows:
+            self._matrix = np.vstack([np.frombuffer(r['embedding'], dtype="float32") for r in rows])
+        else:
+            self._matrix = np.zeros((0, 0), dtype="float32")
+        self._norms = (self._matrix ** 2).sum(axis=1) if len(rows) else np.zeros(0, dtype="float32")
+        self._loaded = True
+
+    def _embed(self, texts, query=False):
+        if self.embedding_function is None:
+            raise ValueError("No embedding function configured; pass embeddings explicitly.")
+        fn = getattr(self.embedding_function, "embed_query", None) if query else None
+        vectors = (fn or self.embedding_function)(list(texts))
+        return np.asarray(vectors, dtype="float32")
+
+    # ─── Collection API ───────────────────────────────────────────────────────
+
+    def count(self):
+        with self._lock:
+            self._load()
+            return len(self._ids)
+
+    def add(self, ids, documents=None, metadatas=None, embeddings=None):
+        ids = list(ids)
+        documents = list(documents) if documents is not None else [None] * len(ids)
+        metadatas = list(metadatas) if metadatas is not None else [None] * len(ids)
+        vectors = np.asarray(embeddings, dtype="float32") if embeddings is not None else self._embed(documents)
+        vectors = vectors.reshape(len(ids), -1)
+
+        with self._lock:
+            self._load()
+            with db.write(self.path) as conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO vectors (id, document, metadata, embedding) VALUES (?, ?, ?, ?)",
+                    [(i, d, json.dumps(m) if m else None, v.tobytes()) for i, d, m, v in zip(ids, documents, metadatas, vectors)]
+                )
+
+            replaced = [mem_id for mem_id in ids if mem_id in self._index]
+            if replaced:
+                self._drop(replaced)
+            if not len(self._ids):
+                self._matrix = np.zeros((0, vectors.shape[1]), dtype="float32")
+            self._ids.extend(ids)
+            self._docs.extend(documents)
+            self._metas.extend(metadatas)
+            self._matrix = np.vstack([self._matrix, vectors])
+            self._norms = np.concatenate([self._norms, (vectors ** 2).sum(axis=1)])
+            self._index = {mem_id: i for i, mem_id in enumerate(self._ids)}
+
+    upsert = add
+
+    def _select(self, ids=None, where=None):
+        if ids is not None:
+            rows = [self._index[i] for i in ids if i in self._index]
+        else:
+            rows = range(len(self._ids))
+        return [r for r in rows if _matches(self._metas[r], where)]
+
+    def get(self, ids=None, where=None, limit=None, offset=0, include=("documents", "metadatas")):
+        with self._lock:
+            self._load()
+            rows = self._select(ids, where)[offset:]
+            if limit is not None:
+                rows = rows[:limit]
+            result = {"ids": [self._ids[r] for r in rows]}
+            if "documents" in include:
+                result["documents"] = [self._docs[r] for r in rows]
+            if "metadatas" in include:
+                result["metadatas"] = [self._metas[r] for r in rows]
+            if "embeddings" in include:
+                result["embeddings"] = self._matrix[rows] if rows else np.zeros((0, 0), dtype="float32")
+            return result
+
+    def query(self, query_texts=None, query_embeddings=None, n_results=10, where=None,
+              include=("documents", "metadatas", "distances")):
+        if query_embeddings is None:
+            query_embeddings = self._embed(query_texts, query=True)
+        queries = np.asarray(query_embeddings, dtype="float32")
+        if queries.ndim == 1:
+            queries = queries[None, :]
+
+        out = {"ids": [], "documents": [], "metadatas": [], "distances": []}
+        with self._lock:
+            self._load()
+            candidates = np.asarray(self._select(where=where), dtype=int)
+            for q in queries:
+                if not len(candidates):
+                    for key in out:
+                        out[key].append([])
+                    continue
+                # Squared L2, as Chroma reports it: |a|^2 + |b|^2 - 2ab
+                dists = self._norms[candidates] + float(q @ q) - 2.0 * (self._matrix[candidates] @ q)
+                k = min(n_results, len(candidates))
+                top = np.argpartition(dists, k - 1)[:k]
+                top = top[np.argsort(dists[top])]
+                rows = candidates[top]
+                out["ids"].append([self._ids[r] for r in rows])
+                out["documents"].append([self._docs[r] for r in rows])
+                out["metadatas"].append([self._metas[r] for r in rows])
+                out["distances"].append([max(float(d), 0.0) for d in dists[top]])
+        return out
+
+    def delete(self, ids=None, where=None):
+        with self._lock:
+            self._load()
+            doomed = [self._ids[r] for r in self._select(ids, where)]
+            if not doomed:
+                return
+            with db.write(self.path) as conn:
+                conn.executemany("DELETE FROM vectors WHERE id = ?", [(i,) for i in doomed])
+            self._drop(doomed)
+
+    def _drop(self, doomed):
+        doomed = set(doomed)
+        keep = [i for i, mem_id in enumerate(self._ids) if mem_id not in doomed]
+        self._ids = [self._ids[i] for i in keep]
+        self._docs = [self._docs[i] for i in keep]
+        self._metas = [self._metas[i] for i in keep]
+        self._matrix = self._matrix[keep]
+        self._norms = self._norms[keep]
+        self._index = {mem_id: i for i, mem_id in enumerate(self._ids)}
+
+    def close(self):
+        with self._lock:
+            self._loaded = False
+        db.close_all(self.path)
+
+
+def open_chroma(path, embedding_function, name="sentinel_memory"):
+    import chromadb
+    client = chromadb.PersistentClient(path=str(path))
+    return client.get_or_create_collection(name=name, embedding_function=embedding_function)
+
+
+def migrate(source, target, batch_size=500, progress=None):
+    """Copies every vector (with document and metadata) from one store to another."""
+    total = source.count()
+    copied = 0
+    while copied < total:
+        chunk = source.get(limit=batch_size, offset=copied, include=["documents", "metadatas", "embeddings"])
+        if not chunk["ids"]:
+            break
+        target.add(
+            ids=chunk["ids"],
+            documents=chunk["documents"],
+            metadatas=[m or None for m in chunk["metadatas"]],
+            embeddings=np.asarray(chunk["embeddings"], dtype="float32"),
+        )
+        copied += len(chunk["ids"])
+        if progress:
+            progress(copied, total)
+    return copied
@@ -12,6 +12,7 @@ DRAFTS_DIR.mkdir(exist_ok=True)
 CONFIG_PATH = USER_DATA_DIR / "config.json"
 DB_PATH = USER_DATA_DIR / "brain.db"
 VECTOR_PATH = USER_DATA_DIR / "brain_vectors"  # ChromaDB folder
+VECTOR_DB_PATH = USER_DATA_DIR / "brain_vectors.db"  # NumPy vector backend
 AUDIT_LOG_PATH = USER_DATA_DIR / "audit_log.jsonl"
 MEMORY_FILE = USER_DATA_DIR / "memory.json"
 FILE_INDEX_DB = USER_DATA_DIR / "file_index.db"
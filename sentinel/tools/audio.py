@@ -1,6 +1,10 @@
 import speech_recognition as sr
 import threading
 import time
+from sentinel.core import executor
+
+# Seconds before the speech-to-text request gives up (the library default is never)
+RECOGNIZE_TIMEOUT = 10
 
 _STOP_LISTENING = None
 
@@ -10,6 +14,7 @@ def listen(timeout=5):
     Blocks until speech is finished or timeout is reached.
     """
     recognizer = sr.Recognizer()
+    recognizer.operation_timeout = RECOGNIZE_TIMEOUT
 
     try:
         with sr.Microphone() as source:
@@ -19,6 +24,9 @@ def listen(timeout=5):
 
             try:
                 audio = recognizer.listen(source, timeout=timeout, phrase_time_limit=10)
+                if executor.is_cancelled():
+                    # Abandoned while recording: free the microphone, skip the network call
+                    return "❌ Listening cancelled."
                 text = recognizer.recognize_google(audio)
                 return f"User said: '{text}'"
 
@@ -3,6 +3,7 @@ import requests
 from bs4 import BeautifulSoup
 from ddgs import DDGS
 from sentinel.core.config import ConfigManager
+from sentinel.core import executor
 
 cfg = ConfigManager()
 
@@ -24,8 +25,11 @@ def search_web(query):
         except Exception:
             pass
 
+    # DDGS has no handle to close; its own timeout keeps it inside search_web's deadline
+    if executor.is_cancelled():
+        return "Search cancelled."
     try:
-        results = DDGS().text(query, max_results=4)
+        results = DDGS(timeout=20).text(query, max_results=4)
         summary = []
         for r in results:
             summary.append(f"Title: {r.get('title')}\nLink: {r.get('href')}\nSnippet: {r.get('body')}\n")
@@ -41,7 +45,9 @@ def open_url(url):
     """Scrapes text content from a URL."""
     try:
         headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64)'}
-        resp = requests.get(url, headers=headers, timeout=10)
+        resp = requests.get(url, headers=headers, timeout=10, stream=True)
+        # Body downloads can outlast the deadline; closing the response drops the socket
+        executor.on_cancel(resp.close)
 
         if resp.status_code != 200:
             return f"Error: Status code {resp.status_code}"
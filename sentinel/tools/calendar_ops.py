@@ -6,6 +6,7 @@ from googleapiclient.discovery import build
 import tzlocal
 
 from sentinel.paths import CREDENTIALS_PATH as CREDS_FILE, TOKEN_PATH as TOKEN_FILE
+from sentinel.core import executor
 
 SCOPES = [
     'https://www.googleapis.com/auth/gmail.readonly',
@@ -40,7 +41,10 @@ def get_service():
         with open(TOKEN_FILE, "w") as token:
             token.write(creds.to_json())
 
-    return build('calendar', 'v3', credentials=creds)
+    service = build('calendar', 'v3', credentials=creds)
+    # Releases the connection (and the worker) if the tool is abandoned at its deadline
+    executor.on_cancel(service.close)
+    return service
 
 
 def list_upcoming_events(max_results=10):
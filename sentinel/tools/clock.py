@@ -10,7 +10,7 @@ def _notify(msg, wait_sec):
     time.sleep(wait_sec)
     notification.notify(title='Sentinel', message=msg, app_name='Sentinel', timeout=10)
 
-def set_timer(minutes, message="Timer Done"):
+def set_timer(minutes: int, message="Timer Done"):
     threading.Thread(target=_notify, args=(message, minutes*60), daemon=True).start()
     return f"Timer set for {minutes} mins."
 
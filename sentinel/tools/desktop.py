@@ -20,7 +20,7 @@ def _safe_str(x):
         return "Unknown result"
 
 
-def set_volume(level):
+def set_volume(level: int):
     """
     Sets volume by zeroing it out and stepping up.
     """
@@ -69,7 +69,7 @@ def media_control(action):
         return f"❌ Media error: {e}"
 
 
-def set_brightness(level):
+def set_brightness(level: int):
     try:
         sbc.set_brightness(int(level))
         return f"🔆 Brightness set to {level}%."
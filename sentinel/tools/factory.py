@@ -4,6 +4,7 @@ import subprocess
 from docx import Document
 from docx.shared import Pt, Inches
 from docx.enum.text import WD_ALIGN_PARAGRAPH
+from sentinel.core import executor, jobs
 
 
 def _convert_to_pdf(docx_path):
@@ -29,7 +30,7 @@ def _convert_to_pdf(docx_path):
         return f"PDF Error: {e}"
 
 
-def create_document(filename, blocks):
+def create_document(filename, blocks: list[dict]):
     """
     Universal Document Generator.
 
@@ -53,7 +54,11 @@ def create_document(filename, blocks):
         font.name = 'Calibri'
         font.size = Pt(11)
 
-        for block in blocks:
+        for i, block in enumerate(blocks):
+            if executor.is_cancelled():
+                return "Document creation cancelled."
+            # Building the .docx is quick; PDF conversion is the slow half
+            jobs.report_progress(0.5 * i / max(len(blocks), 1), "Building document")
             b_type = block.get("type", "paragraph")
 
             # --- HEADING ---
@@ -111,6 +116,7 @@ def create_document(filename, blocks):
 
         doc.save(docx_path)
 
+        jobs.report_progress(0.5, "Converting to PDF")
         pdf_result = _convert_to_pdf(docx_path)
 
         return f"Document created: {docx_path} (PDF Status: {pdf_result})"
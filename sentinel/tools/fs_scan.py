@@ -0,0 +1,146 @@
+# FILE: tools/fs_scan.py
+"""
+Parallel filesystem scanner built on os.scandir.
+
+Directories are listed by a small pool of threads sharing one work queue,
+so several drives and deep trees are walked at once. File metadata comes
+from DirEntry.stat(), which is free on Windows and a single stat() call
+elsewhere, with no separate os.stat(path) round trip.
+
+Incremental scans pass `known`, a lookup of each directory's previously
+recorded (mtime, file_count). A directory whose mtime and file count both
+match is reported with files=None and its files are never stat()ed; its
+subdirectories are still descended into.
+"""
+import os
+import queue
+import threading
+from typing import NamedTuple
+
+DEFAULT_WORKERS = min(8, (os.cpu_count() or 2) * 2)
+
+_DONE = object()
+
+
+class DirListing(NamedTuple):
+    path: str
+    mtime: float
+    files: list      # [(name, size_bytes, mtime)], or None if unchanged since last scan
+    subdirs: list    # [(path, mtime)]
+
+
+def _skip_file(name):
+    return name.startswith("~$") or name.startswith(".")
+
+
+def list_dir(path, mtime, skip_dirs=(), known=None):
+    """Lists one directory. Returns None if it can't be read."""
+    entries, subdirs = [], []
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                name = entry.name
+                try:
+                    if entry.is_symlink() and entry.is_dir():
+                        # os.walk neither descended into nor listed these; entry.stat()
+                        # would follow the link and record the folder as a file
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        if name in skip_dirs or name.startswith("."):
+                            continue
+                        subdirs.append((entry.path, entry.stat(follow_symlinks=False).st_mtime))
+                    elif not _skip_file(name):
+                        entries.append(entry)
+                except OSError:
+                    continue
+    except OSError:
+        return None
+
+    if known is not None and known(path) == (mtime, len(entries)):
+        return DirListing(path, mtime, None, subdirs)
+
+    files = []
+    for entry in entries:
+        try:
+            st = entry.stat()
+        except OSError:
+            continue
+        files.append((entry.name, st.st_size, st.st_mtime))
+    return DirListing(path, mtime, files, subdirs)
+
+
+def scan(roots, skip_dirs=(), workers=None, max_buffered=256, known=None):
+    """
+    Yields a DirListing for every readable directory under `roots`, in no
+    particular order. At most `max_buffered` listings wait for the consumer;
+    closing the generator early stops the workers. `known(path)` is called
+    from worker threads.
+    """
+    work = queue.Queue()
+    out = queue.Queue(maxsize=max_buffered)
+    stop = threading.Event()
+    state = {"pending": 0}
+    lock = threading.Lock()
+
+    def push(path, mtime):
+        with lock:
+            state["pending"] += 1
+        work.put((path, mtime))
+
+    roots = [r for r in dict.fromkeys(roots) if os.path.isdir(r)]
+    # A target nested in another (e.g. ~/Documents under /) would be listed twice
+    roots = [r for r in roots if not any(
+        o != r and r.startswith(o.rstrip("\\/") + os.sep) for o in roots
+    )]
+    for root in roots:
+        try:
+            push(root, os.stat(root).st_mtime)
+        except OSError:
+            continue
+    if not state["pending"]:
+        return
+
+    workers = workers or DEFAULT_WORKERS
+
+    def emit(item):
+        # Blocks while the consumer is behind, but never once it has gone away
+        while not stop.is_set():
+            try:
+                out.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def worker():
+        while not stop.is_set():
+            item = work.get()
+            if item is None:
+                return
+            listing = list_dir(*item, skip_dirs=skip_dirs, known=known)
+            if listing is not None:
+                for sub in listing.subdirs:
+                    push(*sub)
+                emit(listing)
+            with lock:
+                state["pending"] -= 1
+                finished = state["pending"] == 0
+            if finished:
+                for _ in range(workers):
+                    work.put(None)
+                emit(_DONE)
+
+    threads = [threading.Thread(target=worker, daemon=True, name=f"sentinel-scan-{i}") for i in range(workers)]
+    for t in threads:
+        t.start()
+
+    try:
+        while True:
+            listing = out.get()
+            if listing is _DONE:
+                return
+            yield listing
+    finally:
+        stop.set()
+        for _ in range(workers):
+            work.put(None)
+
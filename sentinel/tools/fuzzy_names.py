@@ -0,0 +1,100 @@
+# FILE: tools/fuzzy_names.py
+"""
+Typo-tolerant lookup of words used in file names.
+
+The catalog's distinct name words ("receipt", "quarterly", ...) live in
+name_terms, with their padded trigrams in name_grams. A misspelled query word
+pulls a small candidate set by shared trigrams; the vocabulary is far smaller
+than the catalog, so this stays fast with millions of files. Candidates are
+then checked with edit distance (adjacent transpositions count as one edit,
+so "reciept" is one step from "receipt").
+"""
+import re
+
+_WORD = re.compile(r"[a-z]+|[0-9]+")
+_LOOKUP_CHUNK = 500
+
+
+def words(name):
+    """Lower-cased alphabetic and numeric runs: 'Q3_Report-final.PDF' -> q, 3, report, final, pdf."""
+    return _WORD.findall(name.lower())
+
+
+def _indexable(word):
+    return word.isalpha() and 3 <= len(word) <= 30
+
+
+def grams(word):
+    padded = f" {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def max_edits(word):
+    return 1 if len(word) <= 4 else 2 if len(word) <= 8 else 3
+
+
+def edit_distance(a, b, limit=None):
+    """Optimal string alignment distance; returns limit + 1 early once it's exceeded."""
+    if a == b:
+        return 0
+    if limit is not None and abs(len(a) - len(b)) > limit:
+        return limit + 1
+    prev2, prev = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                cur[j] = min(cur[j], prev2[j - 2] + 1)
+        if limit is not None and min(cur) > limit:
+            return limit + 1
+        prev2, prev = prev, cur
+    return prev[-1]
+
+
+def ensure_schema(conn):
+    conn.execute("CREATE TABLE IF NOT EXISTS name_terms (id INTEGER PRIMARY KEY, term TEXT UNIQUE)")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS name_grams (gram TEXT, term_id INTEGER, PRIMARY KEY (gram, term_id)) WITHOUT ROWID"
+    )
+
+
+def add_names(conn, names):
+    """Adds any new words from `names` to the vocabulary. Call inside the catalog's write transaction."""
+    terms = list({w for name in names for w in words(name) if _indexable(w)})
+    known = set()
+    for i in range(0, len(terms), _LOOKUP_CHUNK):
+        chunk = terms[i:i + _LOOKUP_CHUNK]
+        placeholders = ",".join("?" * len(chunk))
+        known.update(r[0] for r in conn.execute(f"SELECT term FROM name_terms WHERE term IN ({placeholders})", chunk))
+
+    for term in terms:
+        if term in known:
+            continue
+        term_id = conn.execute("INSERT INTO name_terms (term) VALUES (?)", (term,)).lastrowid
+        conn.executemany("INSERT OR IGNORE INTO name_grams (gram, term_id) VALUES (?, ?)",
+                         [(g, term_id) for g in grams(term)])
+
+
+def similar_terms(conn, word, limit=3):
+    """Vocabulary words within max_edits(word) of `word`, closest first: [(distance, term)]."""
+    word_grams = list(grams(word))
+    placeholders = ",".join("?" * len(word_grams))
+    rows = conn.execute(f'''
+        SELECT t.term, COUNT(*) AS shared
+        FROM name_grams g JOIN name_terms t ON t.id = g.term_id
+        WHERE g.gram IN ({placeholders})
+        GROUP BY g.term_id
+        ORDER BY shared DESC
+        LIMIT 200
+    ''', word_grams).fetchall()
+
+    budget = max_edits(word)
+    scored = []
+    for row in rows:
+        d = edit_distance(word, row[0], budget)
+        if d <= budget:
+            scored.append((d, row[0]))
+    scored.sort()
+    return scored[:limit]
@@ -4,6 +4,7 @@ from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 
 from sentinel.paths import CREDENTIALS_PATH, TOKEN_PATH
+from sentinel.core import executor
 
 SCOPES = [
     'https://www.googleapis.com/auth/gmail.readonly',
@@ -36,4 +37,8 @@ def get_gmail_service():
             token.write(creds.to_json())
 
     from googleapiclient.discovery import build
-    return build('gmail', 'v1', credentials=creds)
\ No newline at end of file
+    service = build('gmail', 'v1', credentials=creds)
+    # If the tool is abandoned at its deadline, closing the httplib2 connections
+    # unblocks the stuck request so the worker thread and socket are released
+    executor.on_cancel(service.close)
+    return service
\ No newline at end of file
@@ -1,6 +1,5 @@
 # FILE: tools/indexer.py
 import os
-import sqlite3
 import time
 import logging
 from pypdf import PdfReader
@@ -8,6 +7,7 @@ from docx import Document
 from openpyxl import load_workbook
 from pathlib import Path
 from sentinel.paths import USER_DATA_DIR
+from sentinel.core import db, executor, jobs
 
 DB_FILE = USER_DATA_DIR / "file_index.db"
 MAX_FILE_SIZE_MB = 10
@@ -72,14 +72,12 @@ def build_index(root=None, verbose=False):
     except Exception:
         _smart_available = False
 
-    conn = sqlite3.connect(DB_FILE)
-    c = conn.cursor()
+    with db.write(DB_FILE) as conn:
+        conn.execute('CREATE VIRTUAL TABLE IF NOT EXISTS files USING fts5(path, name, content)')
+        conn.execute('CREATE TABLE IF NOT EXISTS file_meta (path TEXT PRIMARY KEY, mtime REAL)')
 
-    c.execute('CREATE VIRTUAL TABLE IF NOT EXISTS files USING fts5(path, name, content)')
-    c.execute('CREATE TABLE IF NOT EXISTS file_meta (path TEXT PRIMARY KEY, mtime REAL)')
-
-    c.execute("SELECT path, mtime FROM file_meta")
-    existing_meta = {row[0]: row[1] for row in c.fetchall()}
+    rows = db.connect(DB_FILE).execute("SELECT path, mtime FROM file_meta").fetchall()
+    existing_meta = {row[0]: row[1] for row in rows}
 
     updated = 0
 
@@ -89,11 +87,14 @@ def build_index(root=None, verbose=False):
         os.path.join(root, "Downloads")
     ]
 
-    for target in target_dirs:
+    for n, target in enumerate(target_dirs):
         if not os.path.exists(target):
             continue
+        jobs.report_progress(n / len(target_dirs), f"Indexing {target} ({updated} files so far)")
 
         for r, dirs, files in os.walk(target):
+            if executor.is_cancelled():
+                return f"Indexing cancelled after {updated} files."
             dirs[:] = [d for d in dirs if d not in SKIP_DIRS and not d.startswith(".")]
 
             for file in files:
@@ -118,10 +119,10 @@ def build_index(root=None, verbose=False):
                     if not content or len(content) < 5:
                         continue
 
-                    c.execute("DELETE FROM files WHERE path = ?", (path,))
-                    c.execute("INSERT INTO files (path, name, content) VALUES (?,?,?)", (path, file, content))
-                    c.execute("INSERT OR REPLACE INTO file_meta (path, mtime) VALUES (?,?)", (path, current_mtime))
-                    conn.commit()
+                    with db.write(DB_FILE) as conn:
+                        conn.execute("DELETE FROM files WHERE path = ?", (path,))
+                        conn.execute("INSERT INTO files (path, name, content) VALUES (?,?,?)", (path, file, content))
+                        conn.execute("INSERT OR REPLACE INTO file_meta (path, mtime) VALUES (?,?)", (path, current_mtime))
 
                     # Queue into smart_index for background semantic embedding
                     if _smart_available:
@@ -135,7 +136,6 @@ def build_index(root=None, verbose=False):
                 except Exception:
                     continue
 
-    conn.close()
     if verbose and updated > 0:
         print(f"   [Indexer] Batch complete. {updated} new files added.")
     return f"Indexed {updated} files."
@@ -144,15 +144,13 @@ def build_index(root=None, verbose=False):
 def search_index(query):
     if not os.path.exists(DB_FILE):
         return "Index missing."
-    conn = sqlite3.connect(DB_FILE)
     try:
-        res = conn.execute(
+        res = db.connect(DB_FILE).execute(
             "SELECT path, snippet(files, 2, '[', ']', '...', 10) FROM files WHERE files MATCH ? LIMIT 5",
             (query,)
         ).fetchall()
     except Exception:
         return "No matches."
-    conn.close()
     if not res:
         return "No text matches found."
     return "\n".join([f"📄 {r[0]}\n   Snippet: \"{r[1]}\"\n" for r in res])
\ No newline at end of file
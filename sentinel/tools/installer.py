@@ -1,6 +1,7 @@
 import subprocess
 import re
 import shutil
+from sentinel.core import executor, jobs
 
 
 def is_winget_available():
@@ -40,7 +41,7 @@ def winget_search(name):
     return None
 
 
-def install_software(package_names):
+def install_software(package_names: list[str]):
     """
     Generates a SAFE list of install commands.
     """
@@ -135,7 +136,10 @@ def install_software(package_names):
 
     commands = []
 
-    for pkg in package_names:
+    for i, pkg in enumerate(package_names):
+        if executor.is_cancelled():
+            break
+        jobs.report_progress(i / len(package_names), f"Resolving '{pkg}'")
         pkg_lower = pkg.lower().strip()
 
         target_id = WINGET_MAP.get(pkg_lower)
@@ -1,55 +1,164 @@
-import sqlite3
+import atexit
 import datetime
-import chromadb
+import threading
+import time
+from collections import Counter, OrderedDict
 import uuid
 import json
 import re
 import gc
-from chromadb.utils import embedding_functions
+import difflib
+import importlib.util
 from sentinel.core.config import ConfigManager
-from sentinel.paths import DB_PATH, VECTOR_PATH
+from sentinel.core import db, embeddings
+from sentinel.core.embed_cache import CachedEmbeddingFunction
+from sentinel.core import vector_store
+from sentinel.core.hot_tier import HotTier
+from sentinel.paths import DB_PATH, VECTOR_PATH, VECTOR_DB_PATH
 
 # Global references
-chroma_client = None
 collection = None
+embedding_fn = None
+
+# Activity log buffer: the interactive path only appends here; a background
+# flusher writes batches in one transaction.
+LOG_FLUSH_SIZE = 50        # flush as soon as this many records are waiting
+LOG_FLUSH_SECONDS = 2.0    # ...or after this long
+_log_buffer = []
+_log_lock = threading.Lock()
+_log_wakeup = threading.Event()
+_log_stopped = threading.Event()   # set by teardown(): nothing may write brain.db any more
+_log_flusher = None
+_last_prune_day = None
+
+# Raw log rows older than this are dropped; the per-day rollups are kept forever
+LOG_RETENTION_DAYS = 90
+_APP_PATTERN = re.compile(r"Switched to (.+?) \|")
+
+# Compaction. Chroma's default space is squared L2; for normalized embeddings
+# that is 2 - 2*cos, so 0.1 here is cos >= 0.95.
+DUPLICATE_DISTANCE = 0.1
+MERGE_SIMILARITY = 0.92       # cosine similarity at which compaction merges facts
+NEAR_IDENTICAL_TEXT = 0.9     # ...and the wording (or object) must be at least this close
+MAX_FACTS = 5000              # evict lowest-value memories beyond this
+DECAY_HALF_LIFE_DAYS = 30     # importance halves after this long without access
+_compact_lock = threading.Lock()
+
+# Recall cache: repeated queries inside a tool loop skip Chroma and SQLite entirely.
+# Cleared whenever memories are added, removed or compacted.
+RECALL_CACHE_SIZE = 128
+RECALL_CACHE_TTL = 120.0   # seconds
+_recall_cache = OrderedDict()   # key -> (stored_at, text, mem_ids)
+_recall_lock = threading.Lock()
+
+# last_accessed bumps, written in batches by the background flusher
+_pending_access = {}   # mem_id -> timestamp
+_access_lock = threading.Lock()
+
+# Hot tier: the most-recalled memories, searched in RAM before Chroma
+HOT_TIER_SIZE = 64
+HOT_CONFIDENT_COSINE = 0.8     # best hot match at least this close skips Chroma
+HOT_REFRESH_SECONDS = 60.0
+hot_tier = HotTier()
+_hot_loaded_at = 0.0
+
+# Words that carry no signal for lexical fact lookup
+_STOPWORDS = {
+    "the", "and", "for", "what", "whats", "who", "where", "when", "which", "how", "does", "did",
+    "is", "are", "was", "were", "my", "me", "your", "you", "about", "tell", "know", "do", "of",
+    "to", "in", "on", "a", "an", "it", "that", "this", "with", "from", "have", "has", "user",
+}
 
 
 def _get_sql_conn():
     """
-    Returns a connection. Use with context manager for safety.
+    Returns this thread's pooled connection for reads.
+    Writes go through db.write(DB_PATH) so they are serialized.
     """
-    conn = sqlite3.connect(str(DB_PATH), check_same_thread=False)
-    conn.row_factory = sqlite3.Row
-    return conn
+    return db.connect(DB_PATH)
+
+
+def _make_embedding_function():
+    openai_key = ConfigManager().get_key("openai")
+    if openai_key:
+        from chromadb.utils import embedding_functions
+        emb_fn = embedding_functions.OpenAIEmbeddingFunction(
+            api_key=openai_key, model_name="text-embedding-3-small"
+        )
+        namespace = "openai:text-embedding-3-small"
+    elif importlib.util.find_spec("sentence_transformers"):
+        # Same MiniLM the file index uses; one resident copy for both
+        emb_fn = embeddings.LocalEmbeddingFunction()
+        namespace = f"local:{embeddings.MODEL_NAME}"
+    else:
+        from chromadb.utils import embedding_functions
+        emb_fn = embedding_functions.DefaultEmbeddingFunction()
+        namespace = "onnx:all-MiniLM-L6-v2"
+
+    # Facts and recurring queries are embedded once, then served from disk
+    return CachedEmbeddingFunction(emb_fn, namespace)
+
+
+def _open_store(backend, emb_fn):
+    if backend == "numpy":
+        return vector_store.NumpyVectorStore(VECTOR_DB_PATH, embedding_function=emb_fn)
+    return vector_store.open_chroma(VECTOR_PATH, emb_fn)
 
 
 def init_chroma():
-    """Initializes ChromaDB with safe re-entry."""
-    global chroma_client, collection
+    """Opens the configured vector store (`memory.vector_backend`) with safe re-entry."""
+    global collection, embedding_fn
 
     # If already initialized, skip
     if collection is not None:
         return
 
+    backend = ConfigManager().get("memory.vector_backend", "chroma")
     try:
-        chroma_client = chromadb.PersistentClient(path=str(VECTOR_PATH))
+        embedding_fn = _make_embedding_function()
+        collection = _open_store(backend, embedding_fn)
+    except Exception as e:
+        print(f"❌ Vector Store Init Error ({backend}): {e}")
+        collection = None
 
-        cfg = ConfigManager()
-        openai_key = cfg.get_key("openai")
 
-        if openai_key:
-            emb_fn = embedding_functions.OpenAIEmbeddingFunction(
-                api_key=openai_key, model_name="text-embedding-3-small"
-            )
-        else:
-            emb_fn = embedding_functions.DefaultEmbeddingFunction()
+def switch_vector_backend(target):
+    """Copies every memory into the `target` backend and makes it the active one."""
+    global collection
+    if target not in vector_store.BACKENDS:
+        return f"❌ Unknown backend '{target}'. Choose from: {', '.join(vector_store.BACKENDS)}."
 
-        collection = chroma_client.get_or_create_collection(
-            name="sentinel_memory", embedding_function=emb_fn
-        )
+    cfg = ConfigManager()
+    current = cfg.get("memory.vector_backend", "chroma")
+    if target == current:
+        return f"Vector backend is already '{current}'."
+
+    ensure_chroma()
+    if not collection:
+        return "❌ Vector DB unavailable."
+    try:
+        destination = _open_store(target, embedding_fn)
+        # Start from a clean target; it may hold a stale copy from an earlier switch
+        stale = destination.get(include=[])["ids"]
+        for i in range(0, len(stale), 500):
+            destination.delete(ids=stale[i:i + 500])
+        copied = vector_store.migrate(collection, destination)
     except Exception as e:
-        print(f"❌ ChromaDB Init Error: {e}")
-        chroma_client = None
+        return f"❌ Migration failed: {e}"
+
+    _close_store()
+    collection = destination
+    cfg.set("memory.vector_backend", target)
+    _invalidate_recall()
+    refresh_hot_tier()
+    return f"✅ Migrated {copied} memories from '{current}' to '{target}'."
+
+
+def _close_store():
+    global collection
+    if isinstance(collection, vector_store.NumpyVectorStore):
+        collection.close()
+    collection = None
 
 
 def ensure_chroma():
@@ -66,6 +175,24 @@ def store_fact(subject, predicate, obj, context="user_defined"):
     mem_id = str(uuid.uuid4())
     full_text = f"{fact_text}. Context: {context}"
 
+    exact = _get_sql_conn().execute('''
+        SELECT mem_id FROM facts
+        WHERE subject = ? COLLATE NOCASE AND predicate = ? COLLATE NOCASE AND object = ? COLLATE NOCASE
+    ''', (str(subject), str(predicate), str(obj))).fetchone()
+
+    # Re-stating a known fact reinforces it instead of adding a copy
+    fact = {"subject": subject, "predicate": predicate, "object": obj}
+    duplicate = exact['mem_id'] if exact else _find_duplicate(full_text, fact)
+    if duplicate:
+        with db.write(DB_PATH) as conn:
+            conn.execute('''
+                UPDATE metadata SET importance = MIN(COALESCE(importance, 5) + 1, 10),
+                                    last_accessed = CURRENT_TIMESTAMP
+                WHERE id = ?
+            ''', (duplicate,))
+        _invalidate_recall()
+        return f"🧠 Already Known: {fact_text}"
+
     collection.add(
         documents=[full_text],
         metadatas=[{"subject": subject, "type": "fact", "context": context}],
@@ -74,77 +201,303 @@ def store_fact(subject, predicate, obj, context="user_defined"):
 
     importance = 5
 
-    with _get_sql_conn() as conn:
+    with db.write(DB_PATH) as conn:
         conn.execute("INSERT INTO metadata (id, importance) VALUES (?, ?)", (mem_id, importance))
+        conn.execute(
+            "INSERT INTO facts (mem_id, subject, predicate, object, context) VALUES (?, ?, ?, ?, ?)",
+            (mem_id, str(subject), str(predicate), str(obj), context)
+        )
 
+    _invalidate_recall()
     return f"🧠 Memory Stored: {fact_text}"
 
 
-def delete_fact(subject=None, predicate=None):
+def _find_duplicate(text, fact=None):
     """
-    Deletes facts using efficient metadata filtering.
+    Id of an existing memory that says the same thing, or None. Vector distance
+    alone can't tell "User age 31" from "User age 32", so the nearest hit must
+    also pass the same key and wording checks compact_memory merges by.
+    """
+    try:
+        if collection.count() == 0:
+            return None
+        hit = collection.query(query_texts=[text], n_results=1)
+        if not (hit['ids'] and hit['ids'][0] and hit['distances'][0][0] <= DUPLICATE_DISTANCE):
+            return None
+        hit_id = hit['ids'][0][0]
+        stored = _get_sql_conn().execute(
+            "SELECT subject, predicate, object FROM facts WHERE mem_id = ?", (hit_id,)
+        ).fetchone()
+        group, wording = _merge_key(fact if stored else None, text)
+        hit_group, hit_wording = _merge_key(stored, hit['documents'][0][0])
+        if group == hit_group and _same_wording(wording, hit_wording):
+            return hit_id
+    except Exception:
+        pass
+    return None
+
+
+def delete_fact(subject=None, predicate=None, obj=None):
+    """
+    Deletes facts. Exact triples are matched in the fact store and removed by id;
+    a subject-only delete also clears older memories that predate the fact store.
     """
     ensure_chroma()
     if not collection: return "❌ Vector DB unavailable."
 
-    where_clause = {}
-    if subject:
-        where_clause["subject"] = subject
+    if not subject:
+        return "❌ Safety: Please provide at least a subject to delete."
 
+    _invalidate_recall()
     try:
-        if not where_clause:
-            return "❌ Safety: Please provide at least a subject to delete."
-
-        collection.delete(where=where_clause)
-        return f"🗑️ Deleted memories matching: {where_clause}"
+        matches = [row['mem_id'] for row in find_facts(subject, predicate, obj, limit=None)]
+
+        if matches:
+            for i in range(0, len(matches), 500):
+                collection.delete(ids=matches[i:i + 500])
+            hot_tier.discard(matches)
+            with db.write(DB_PATH) as conn:
+                conn.executemany("DELETE FROM facts WHERE mem_id = ?", [(m,) for m in matches])
+                conn.executemany("DELETE FROM metadata WHERE id = ?", [(m,) for m in matches])
+
+        if predicate or obj:
+            described = " ".join(str(part) for part in (subject, predicate, obj) if part)
+            if not matches:
+                return f"No stored fact matches '{described}'."
+            return f"🗑️ Deleted {len(matches)} fact(s) matching: {described}"
+
+        collection.delete(where={"subject": subject})
+        # Ids removed by the filter aren't known here; the next refresh repopulates
+        hot_tier.clear()
+        return f"🗑️ Deleted memories matching: {{'subject': '{subject}'}}"
 
     except Exception as e:
         return f"❌ Delete error: {e}"
 
 
-def retrieve_relevant_context(query, limit=5):
-    ensure_chroma()
-    if not collection: return ""
+def _fts_query(text):
+    terms = [t for t in re.findall(r"\w+", str(text).lower()) if len(t) > 1 and t not in _STOPWORDS]
+    return " OR ".join(f'"{t}"' for t in dict.fromkeys(terms))
+
+
+def find_facts(subject=None, predicate=None, obj=None, text=None, limit=5):
+    """
+    Exact-store lookup. subject/predicate match case-insensitively through the
+    index; obj and free text go through FTS over the triple. Returns rows with
+    mem_id, subject, predicate, object, plus lexical_score (bm25, lower is
+    better) when text was matched.
+    """
+    clauses, params = [], []
+    if subject:
+        clauses.append("f.subject = ? COLLATE NOCASE")
+        params.append(str(subject))
+    if predicate:
+        clauses.append("f.predicate = ? COLLATE NOCASE")
+        params.append(str(predicate))
+
+    match = _fts_query(obj) if obj else (_fts_query(text) if text else "")
+    if obj and not match:
+        return []
+    if not clauses and not match:
+        return []
+
+    sql = "SELECT f.mem_id, f.subject, f.predicate, f.object"
+    sql += ", bm25(facts_fts) AS lexical_score FROM facts f" if match else " FROM facts f"
+    if match:
+        sql += " JOIN facts_fts ON facts_fts.rowid = f.id"
+        clauses.append("facts_fts MATCH ?")
+        params.append(f"object : ({match})" if obj else match)
+    sql += " WHERE " + " AND ".join(clauses)
+    sql += " ORDER BY bm25(facts_fts)" if match else " ORDER BY f.id DESC"
+    if limit:
+        sql += f" LIMIT {int(limit)}"
 
     try:
-        results = collection.query(query_texts=[query], n_results=10)
+        return _get_sql_conn().execute(sql, params).fetchall()
     except Exception:
-        return ""
+        return []
 
-    if not results['ids'] or not results['ids'][0]:
-        return ""
 
-    found_ids = results['ids'][0]
-    found_texts = results['documents'][0]
-    found_distances = results['distances'][0]
+def _invalidate_recall():
+    with _recall_lock:
+        _recall_cache.clear()
 
-    placeholders = ','.join(['?'] * len(found_ids))
-    with _get_sql_conn() as conn:
-        rows = conn.execute(f"SELECT * FROM metadata WHERE id IN ({placeholders})", found_ids).fetchall()
-        conn.execute(f"UPDATE metadata SET last_accessed = CURRENT_TIMESTAMP WHERE id IN ({placeholders})", found_ids)
 
-    meta_map = {row['id']: dict(row) for row in rows}
-    scored_memories = []
+def _recall_key(query, limit, subject, predicate):
+    norm = lambda v: " ".join(str(v).lower().split()) if v else ""
+    return norm(query), limit, norm(subject), norm(predicate)
 
-    for i, mem_id in enumerate(found_ids):
-        text = found_texts[i]
-        relevance = 1.0 - (found_distances[i] if found_distances[i] < 1.0 else 1.0)
 
-        if relevance > 0.3:
-            scored_memories.append((relevance, text))
+def _note_access(mem_ids):
+    """Queues last_accessed / access_count bumps; the flusher writes them in one batch."""
+    stamp = datetime.datetime.now(datetime.timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+    with _access_lock:
+        for mem_id in mem_ids:
+            _, count = _pending_access.get(mem_id, (None, 0))
+            _pending_access[mem_id] = (stamp, count + 1)
+    _ensure_flusher()
 
-    scored_memories.sort(key=lambda x: x[0], reverse=True)
-    top_picks = scored_memories[:limit]
 
-    if not top_picks:
-        return "No relevant memories found."
+def flush_access():
+    if _log_stopped.is_set():
+        return 0
+    with _access_lock:
+        batch = list(_pending_access.items())
+        _pending_access.clear()
+    if not batch:
+        return 0
+    try:
+        with db.write(DB_PATH) as conn:
+            conn.executemany(
+                "UPDATE metadata SET last_accessed = ?, access_count = COALESCE(access_count, 0) + ? WHERE id = ?",
+                [(stamp, count, mem_id) for mem_id, (stamp, count) in batch]
+            )
+    except Exception:
+        with _access_lock:
+            for mem_id, (stamp, count) in batch:
+                _, pending = _pending_access.get(mem_id, (stamp, 0))
+                _pending_access[mem_id] = (stamp, pending + count)
+        return 0
+    return len(batch)
 
-    return "🧠 **Relevant Context:**\n" + "\n".join([f"- {x[1]}" for x in top_picks])
+
+def refresh_hot_tier(size=None):
+    """
+    Reloads the hot tier with the top memories by access count (recency breaks
+    ties). Promotion and demotion both fall out of re-ranking.
+    """
+    global _hot_loaded_at
+    ensure_chroma()
+    _hot_loaded_at = time.monotonic()
+    if not collection:
+        return
+    if size is None:
+        size = ConfigManager().get("memory.hot_tier_size", HOT_TIER_SIZE)
+
+    ids = [row['id'] for row in _get_sql_conn().execute('''
+        SELECT id FROM metadata WHERE access_count > 0
+        ORDER BY access_count DESC, last_accessed DESC LIMIT ?
+    ''', (int(size),))]
+    if not ids:
+        hot_tier.clear()
+        return
+    try:
+        data = collection.get(ids=ids, include=["embeddings", "documents"])
+    except Exception:
+        return
+    hot_tier.load(data['ids'], data['documents'], data['embeddings'])
+
+
+def retrieve_relevant_context(query, limit=5, subject=None, predicate=None):
+    """
+    Recall for a query. Served from a short-lived LRU when the same question was
+    just asked; otherwise the exact fact store is consulted first: a subject +
+    predicate hit answers on its own; lexical hits are merged with (and boost)
+    the vector search results.
+    """
+    key = _recall_key(query, limit, subject, predicate)
+    with _recall_lock:
+        entry = _recall_cache.get(key)
+        if entry and time.monotonic() - entry[0] < RECALL_CACHE_TTL:
+            _recall_cache.move_to_end(key)
+        else:
+            entry = None
+    if entry:
+        _note_access(entry[2])
+        return entry[1]
+
+    text, mem_ids = _recall(query, limit, subject, predicate)
+    if mem_ids is not None:
+        with _recall_lock:
+            _recall_cache[key] = (time.monotonic(), text, mem_ids)
+            while len(_recall_cache) > RECALL_CACHE_SIZE:
+                _recall_cache.popitem(last=False)
+        _note_access(mem_ids)
+    return text
+
+
+def _recall(query, limit, subject, predicate):
+    """Returns (context text, ids used) or (text, None) when the result shouldn't be cached."""
+    picks = {}  # mem_id -> (relevance, text)
+
+    if subject and predicate:
+        structured = find_facts(subject, predicate, limit=limit)
+        if structured:
+            for row in structured:
+                picks[row['mem_id']] = (1.0, f"{row['subject']} {row['predicate']} {row['object']}")
+            return _format_context(picks, limit)
+
+    # Lexical hits score up to 0.6 in proportion to bm25 against the best one,
+    # so a hit that barely matches doesn't sit just under a strong one
+    lexical = find_facts(text=query, limit=limit)
+    best = lexical[0]['lexical_score'] if lexical else 0
+    for row in lexical:
+        relevance = 0.6 * row['lexical_score'] / best if best < 0 else 0.6
+        picks[row['mem_id']] = (relevance, f"{row['subject']} {row['predicate']} {row['object']}")
+
+    ensure_chroma()
+    if collection:
+        if not _hot_loaded_at:
+            refresh_hot_tier()
+
+        query_vector = None
+        if embedding_fn is not None and len(hot_tier):
+            try:
+                query_vector = embedding_fn.embed_query([query])[0]
+            except Exception:
+                query_vector = None
+
+        if query_vector is not None:
+            hot = hot_tier.search(query_vector, k=limit)
+            confident = bool(hot) and hot[0][2] >= HOT_CONFIDENT_COSINE
+            hot_tier.record(confident)
+            if confident:
+                for mem_id, text, cosine in hot:
+                    # Same scale as Chroma's squared-L2 relevance below: 1 - (2 - 2cos)
+                    relevance = 2 * cosine - 1
+                    if mem_id in picks:
+                        picks[mem_id] = (max(picks[mem_id][0], relevance) + 0.25, picks[mem_id][1])
+                    elif relevance > 0.3:
+                        picks[mem_id] = (relevance, text)
+                return _format_context(picks, limit)
+
+        try:
+            if query_vector is not None:
+                results = collection.query(query_embeddings=[query_vector], n_results=10)
+            else:
+                results = collection.query(query_texts=[query], n_results=10)
+        except Exception:
+            return _format_context(picks, limit)[0], None
+
+        if results['ids'] and results['ids'][0]:
+            found_ids = results['ids'][0]
+            found_texts = results['documents'][0]
+            found_distances = results['distances'][0]
+
+            for i, mem_id in enumerate(found_ids):
+                relevance = 1.0 - (found_distances[i] if found_distances[i] < 1.0 else 1.0)
+                if mem_id in picks:
+                    # Found both lexically and semantically
+                    picks[mem_id] = (max(picks[mem_id][0], relevance) + 0.25, picks[mem_id][1])
+                elif relevance > 0.3:
+                    picks[mem_id] = (relevance, found_texts[i])
+    elif not picks:
+        return "", None
+
+    return _format_context(picks, limit)
+
+
+def _format_context(picks, limit):
+    top = sorted(picks.items(), key=lambda kv: kv[1][0], reverse=True)[:limit]
+    if not top:
+        return "No relevant memories found.", []
+    text = "🧠 **Relevant Context:**\n" + "\n".join([f"- {text}" for _, (_, text) in top])
+    return text, [mem_id for mem_id, _ in top]
 
 
 def init_memory():
     """Creates the SQLite tables if missing."""
-    with _get_sql_conn() as conn:
+    with db.write(DB_PATH) as conn:
         conn.execute('''
             CREATE TABLE IF NOT EXISTS metadata (
                 id TEXT PRIMARY KEY, 
@@ -153,55 +506,412 @@ def init_memory():
                 last_accessed DATETIME DEFAULT CURRENT_TIMESTAMP
             )
         ''')
+        metadata_columns = {row['name'] for row in conn.execute("PRAGMA table_info(metadata)")}
+        if "score" not in metadata_columns:
+            # Decayed value, recomputed by compact_memory()
+            conn.execute("ALTER TABLE metadata ADD COLUMN score REAL")
+        if "access_count" not in metadata_columns:
+            # Drives hot-tier promotion
+            conn.execute("ALTER TABLE metadata ADD COLUMN access_count INTEGER DEFAULT 0")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_metadata_access ON metadata(access_count DESC, last_accessed DESC)")
+
+        # Exact-match fact store: the structured triples behind each vector memory
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS facts (
+                id INTEGER PRIMARY KEY,
+                mem_id TEXT UNIQUE,
+                subject TEXT, predicate TEXT, object TEXT, context TEXT,
+                created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_facts_sp ON facts(subject COLLATE NOCASE, predicate COLLATE NOCASE)")
+        conn.execute('''
+            CREATE VIRTUAL TABLE IF NOT EXISTS facts_fts USING fts5(
+                subject, predicate, object, content='facts', content_rowid='id'
+            )
+        ''')
+        conn.execute('''
+            CREATE TRIGGER IF NOT EXISTS facts_ai AFTER INSERT ON facts BEGIN
+                INSERT INTO facts_fts(rowid, subject, predicate, object)
+                VALUES (new.id, new.subject, new.predicate, new.object);
+            END
+        ''')
+        conn.execute('''
+            CREATE TRIGGER IF NOT EXISTS facts_ad AFTER DELETE ON facts BEGIN
+                INSERT INTO facts_fts(facts_fts, rowid, subject, predicate, object)
+                VALUES ('delete', old.id, old.subject, old.predicate, old.object);
+            END
+        ''')
+
         conn.execute('''
             CREATE TABLE IF NOT EXISTS logs (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
-                action TEXT, details TEXT, timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+                action TEXT, details TEXT, timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+                day TEXT
             )
         ''')
 
+        # Older databases: add the local-date partition key and backfill it
+        columns = {row['name'] for row in conn.execute("PRAGMA table_info(logs)")}
+        if "day" not in columns:
+            conn.execute("ALTER TABLE logs ADD COLUMN day TEXT")
+            conn.execute("UPDATE logs SET day = date(timestamp, 'localtime')")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_logs_day ON logs(day, id)")
+
+        # Per-day rollups, updated with every flush so briefings never scan raw logs
+        has_rollups = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'log_days'"
+        ).fetchone()
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS log_days (
+                day TEXT PRIMARY KEY, total INTEGER, first_at TEXT, last_at TEXT
+            )
+        ''')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS log_rollups (
+                day TEXT, kind TEXT, key TEXT, count INTEGER,
+                PRIMARY KEY (day, kind, key)
+            )
+        ''')
+        if not has_rollups:
+            rows = conn.execute("SELECT action, details, timestamp, day FROM logs").fetchall()
+            _update_rollups(conn, [tuple(r) for r in rows])
 
-init_memory()
+
+def _ensure_flusher():
+    global _log_flusher
+    with _log_lock:
+        if _log_stopped.is_set():
+            return
+        if _log_flusher is None or not _log_flusher.is_alive():
+            _log_flusher = threading.Thread(target=_log_flush_loop, daemon=True, name="sentinel-activity-log")
+            _log_flusher.start()
 
 
 def log_activity(action, details):
+    """Queues an activity record. Never touches the disk on the caller's thread."""
+    # Same format as CURRENT_TIMESTAMP, taken now rather than at flush time
+    stamp = datetime.datetime.now(datetime.timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+    day = datetime.datetime.now().strftime("%Y-%m-%d")
+
+    with _log_lock:
+        _log_buffer.append((action, str(details), stamp, day))
+        full = len(_log_buffer) >= LOG_FLUSH_SIZE
+    _ensure_flusher()
+    if full:
+        _log_wakeup.set()
+
+
+def _log_flush_loop():
+    global _last_prune_day
+    while not _log_stopped.is_set():
+        _log_wakeup.wait(LOG_FLUSH_SECONDS)
+        _log_wakeup.clear()
+        if _log_stopped.is_set():
+            return
+        flush_activity()
+        if flush_access() and time.monotonic() - _hot_loaded_at > HOT_REFRESH_SECONDS:
+            refresh_hot_tier()
+
+        today = datetime.date.today()
+        if _last_prune_day != today:
+            _last_prune_day = today
+            prune_logs()
+
+
+def _update_rollups(conn, records):
+    """Folds (action, details, timestamp, day) records into log_days / log_rollups."""
+    days, counts = {}, Counter()
+    for action, details, stamp, day in records:
+        total, first, last = days.get(day, (0, stamp, stamp))
+        days[day] = (total + 1, min(first, stamp), max(last, stamp))
+        counts[(day, "action", action)] += 1
+        if action == "focus_change":
+            match = _APP_PATTERN.search(details or "")
+            if match:
+                counts[(day, "app", match.group(1))] += 1
+
+    conn.executemany('''
+        INSERT INTO log_days (day, total, first_at, last_at) VALUES (?, ?, ?, ?)
+        ON CONFLICT(day) DO UPDATE SET
+            total = total + excluded.total,
+            first_at = min(first_at, excluded.first_at),
+            last_at = max(last_at, excluded.last_at)
+    ''', [(day, *v) for day, v in days.items()])
+    conn.executemany('''
+        INSERT INTO log_rollups (day, kind, key, count) VALUES (?, ?, ?, ?)
+        ON CONFLICT(day, kind, key) DO UPDATE SET count = count + excluded.count
+    ''', [(*k, n) for k, n in counts.items()])
+
+
+def prune_logs(retention_days=None):
+    """Drops raw log rows past the retention window. Rollups survive."""
+    if retention_days is None:
+        retention_days = ConfigManager().get("memory.log_retention_days", LOG_RETENTION_DAYS)
+    if not retention_days:
+        return 0
+    cutoff = (datetime.date.today() - datetime.timedelta(days=int(retention_days))).isoformat()
     try:
-        with _get_sql_conn() as conn:
-            conn.execute("INSERT INTO logs (action, details) VALUES (?, ?)", (action, details))
-    except:
-        pass
+        with db.write(DB_PATH) as conn:
+            return conn.execute("DELETE FROM logs WHERE day < ?", (cutoff,)).rowcount
+    except Exception:
+        return 0
+
+
+def _stop_flusher(timeout=5.0):
+    """Stops the activity/access flusher and waits for it, so brain.db isn't recreated behind a wipe."""
+    with _log_lock:
+        _log_stopped.set()
+        flusher = _log_flusher
+    _log_wakeup.set()
+    if flusher is not None and flusher is not threading.current_thread():
+        flusher.join(timeout)
+
+
+def flush_activity():
+    """Writes all queued activity records in a single transaction."""
+    if _log_stopped.is_set():
+        return 0
+    with _log_lock:
+        batch = _log_buffer[:]
+        _log_buffer.clear()
+    if not batch:
+        return 0
+    try:
+        with db.write(DB_PATH) as conn:
+            conn.executemany("INSERT INTO logs (action, details, timestamp, day) VALUES (?, ?, ?, ?)", batch)
+            _update_rollups(conn, batch)
+    except Exception:
+        # Put them back for the next attempt rather than losing the day's log
+        with _log_lock:
+            _log_buffer[:0] = batch
+        return 0
+    return len(batch)
+
+
+init_memory()
+atexit.register(flush_activity)
+atexit.register(flush_access)
+
+
+def summarize_day(date_str=None, recent=5):
+    """
+    Constant-size digest of a day from the rollups: totals, first/last activity,
+    counts by action, top apps, and the last few entries.
+    """
+    if not date_str:
+        date_str = datetime.datetime.now().strftime("%Y-%m-%d")
+
+    flush_activity()
+    conn = _get_sql_conn()
+    day = conn.execute('''
+        SELECT total, time(first_at, 'localtime') AS first_t, time(last_at, 'localtime') AS last_t
+        FROM log_days WHERE day = ?
+    ''', (date_str,)).fetchone()
+    if not day:
+        return f"No activity recorded for {date_str}."
+
+    rollups = conn.execute(
+        "SELECT kind, key, count FROM log_rollups WHERE day = ? ORDER BY count DESC", (date_str,)
+    ).fetchall()
+    actions = [f"{r['key']} x{r['count']}" for r in rollups if r['kind'] == "action"][:10]
+    apps = [f"{r['key']} x{r['count']}" for r in rollups if r['kind'] == "app"][:5]
+
+    summary = f"📅 **Activity Summary for {date_str}:** {day['total']} events, {day['first_t']} - {day['last_t']}\n"
+    summary += f"Actions: {', '.join(actions)}\n"
+    if apps:
+        summary += f"Top apps: {', '.join(apps)}\n"
+
+    last = conn.execute('''
+        SELECT time(timestamp, 'localtime') AS t, action, details
+        FROM logs WHERE day = ? ORDER BY id DESC LIMIT ?
+    ''', (date_str, recent)).fetchall()
+    if last:
+        summary += "Last activity:\n" + "".join(
+            f"[{r['t']}] {r['action']}: {str(r['details'])[:200]}\n" for r in reversed(last)
+        )
+    return summary
 
 
-def reflect_on_day(date_str=None):
+def reflect_on_day(date_str=None, page=1, page_size=50):
     """
-    Retrieves activity logs for a specific day.
+    Retrieves activity logs for a specific day: the rollup summary plus one
+    page of raw entries.
     Required by registry.py and cognitive.py for Daily Briefings.
     """
     if not date_str:
         date_str = datetime.datetime.now().strftime("%Y-%m-%d")
+    page, page_size = max(int(page or 1), 1), max(int(page_size or 50), 1)
 
     try:
-        with _get_sql_conn() as conn:
-            c = conn.execute('''
-                SELECT time(timestamp) as t, action, details 
-                FROM logs 
-                WHERE date(timestamp) = ? 
-                ORDER BY timestamp ASC
-            ''', (date_str,))
-            logs = c.fetchall()
-
+        summary = summarize_day(date_str, recent=0)
+        if summary.startswith("No activity"):
+            return summary
+
+        logs = _get_sql_conn().execute('''
+            SELECT time(timestamp, 'localtime') AS t, action, details
+            FROM logs
+            WHERE day = ?
+            ORDER BY id ASC
+            LIMIT ? OFFSET ?
+        ''', (date_str, page_size, (page - 1) * page_size)).fetchall()
+
+        total = _get_sql_conn().execute("SELECT COUNT(*) FROM logs WHERE day = ?", (date_str,)).fetchone()[0]
         if not logs:
-            return f"No activity recorded for {date_str}."
+            return summary + (f"(No raw entries on page {page}.)" if total else "(Raw entries expired; summary only.)")
 
-        summary = f"📅 **Activity Log for {date_str}:**\n"
+        summary += "\n"
         for log in logs:
             summary += f"[{log['t']}] {log['action']}: {log['details']}\n"
 
+        shown = (page - 1) * page_size + len(logs)
+        if shown < total:
+            summary += f"... {total - shown} more entries. Call reflect_on_day(\"{date_str}\", page={page + 1}).\n"
         return summary
 
     except Exception as e:
         return f"❌ Error reflecting on day: {e}"
 
+def _decayed_score(importance, last_accessed, now):
+    try:
+        seen = datetime.datetime.strptime(str(last_accessed)[:19], "%Y-%m-%d %H:%M:%S")
+        age_days = max((now - seen).total_seconds() / 86400, 0.0)
+    except (TypeError, ValueError):
+        age_days = 0.0
+    return (importance or 5) * 0.5 ** (age_days / DECAY_HALF_LIFE_DAYS)
+
+
+def _merge_key(fact, document):
+    """
+    What two memories must share to be merged, and the text that must nearly match.
+    Facts merge only within the same subject and predicate, comparing objects, so
+    "user lives in Boston" never absorbs "user lives in Austin".
+    """
+    if fact:
+        return (str(fact['subject']).lower(), str(fact['predicate']).lower()), _normalize_text(fact['object'])
+    return None, _normalize_text(document)
+
+
+def _normalize_text(text):
+    return " ".join(re.findall(r"\w+", str(text or "").lower()))
+
+
+def _same_wording(a, b):
+    return a == b or difflib.SequenceMatcher(None, a, b).ratio() >= NEAR_IDENTICAL_TEXT
+
+
+def compact_memory(max_facts: int = None):
+    """
+    Background maintenance for long-term memory:
+      1. merges near-duplicate facts (cosine >= MERGE_SIMILARITY with the same
+         subject and predicate and near-identical wording), keeping the most
+         important copy and folding the others' weight into it,
+      2. recomputes each memory's decayed score from importance and last access,
+      3. evicts the lowest-scoring memories beyond `memory.max_facts`.
+    """
+    import numpy as np
+    from sentinel.core import executor, jobs
+
+    ensure_chroma()
+    if not collection:
+        return "❌ Vector DB unavailable."
+    if not _compact_lock.acquire(blocking=False):
+        return "Compaction already running."
+
+    try:
+        if max_facts is None:
+            max_facts = ConfigManager().get("memory.max_facts", MAX_FACTS)
+        try:
+            max_facts = int(max_facts)
+        except (TypeError, ValueError):
+            return f"❌ max_facts must be a whole number, got {max_facts!r}."
+
+        flush_access()
+        # Rows created from here on belong to memories this run never saw
+        started = _get_sql_conn().execute("SELECT CURRENT_TIMESTAMP").fetchone()[0]
+        data = collection.get(include=["embeddings", "documents"])
+        ids = list(data['ids'])
+        if not ids:
+            return "Memory is empty; nothing to compact."
+
+        conn = _get_sql_conn()
+        meta = {row['id']: dict(row) for row in conn.execute(
+            "SELECT id, importance, created_at, last_accessed FROM metadata"
+        )}
+        facts = {row['mem_id']: row for row in conn.execute("SELECT mem_id, subject, predicate, object FROM facts")}
+        keys = [_merge_key(facts.get(mem_id), doc) for mem_id, doc in zip(ids, data['documents'])]
+        now = datetime.datetime.utcnow()
+        importance = [meta.get(i, {}).get('importance') or 5 for i in ids]
+        last_seen = [meta.get(i, {}).get('last_accessed') or meta.get(i, {}).get('created_at') for i in ids]
+
+        # 1. Greedy clustering: most important (then most recently used) copy wins.
+        #    One row of similarities at a time, so memory stays O(n) not O(n^2).
+        vectors = np.asarray(data['embeddings'], dtype="float32")
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True) + 1e-12
+        order = sorted(range(len(ids)), key=lambda i: (importance[i], str(last_seen[i] or "")), reverse=True)
+        absorbed, boosts = set(), Counter()
+        for n, i in enumerate(order):
+            if executor.is_cancelled():
+                return "Compaction cancelled; no changes made."
+            if n % 500 == 0:
+                jobs.report_progress(0.8 * n / len(order), "Merging duplicates")
+            if i in absorbed:
+                continue
+            sims = vectors @ vectors[i]
+            for j in np.nonzero(sims >= MERGE_SIMILARITY)[0]:
+                j = int(j)
+                if j == i or j in absorbed or keys[j][0] != keys[i][0]:
+                    continue
+                if _same_wording(keys[i][1], keys[j][1]):
+                    absorbed.add(j)
+                    boosts[i] += 1
+
+        # 2. Decay
+        scores = {}
+        for i, mem_id in enumerate(ids):
+            if i in absorbed:
+                continue
+            boosted = min(importance[i] + boosts[i], 10)
+            importance[i] = boosted
+            scores[mem_id] = _decayed_score(boosted, last_seen[i], now)
+
+        # 3. Evict beyond the cap
+        survivors = sorted(scores, key=scores.get, reverse=True)
+        evicted = survivors[max_facts:] if max_facts else []
+        removed = [ids[i] for i in absorbed] + evicted
+
+        jobs.report_progress(0.9, f"Removing {len(removed)} memories")
+        for k in range(0, len(removed), 500):
+            collection.delete(ids=removed[k:k + 500])
+        hot_tier.discard(removed)
+        _invalidate_recall()
+
+        index = {mem_id: i for i, mem_id in enumerate(ids)}
+        with db.write(DB_PATH) as conn:
+            conn.executemany("DELETE FROM metadata WHERE id = ?", [(m,) for m in removed])
+            conn.executemany("DELETE FROM facts WHERE mem_id = ?", [(m,) for m in removed])
+            conn.executemany(
+                "UPDATE metadata SET importance = ?, score = ? WHERE id = ?",
+                [(importance[index[m]], scores[m], m) for m in survivors[:max_facts or None]]
+            )
+            # Metadata rows whose vectors are gone (e.g. deleted via delete_fact). Only rows
+            # older than the snapshot: memories stored meanwhile aren't in `ids` yet.
+            conn.execute("CREATE TEMP TABLE IF NOT EXISTS _live_ids (id TEXT PRIMARY KEY)")
+            conn.execute("DELETE FROM _live_ids")
+            conn.executemany("INSERT OR IGNORE INTO _live_ids VALUES (?)", [(m,) for m in ids])
+            orphans = conn.execute(
+                "DELETE FROM metadata WHERE COALESCE(created_at, '') < ? AND id NOT IN (SELECT id FROM _live_ids)", (started,)
+            ).rowcount
+            conn.execute(
+                "DELETE FROM facts WHERE COALESCE(created_at, '') < ? AND mem_id NOT IN (SELECT id FROM _live_ids)", (started,)
+            )
+
+        return (f"🧹 Memory compacted: merged {len(absorbed)} duplicates, evicted {len(evicted)}, "
+                f"removed {orphans} orphaned records. {len(ids) - len(removed)} memories remain.")
+    finally:
+        _compact_lock.release()
+
+
 def archive_interaction(user_text, ai_text):
     """
     Extracts facts from conversation and saves them.
@@ -237,8 +947,13 @@ def archive_interaction(user_text, ai_text):
 def teardown():
     """
     Releases database locks (ChromaDB & SQLite) to allow safe deletion.
+    Pending records are written first; after this nothing writes brain.db again.
     """
-    global chroma_client, collection
-    chroma_client = None
-    collection = None
+    flush_activity()
+    flush_access()
+    _stop_flusher()
+    _invalidate_recall()
+    hot_tier.clear()
+    _close_store()
+    db.close_all(DB_PATH)
     gc.collect()
\ No newline at end of file
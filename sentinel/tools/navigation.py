@@ -45,7 +45,7 @@ def geocode(address):
         return f"❌ Geocode error: {e}"
 
 
-def reverse_geocode(lat, lon):
+def reverse_geocode(lat: float, lon: float):
     """Converts coordinates to a readable address."""
     gmaps = get_gmaps()
     if not gmaps: return "❌ Error: API key missing."
@@ -109,7 +109,7 @@ def get_directions(origin, destination, mode="driving"):
         return f"❌ Directions error: {e}"
 
 
-def find_nearby(lat, lon, place_type="restaurant", radius=1000):
+def find_nearby(lat: float, lon: float, place_type="restaurant", radius=1000):
     """
     Finds places of a specific type near coordinates.
     Renamed 'type' -> 'place_type' to avoid shadowing Python's built-in.
@@ -33,7 +33,7 @@ def create_word(filename, content):
         return f"❌ Error creating Word doc: {e}"
 
 
-def create_excel(filename, data_list):
+def create_excel(filename, data_list: list[dict]):
     """
     Creates a new Excel file. Fails if file already exists.
     data_list example: [{"Name": "Alice", "Age": 30}]
@@ -51,7 +51,7 @@ def create_excel(filename, data_list):
         return f"❌ Error creating Excel: {e}"
 
 
-def append_excel(filename, data_list):
+def append_excel(filename, data_list: list[dict]):
     """Appends data to an existing Excel file."""
     path = _get_safe_path(filename, ".xlsx")
 
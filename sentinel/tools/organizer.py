@@ -3,6 +3,7 @@ import shutil
 import datetime
 from pathlib import Path
 from typing import List, Dict
+from sentinel.core import executor, jobs
 
 
 def get_downloads_folder() -> str:
@@ -78,7 +79,11 @@ def organize_files(directory: str, strategy: str = "extension") -> str:
         # List all files (skip directories and hidden files)
         files = [f for f in target_dir.iterdir() if f.is_file() and not f.name.startswith('.')]
 
-        for file_path in files:
+        for i, file_path in enumerate(files):
+            if executor.is_cancelled():
+                actions_taken.append("(cancelled before finishing)")
+                break
+            jobs.report_progress(i / len(files), f"{i}/{len(files)} files")
             folder_name = "Misc"
 
             if strategy == "extension":
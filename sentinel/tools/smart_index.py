@@ -1,25 +1,22 @@
 # FILE: tools/smart_index.py
-import sqlite3
 import os
 import time
 import threading
 import queue
 import numpy as np
-from sentence_transformers import SentenceTransformer
 from pathlib import Path
+from sentinel.core import db, embeddings
 
 BASE_DIR = Path.home() / ".sentinel-1"
 BASE_DIR.mkdir(exist_ok=True)
 
 DB = BASE_DIR / "smart_files.db"
 
-_MODEL = None
-_MODEL_LOCK = threading.Lock()
-
 # ─── Background embedding queue ───────────────────────────────────────────────
 # Files land here after metadata indexing; embeddings are computed asynchronously.
 _EMBED_QUEUE: queue.Queue = queue.Queue()
 _EMBED_WORKER_STARTED = False
+_EMBED_BATCH = 32
 
 # Extensions that can yield useful text snippets for richer embeddings
 _TEXT_EXTENSIONS = {'.txt', '.md', '.py', '.json', '.csv', '.html', '.js', '.ts', '.yaml', '.yml', '.toml'}
@@ -30,35 +27,23 @@ _CONTENT_SNIPPET_CHARS = 512
 
 
 def get_model():
-    """Lazy-loads the Transformer model once, thread-safe."""
-    global _MODEL
-    if _MODEL is None:
-        with _MODEL_LOCK:
-            if _MODEL is None:  # double-checked locking
-                print("\n[System] 🧠 Loading Neural Indexing Model (all-MiniLM-L6-v2)...")
-                try:
-                    _MODEL = SentenceTransformer("all-MiniLM-L6-v2")
-                    print("[System] ✅ Neural Model Loaded.\n")
-                except Exception as e:
-                    print(f"[System] ❌ Failed to load embedding model: {e}")
-    return _MODEL
+    """Shared embedding model (see sentinel.core.embeddings)."""
+    return embeddings.get_model()
 
 
 def init():
-    conn = sqlite3.connect(DB)
-    conn.execute("""
-    CREATE TABLE IF NOT EXISTS files(
-        path        TEXT PRIMARY KEY,
-        name        TEXT,
-        ext         TEXT,
-        snippet     TEXT,
-        embedding   BLOB,
-        last_opened REAL,
-        last_modified REAL
-    )
-    """)
-    conn.commit()
-    conn.close()
+    with db.write(DB) as conn:
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS files(
+            path        TEXT PRIMARY KEY,
+            name        TEXT,
+            ext         TEXT,
+            snippet     TEXT,
+            embedding   BLOB,
+            last_opened REAL,
+            last_modified REAL
+        )
+        """)
 
 
 init()
@@ -103,10 +88,8 @@ def _extract_snippet(path: str, ext: str) -> str:
 
 def embed(text: str):
     """Encodes text to a float32 byte blob. Returns None if model unavailable."""
-    model = get_model()
-    if model is None:
-        return None
-    return model.encode(text).astype("float32").tobytes()
+    vec = embeddings.encode_one(text)
+    return None if vec is None else vec.tobytes()
 
 
 def _build_embed_text(name: str, snippet: str) -> str:
@@ -123,21 +106,19 @@ def _build_embed_text(name: str, snippet: str) -> str:
 # ─── Database write ───────────────────────────────────────────────────────────
 
 def _write_to_db(path, name, ext, snippet, emb):
-    conn = sqlite3.connect(DB)
-    conn.execute("""
-        INSERT OR REPLACE INTO files
-        VALUES (?, ?, ?, ?, ?, ?, ?)
-    """, (
-        path,
-        name,
-        ext,
-        snippet,
-        emb,
-        time.time(),
-        os.path.getmtime(path) if os.path.exists(path) else time.time()
-    ))
-    conn.commit()
-    conn.close()
+    with db.write(DB) as conn:
+        conn.execute("""
+            INSERT OR REPLACE INTO files
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, (
+            path,
+            name,
+            ext,
+            snippet,
+            emb,
+            time.time(),
+            os.path.getmtime(path) if os.path.exists(path) else time.time()
+        ))
 
 
 # ─── Background worker ────────────────────────────────────────────────────────
@@ -145,35 +126,39 @@ def _write_to_db(path, name, ext, snippet, emb):
 def _embedding_worker():
     """
     Drains _EMBED_QUEUE in a daemon thread.
-    Each item is a (path,) tuple placed there by index_file().
+    Paths placed there by index_file() are taken in batches of up to
+    _EMBED_BATCH and encoded in one forward pass.
     """
     while True:
         try:
-            path = _EMBED_QUEUE.get(timeout=5)
-            if not os.path.exists(path):
-                _EMBED_QUEUE.task_done()
-                continue
-
-            name = os.path.basename(path)
-            ext  = os.path.splitext(path)[1].lower()
-            snippet = _extract_snippet(path, ext)
-            embed_text = _build_embed_text(name, snippet)
-
-            emb = embed(embed_text)
-            if emb is None:
-                _EMBED_QUEUE.task_done()
-                continue
-
-            _write_to_db(path, name, ext, snippet, emb)
-            _EMBED_QUEUE.task_done()
-
+            paths = [_EMBED_QUEUE.get(timeout=5)]
         except queue.Empty:
             continue
-        except Exception:
+        while len(paths) < _EMBED_BATCH:
             try:
+                paths.append(_EMBED_QUEUE.get_nowait())
+            except queue.Empty:
+                break
+
+        try:
+            items = []
+            for path in dict.fromkeys(paths):
+                if not os.path.exists(path):
+                    continue
+                name = os.path.basename(path)
+                ext  = os.path.splitext(path)[1].lower()
+                snippet = _extract_snippet(path, ext)
+                items.append((path, name, ext, snippet, _build_embed_text(name, snippet)))
+
+            if items:
+                vectors = embeddings.encode([item[4] for item in items])
+                for (path, name, ext, snippet, _), vec in zip(items, vectors):
+                    _write_to_db(path, name, ext, snippet, vec.tobytes())
+        except Exception:
+            pass
+        finally:
+            for _ in paths:
                 _EMBED_QUEUE.task_done()
-            except Exception:
-                pass
 
 
 def _ensure_worker():
@@ -222,17 +207,13 @@ def smart_find(query: str, limit: int = 5) -> list:
     Semantic search for files.
     Blends cosine similarity (content-aware) + recency.
     """
-    model = get_model()
-    if model is None:
+    q_emb = embeddings.encode_one(query)
+    if q_emb is None:
         return ["Error: AI Model unavailable."]
 
-    q_emb = model.encode(query)
-
-    conn = sqlite3.connect(DB)
-    rows = conn.execute(
+    rows = db.connect(DB).execute(
         "SELECT path, embedding, last_opened FROM files"
     ).fetchall()
-    conn.close()
 
     scored = []
     for path, emb_blob, last in rows:
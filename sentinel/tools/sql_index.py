@@ -1,10 +1,15 @@
 # FILE: tools/sql_index.py
-import sqlite3
 import os
 import datetime
+import functools
 import platform
+import queue
+import sqlite3
 import threading
+import time
 from pathlib import Path
+from sentinel.core import db, executor, jobs
+from sentinel.tools import fs_scan, fuzzy_names
 
 BASE_DIR = Path.home() / ".sentinel-1"
 BASE_DIR.mkdir(exist_ok=True)
@@ -26,12 +31,48 @@ SKIP_DIRS = {
 _watcher_thread = None
 _watcher_active = False
 
+# Watcher events go through one writer thread that coalesces them per path
+# and applies them in batched transactions.
+WATCH_DEBOUNCE_SECONDS = 1.0   # quiet time before a path's latest event is applied
+WATCH_MAX_BATCH = 50000        # ...or apply at once when this many paths are waiting
+WATCH_MAX_DELAY_SECONDS = 10.0 # upper bound for files that never go quiet
+
+# Rescans skip unchanged folders; this often, every file is re-checked anyway
+FULL_RESCAN_HOURS = 24
+# Scan results are committed (and checkpointed) every this many changed rows
+SCAN_BATCH = 5000
+
+# find_file ranks at most this many substring matches (the most recently indexed)
+SEARCH_CANDIDATES = 500
+FUZZY_CANDIDATES = 500
+
+# query_files: a folder holding at least this many files is scanned in sort order
+BROAD_FOLDER_ROWS = 5000
+_events: queue.Queue = queue.Queue()
+_writer_thread = None
+_writer_lock = threading.Lock()
+_watch_stats = {"received": 0, "applied": 0, "batches": 0, "last_lag": 0.0, "max_lag": 0.0,
+                "pending": 0, "failed": 0, "started": None}
+
+# UPSERT rather than INSERT OR REPLACE: it keeps the rowid and fires UPDATE
+# triggers, so the name index below stays in sync.
+_UPSERT_FILE = '''
+    INSERT INTO files (path, name, extension, size_mb, modified_date, mtime_raw, dir)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(path) DO UPDATE SET
+        name = excluded.name, extension = excluded.extension, size_mb = excluded.size_mb,
+        modified_date = excluded.modified_date, mtime_raw = excluded.mtime_raw, dir = excluded.dir
+'''
+
+_schema_ready = False
+# FTS5's trigram tokenizer needs SQLite 3.34+; without it name matching falls back to LIKE
+_trigram = None
+
 # ─── Helpers ──────────────────────────────────────────────────────────────────
 
 def _get_conn():
-    conn = sqlite3.connect(DB_FILE)
-    conn.row_factory = sqlite3.Row
-    return conn
+    """This thread's pooled connection (reads). Writes go through db.write(DB_FILE)."""
+    return db.connect(DB_FILE)
 
 
 def get_all_drives():
@@ -69,40 +110,127 @@ def _get_scan_targets():
     return list(set(targets))
 
 
-def _upsert_file(fullpath: str):
-    """Insert or update a single file record. Safe to call from any thread."""
-    if not os.path.exists(fullpath):
-        return
+def _file_row(fullpath: str):
+    """(path, name, ext, size_mb, modified_date, mtime_raw, dir), or None if the file is gone or skipped."""
     fname = os.path.basename(fullpath)
     if fname.startswith("~$") or fname.startswith("."):
-        return
+        return None
     try:
         stats = os.stat(fullpath)
-        size_mb = round(stats.st_size / (1024 * 1024), 2)
-        current_mtime = stats.st_mtime
-        mtime_str = datetime.datetime.fromtimestamp(current_mtime).strftime('%Y-%m-%d %H:%M:%S')
-        ext = os.path.splitext(fname)[1].lower()
-
-        conn = _get_conn()
-        conn.execute('''
-            INSERT OR REPLACE INTO files (path, name, extension, size_mb, modified_date, mtime_raw)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (fullpath, fname, ext, size_mb, mtime_str, current_mtime))
-        conn.commit()
-        conn.close()
     except (OSError, PermissionError):
-        pass
+        return None
+    size_mb = round(stats.st_size / (1024 * 1024), 2)
+    mtime_str = datetime.datetime.fromtimestamp(stats.st_mtime).strftime('%Y-%m-%d %H:%M:%S')
+    ext = os.path.splitext(fname)[1].lower()
+    return (fullpath, fname, ext, size_mb, mtime_str, stats.st_mtime, os.path.dirname(fullpath))
+
+
+# ─── Coalescing writer ────────────────────────────────────────────────────────
+
+def _queue_event(path: str):
+    """Records that `path` changed. The writer decides later whether it exists."""
+    _events.put((path, time.time()))
+    _ensure_writer()
+
+
+def _ensure_writer():
+    global _writer_thread
+    if _writer_thread is None:
+        with _writer_lock:
+            if _writer_thread is None:
+                _watch_stats["started"] = time.time()
+                _writer_thread = threading.Thread(target=_writer_loop, daemon=True, name="sentinel-index-writer")
+                _writer_thread.start()
+
+
+def _writer_loop():
+    # path -> (first event time, last event time). Create/modify/delete sequences
+    # collapse naturally: the file's state on disk at apply time is what gets written.
+    pending = {}
+    next_sweep = time.time() + WATCH_DEBOUNCE_SECONDS
+    while True:
+        try:
+            timeout = max(0.0, next_sweep - time.time()) if pending else None
+            path, at = _events.get(timeout=timeout)
+            _watch_stats["received"] += 1
+            first = pending[path][0] if path in pending else at
+            pending[path] = (first, at)
+            _watch_stats["pending"] = len(pending)
+            if len(pending) < WATCH_MAX_BATCH and time.time() < next_sweep:
+                continue
+        except queue.Empty:
+            pass
+
+        now = time.time()
+        next_sweep = now + WATCH_DEBOUNCE_SECONDS
+        if len(pending) >= WATCH_MAX_BATCH:
+            ready = list(pending)
+        else:
+            # Settled paths, plus files that keep changing (logs) once they've waited long enough
+            ready = [p for p, (first, last) in pending.items()
+                     if now - last >= WATCH_DEBOUNCE_SECONDS or now - first >= WATCH_MAX_DELAY_SECONDS]
+        if not ready:
+            continue
+        batch = {p: pending.pop(p) for p in ready}
+        _watch_stats["pending"] = len(pending)
+        _apply_with_retry(batch)
 
 
-def _delete_file(fullpath: str):
-    """Remove a file record when it's deleted/moved."""
-    try:
-        conn = _get_conn()
-        conn.execute("DELETE FROM files WHERE path = ?", (fullpath,))
-        conn.commit()
-        conn.close()
-    except Exception:
-        pass
+def _apply_with_retry(batch):
+    """
+    Applies a batch; on failure retries it once (e.g. the database was busy),
+    then path by path, so one bad path can't drop the rest of the batch.
+    """
+    for _ in range(2):
+        try:
+            _apply_events(batch)
+            return
+        except Exception as e:
+            error = e
+
+    failed = []
+    for path, times in batch.items():
+        try:
+            _apply_events({path: times})
+        except Exception:
+            failed.append(path)
+    if failed:
+        _watch_stats["failed"] += len(failed)
+        print(f"[System] ⚠  Index writer could not apply {len(failed)} of {len(batch)} changes "
+              f"(e.g. {failed[0]}): {error}")
+
+
+def _apply_events(batch):
+    upserts, deletes = [], []
+    for path in batch:
+        row = _file_row(path)
+        if row is not None:
+            upserts.append(row)
+        else:
+            deletes.append((path,))
+
+    with db.write(DB_FILE) as conn:
+        if upserts:
+            conn.executemany(_UPSERT_FILE, upserts)
+            fuzzy_names.add_names(conn, [row[1] for row in upserts])
+        if deletes:
+            conn.executemany("DELETE FROM files WHERE path = ?", deletes)
+
+    lag = time.time() - min(first for first, _ in batch.values())
+    _watch_stats["applied"] += len(batch)
+    _watch_stats["batches"] += 1
+    _watch_stats["last_lag"] = lag
+    _watch_stats["max_lag"] = max(_watch_stats["max_lag"], lag)
+
+
+def watcher_stats():
+    s = _watch_stats
+    if not s["received"]:
+        return "idle"
+    elapsed = max(time.time() - s["started"], 1e-6)
+    return (f"{s['received']} events ({s['received'] / elapsed:.1f}/s) → {s['applied']} writes in "
+            f"{s['batches']} batches, {s['pending']} pending, lag {s['last_lag']:.1f}s (max {s['max_lag']:.1f}s)"
+            + (f", {s['failed']} failed" if s["failed"] else ""))
 
 
 # ─── Filesystem Watcher ───────────────────────────────────────────────────────
@@ -122,22 +250,23 @@ def _start_watcher(watch_dirs: list):
         from watchdog.events import FileSystemEventHandler
 
         class _IndexHandler(FileSystemEventHandler):
+            # Handlers only enqueue; the writer thread does all stat()s and SQL
             def on_created(self, event):
                 if not event.is_directory:
-                    _upsert_file(event.src_path)
+                    _queue_event(event.src_path)
 
             def on_modified(self, event):
                 if not event.is_directory:
-                    _upsert_file(event.src_path)
+                    _queue_event(event.src_path)
 
             def on_deleted(self, event):
                 if not event.is_directory:
-                    _delete_file(event.src_path)
+                    _queue_event(event.src_path)
 
             def on_moved(self, event):
                 if not event.is_directory:
-                    _delete_file(event.src_path)
-                    _upsert_file(event.dest_path)
+                    _queue_event(event.src_path)
+                    _queue_event(event.dest_path)
 
         observer = Observer()
         handler = _IndexHandler()
@@ -173,107 +302,548 @@ def _start_watcher(watch_dirs: list):
 
 # ─── Full index build (initial scan) ─────────────────────────────────────────
 
-def build_index(silent=True):
-    conn = _get_conn()
-    cursor = conn.cursor()
-
-    # Setup
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS files (
-            path TEXT PRIMARY KEY,
-            name TEXT,
-            extension TEXT,
-            size_mb REAL,
-            modified_date TEXT,
-            mtime_raw REAL
+def _ensure_name_index(conn):
+    """
+    Trigram index over file names: substring search without a table scan.
+    External content keyed by the files rowid (VACUUM can renumber those;
+    follow one with: INSERT INTO files_fts(files_fts) VALUES('rebuild')).
+    """
+    has_fts = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'files_fts'").fetchone()
+    # Missing triggers: the catalog was last written by a SQLite without trigram support
+    in_sync = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'files_fts_ai'").fetchone()
+    if not has_fts:
+        conn.execute(
+            "CREATE VIRTUAL TABLE files_fts USING fts5("
+            "name, content='files', content_rowid='rowid', tokenize='trigram')"
         )
+    if not has_fts or not in_sync:
+        conn.execute("INSERT INTO files_fts(files_fts) VALUES('rebuild')")
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS files_fts_ai AFTER INSERT ON files BEGIN
+            INSERT INTO files_fts(rowid, name) VALUES (new.rowid, new.name);
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS files_fts_ad AFTER DELETE ON files BEGIN
+            INSERT INTO files_fts(files_fts, rowid, name) VALUES ('delete', old.rowid, old.name);
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS files_fts_au AFTER UPDATE OF name ON files BEGIN
+            INSERT INTO files_fts(files_fts, rowid, name) VALUES ('delete', old.rowid, old.name);
+            INSERT INTO files_fts(rowid, name) VALUES (new.rowid, new.name);
+        END
     ''')
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_name ON files(name)")
-
-    targets = _get_scan_targets()
 
-    cursor.execute("SELECT path, mtime_raw FROM files")
-    existing_files = {row['path']: row['mtime_raw'] for row in cursor.fetchall()}
 
-    updates = []
-    seen_paths = set()
+def _trigram_supported():
+    probe = sqlite3.connect(":memory:")
+    try:
+        probe.execute("CREATE VIRTUAL TABLE probe USING fts5(x, tokenize='trigram')")
+        return True
+    except sqlite3.Error:
+        return False
+    finally:
+        probe.close()
 
-    if not silent:
-        print(f"[System] Scanning {len(targets)} locations...")
 
-    for folder in targets:
-        if not os.path.exists(folder):
+def _ensure_schema():
+    global _schema_ready, _trigram
+    if _schema_ready:
+        return
+    if _trigram is None:
+        _trigram = _trigram_supported()
+    with db.write(DB_FILE) as conn:
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY,
+                name TEXT,
+                extension TEXT,
+                size_mb REAL,
+                modified_date TEXT,
+                mtime_raw REAL,
+                dir TEXT
+            )
+        ''')
+        columns = {row['name'] for row in conn.execute("PRAGMA table_info(files)")}
+        if "dir" not in columns:
+            conn.execute("ALTER TABLE files ADD COLUMN dir TEXT")
+        # Case-insensitive: serves prefix lookups in search_db (the old binary idx_name served nothing)
+        conn.execute("DROP INDEX IF EXISTS idx_name")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_name_nocase ON files(name COLLATE NOCASE)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_files_dir ON files(dir)")
+        # query_files filters: extension first (most selective in practice), then range columns
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_files_ext_mtime ON files(extension, mtime_raw)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_files_ext_size ON files(extension, size_mb)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_files_mtime ON files(mtime_raw)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_files_size ON files(size_mb)")
+
+        # One row per scanned directory: lets rescans skip folders that haven't changed
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS dirs (
+                path TEXT PRIMARY KEY,
+                parent TEXT,
+                mtime REAL,
+                file_count INTEGER,
+                scanned_at REAL
+            )
+        ''')
+        dir_columns = {row['name'] for row in conn.execute("PRAGMA table_info(dirs)")}
+        if "scanned_at" not in dir_columns:
+            conn.execute("ALTER TABLE dirs ADD COLUMN scanned_at REAL DEFAULT 0")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_dirs_parent ON dirs(parent)")
+        conn.execute("CREATE TABLE IF NOT EXISTS scan_state (key TEXT PRIMARY KEY, value TEXT)")
+        fuzzy_names.ensure_schema(conn)
+
+        if _trigram:
+            _ensure_name_index(conn)
+        else:
+            # Triggers left by a newer SQLite would make every write to files fail here
+            for trigger in ("files_fts_ai", "files_fts_ad", "files_fts_au"):
+                conn.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+
+    # Catalogs from before the dir column: fill it in bounded chunks
+    while True:
+        rows = _get_conn().execute("SELECT rowid, path FROM files WHERE dir IS NULL LIMIT 10000").fetchall()
+        if not rows:
+            break
+        with db.write(DB_FILE) as conn:
+            conn.executemany("UPDATE files SET dir = ? WHERE rowid = ?",
+                             [(os.path.dirname(r['path']), r['rowid']) for r in rows])
+
+    # Word vocabulary for fuzzy_find_file, built once from an existing catalog
+    if _get_state("name_terms_built") is None:
+        last = 0
+        while True:
+            rows = _get_conn().execute(
+                "SELECT rowid, name FROM files WHERE rowid > ? ORDER BY rowid LIMIT 50000", (last,)
+            ).fetchall()
+            if not rows:
+                break
+            with db.write(DB_FILE) as conn:
+                fuzzy_names.add_names(conn, [r['name'] for r in rows])
+            last = rows[-1]['rowid']
+        with db.write(DB_FILE) as conn:
+            conn.execute("INSERT OR REPLACE INTO scan_state VALUES ('name_terms_built', '1')")
+    _schema_ready = True
+
+
+def _get_state(key, default=None):
+    row = _get_conn().execute("SELECT value FROM scan_state WHERE key = ?", (key,)).fetchone()
+    return row['value'] if row else default
+
+
+def _subtree_range(path):
+    """[lo, hi) bounds matching every path strictly below `path`."""
+    prefix = path.rstrip("\\/") + os.sep
+    return prefix, prefix[:-1] + chr(ord(os.sep) + 1)
+
+
+def _known_dir(path, since=0.0):
+    """(mtime, file_count) recorded for `path` at or after `since`. Runs on scanner threads."""
+    row = _get_conn().execute(
+        "SELECT mtime, file_count FROM dirs WHERE path = ? AND scanned_at >= ?", (path, since)
+    ).fetchone()
+    return (row['mtime'], row['file_count']) if row else None
+
+
+def _diff_dir(conn, listing, changes):
+    """Compares one listed directory against the catalog, touching only that directory's rows."""
+    existing = {
+        row['path']: row['mtime_raw']
+        for row in conn.execute("SELECT path, mtime_raw FROM files WHERE dir = ?", (listing.path,))
+    }
+    for f, size, current_mtime in listing.files:
+        fullpath = os.path.join(listing.path, f)
+        old = existing.pop(fullpath, None)
+        if old is not None and abs(old - current_mtime) < 1.0:
             continue
 
-        for root, dirs, filenames in os.walk(folder):
-            dirs[:] = [d for d in dirs if d not in SKIP_DIRS and not d.startswith(".")]
+        size_mb = round(size / (1024 * 1024), 2)
+        mtime_str = datetime.datetime.fromtimestamp(current_mtime).strftime('%Y-%m-%d %H:%M:%S')
+        ext = os.path.splitext(f)[1].lower()
+
+        changes["updates"].append((fullpath, f, ext, size_mb, mtime_str, current_mtime, listing.path))
+
+    changes["deletes"].extend((p,) for p in existing)
 
-            for f in filenames:
-                if f.startswith("~$") or f.startswith("."):
-                    continue
+    current = {path for path, _ in listing.subdirs}
+    for row in conn.execute("SELECT path FROM dirs WHERE parent = ?", (listing.path,)):
+        if row['path'] not in current:
+            changes["removed_dirs"].append(row['path'])
 
-                fullpath = os.path.join(root, f)
-                seen_paths.add(fullpath)
+    changes["dirs"].append((listing.path, os.path.dirname(listing.path), listing.mtime, len(listing.files),
+                            changes["scanned_at"]))
 
-                try:
-                    stats = os.stat(fullpath)
-                    current_mtime = stats.st_mtime
 
-                    if fullpath in existing_files and abs(existing_files[fullpath] - current_mtime) < 1.0:
-                        continue
+def _apply_changes(changes):
+    """Commits one batch of scan results; each directory lands together with its files."""
+    updates, deletes = changes["updates"], changes["deletes"]
+    removed = len(deletes)
+    with db.write(DB_FILE) as conn:
+        if updates:
+            conn.executemany(_UPSERT_FILE, updates)
+            fuzzy_names.add_names(conn, [row[1] for row in updates])
 
-                    size_mb = round(stats.st_size / (1024 * 1024), 2)
-                    mtime_str = datetime.datetime.fromtimestamp(current_mtime).strftime('%Y-%m-%d %H:%M:%S')
-                    ext = os.path.splitext(f)[1].lower()
+        if deletes:
+            conn.executemany("DELETE FROM files WHERE path = ?", deletes)
 
-                    updates.append((fullpath, f, ext, size_mb, mtime_str, current_mtime))
+        for path in changes["removed_dirs"]:
+            lo, hi = _subtree_range(path)
+            removed += conn.execute("DELETE FROM files WHERE dir = ? OR (dir >= ? AND dir < ?)", (path, lo, hi)).rowcount
+            conn.execute("DELETE FROM dirs WHERE path = ? OR (path >= ? AND path < ?)", (path, lo, hi))
+
+        conn.executemany(
+            "INSERT OR REPLACE INTO dirs (path, parent, mtime, file_count, scanned_at) VALUES (?, ?, ?, ?, ?)",
+            changes["dirs"]
+        )
+
+    added = len(updates)
+    for key in ("updates", "deletes", "dirs", "removed_dirs"):
+        changes[key] = []
+    return added, removed
 
-                except (OSError, PermissionError):
-                    continue
 
-    if updates:
+def build_index(silent=True, full=False):
+    """
+    Incremental catalog scan. Directories whose mtime and file count match the
+    last scan are skipped without stat-ing their files; changed ones are diffed
+    against their own rows only. In-place edits don't touch a folder's mtime,
+    so every FULL_RESCAN_HOURS (or with full=True) all files are re-checked.
+
+    Results are committed every SCAN_BATCH changes, each folder together with
+    its files, so an interrupted scan keeps its progress. A full pass records
+    when it started; the next run resumes it and skips folders already done.
+    """
+    _ensure_schema()
+    targets = _get_scan_targets()
+    now = time.time()
+
+    full_started = _get_state("full_scan_started")
+    if full_started is not None and now - float(full_started) < FULL_RESCAN_HOURS * 3600:
+        full, since = True, float(full_started)
         if not silent:
-            print(f"[System] Indexing {len(updates)} new/changed files...")
-        cursor.executemany('''
-            INSERT OR REPLACE INTO files (path, name, extension, size_mb, modified_date, mtime_raw)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', updates)
-
-    deleted_paths = set(existing_files.keys()) - seen_paths
-    if deleted_paths:
-        deleted_list = list(deleted_paths)
-        chunk_size = 900
-        for i in range(0, len(deleted_list), chunk_size):
-            chunk = deleted_list[i:i + chunk_size]
-            cursor.executemany("DELETE FROM files WHERE path = ?", [(p,) for p in chunk])
-
-    conn.commit()
-    conn.close()
+            print("[System] Resuming interrupted full scan...")
+    else:
+        last_full = float(_get_state("last_full_scan", 0))
+        full = full or now - last_full > FULL_RESCAN_HOURS * 3600
+        since = now if full else 0.0
+        if full:
+            with db.write(DB_FILE) as conn:
+                conn.execute("INSERT OR REPLACE INTO scan_state VALUES ('full_scan_started', ?)", (str(now),))
+
+    changes = {"updates": [], "deletes": [], "dirs": [], "removed_dirs": [], "scanned_at": now}
+    conn = _get_conn()
+    added = removed = skipped = 0
+
+    if not silent:
+        print(f"[System] Scanning {len(targets)} locations{' (full)' if full else ''}...")
+
+    # Directories across all targets are listed in parallel; order is arbitrary.
+    # A folder recorded at or after `since` with the same mtime and file count is skipped.
+    known = functools.partial(_known_dir, since=since)
+    for n, listing in enumerate(fs_scan.scan(targets, SKIP_DIRS, known=known)):
+        if executor.is_cancelled():
+            a, r = _apply_changes(changes)
+            return (f"Index scan cancelled after {added + a} new, {removed + r} removed; "
+                    "progress is saved and the next scan resumes from here.")
+        if n % 500 == 0:
+            jobs.report_progress(None, f"Scanned {n} folders ({skipped} unchanged, {added} new)")
+        if listing.files is None:
+            skipped += 1
+            continue
+        _diff_dir(conn, listing, changes)
+
+        if len(changes["updates"]) + len(changes["deletes"]) + len(changes["dirs"]) >= SCAN_BATCH:
+            a, r = _apply_changes(changes)
+            added, removed = added + a, removed + r
+
+    a, r = _apply_changes(changes)
+    added, removed = added + a, removed + r
+
+    with db.write(DB_FILE) as conn:
+        if full:
+            # Every directory under the scanned roots is now recorded; files in
+            # any other directory there belong to folders that no longer exist.
+            for root in targets:
+                if os.path.isdir(root):
+                    lo, hi = _subtree_range(root)
+                    removed += conn.execute(
+                        "DELETE FROM files WHERE (dir = ? OR (dir >= ? AND dir < ?)) "
+                        "AND dir NOT IN (SELECT path FROM dirs)", (root, lo, hi)
+                    ).rowcount
+            conn.execute("INSERT OR REPLACE INTO scan_state VALUES ('last_full_scan', ?)", (str(since),))
+            conn.execute("DELETE FROM scan_state WHERE key = 'full_scan_started'")
+
+        if added or removed:
+            # Keep planner statistics current for query_files' index choice
+            conn.execute("PRAGMA optimize")
 
     # After first scan, start the watcher so future changes are instant
     _start_watcher(targets)
 
-    return f"Index Updated: {len(updates)} new, {len(deleted_paths)} removed."
+    return f"Index Updated: {added} new, {removed} removed, {skipped} folders unchanged."
 
 
-def search_db(query):
-    conn = _get_conn()
-    cursor = conn.cursor()
+def _match_quality(name, query):
+    """3 exact, 2 prefix, 1 starts a word, 0 anywhere else (all case-insensitive)."""
+    name, query = name.lower(), query.lower()
+    if name == query or os.path.splitext(name)[0] == query:
+        return 3
+    if name.startswith(query):
+        return 2
+    i = name.find(query)
+    if i > 0 and not name[i - 1].isalnum():
+        return 1
+    return 0
+
 
-    sql_query = f"%{query}%"
+def search_db(query, limit=10):
+    """
+    Filename substring search. Names are matched through the trigram index,
+    then ranked by match quality (exact > prefix > word start > anywhere),
+    with recency breaking ties within a quality band.
+    """
+    _ensure_schema()
+    conn = _get_conn()
+    query = query.strip()
+    if not query:
+        return "No files found matching that name."
 
-    cursor.execute('''
-        SELECT name, path, modified_date
+    if len(query) >= 3 and _trigram:
+        # Quoted phrase: the trigram tokenizer matches it as a substring
+        phrase = '"' + query.replace('"', '""') + '"'
+        # rowid order streams straight out of the index (newest-indexed first);
+        # sorting every hit by mtime would cost O(matches) for common words
+        rows = conn.execute('''
+            SELECT f.name, f.path, f.modified_date, f.mtime_raw
+            FROM (SELECT rowid FROM files_fts WHERE files_fts MATCH ? ORDER BY rowid DESC LIMIT ?) hits
+            JOIN files f ON f.rowid = hits.rowid
+        ''', (phrase, SEARCH_CANDIDATES)).fetchall()
+    else:
+        # Trigrams need three characters (and SQLite 3.34+); otherwise fall back to a scan
+        rows = conn.execute('''
+            SELECT name, path, modified_date, mtime_raw
+            FROM files
+            WHERE name LIKE ?
+            ORDER BY mtime_raw DESC
+            LIMIT ?
+        ''', (f"%{query}%", SEARCH_CANDIDATES)).fetchall()
+
+    # Exact and prefix hits always make the candidate set, however old they are
+    rows += conn.execute('''
+        SELECT name, path, modified_date, mtime_raw
         FROM files
-        WHERE name LIKE ?
-        ORDER BY mtime_raw DESC
-        LIMIT 10
-    ''', (sql_query,))
+        WHERE name >= ? COLLATE NOCASE AND name < ? COLLATE NOCASE
+        LIMIT 50
+    ''', (query, query + "\U0010ffff")).fetchall()
+    rows = list({r['path']: r for r in rows}.values())
+
+    if not rows:
+        close = fuzzy_search(query, limit)
+        if close.startswith("No files"):
+            return "No files found matching that name."
+        return f"No exact matches. Closest names:\n{close}"
+
+    now = time.time()
+    ranked = sorted(
+        rows,
+        key=lambda r: _match_quality(r['name'], query) + 1 / (1 + max(now - (r['mtime_raw'] or 0), 0) / 86400 / 30),
+        reverse=True,
+    )[:limit]
+
+    return "\n".join([f"- {r['name']} ({r['modified_date']})\n  Path: {r['path']}" for r in ranked])
+
+
+def fuzzy_search(query, limit=10):
+    """
+    Typo-tolerant filename search ("reciept.pdf", "quartely report").
+    Each query word is corrected against the name vocabulary; files containing
+    the best corrections of the most specific word are fetched through the
+    trigram index and ranked by how closely their words match the whole query.
+    A trailing extension ("resume.pdf") only filters: it is shared by too many
+    names to say anything about which file was meant.
+    """
+    _ensure_schema()
+    conn = _get_conn()
+    stem, ext = os.path.splitext(query.strip())
+    if not (stem.strip() and ext[1:].isalnum()):
+        stem, ext = query, ""
+    ext = ext.lower()
+    query_words = fuzzy_names.words(stem)
+    lookup = [w for w in query_words if w.isalpha() and len(w) >= 3]
+    if not lookup:
+        return "No files found matching that name."
 
-    results = cursor.fetchall()
-    conn.close()
+    # Longest word first: it narrows the candidates the most
+    anchor_terms = []
+    for word in sorted(lookup, key=len, reverse=True):
+        anchor_terms = [term for _, term in fuzzy_names.similar_terms(conn, word)]
+        if anchor_terms:
+            break
+    if not anchor_terms:
+        return "No files found matching that name."
 
-    if not results:
+    # Filter by extension before the candidate cap, so other types can't crowd it out
+    if _trigram:
+        match = " OR ".join('"' + t.replace('"', '""') + '"' for t in anchor_terms)
+        only_ext = "AND rowid IN (SELECT rowid FROM files WHERE extension = ?)" if ext else ""
+        rows = conn.execute(f'''
+            SELECT f.name, f.path, f.modified_date, f.mtime_raw
+            FROM (SELECT rowid FROM files_fts WHERE files_fts MATCH ? {only_ext} ORDER BY rowid DESC LIMIT ?) hits
+            JOIN files f ON f.rowid = hits.rowid
+        ''', [match] + ([ext] if ext else []) + [FUZZY_CANDIDATES]).fetchall()
+    else:
+        likes = " OR ".join("name LIKE ?" for _ in anchor_terms)
+        only_ext = "AND extension = ?" if ext else ""
+        rows = conn.execute(f'''
+            SELECT name, path, modified_date, mtime_raw FROM files
+            WHERE ({likes}) {only_ext} ORDER BY rowid DESC LIMIT ?
+        ''', [f"%{t}%" for t in anchor_terms] + ([ext] if ext else []) + [FUZZY_CANDIDATES]).fetchall()
+
+    # Name words repeat heavily across files, so distances are memoized per call
+    similarity = {}
+
+    def word_score(qw, name_words):
+        best = 0.0
+        for nw in name_words:
+            key = (qw, nw)
+            if key not in similarity:
+                if qw.isdigit() or nw.isdigit():
+                    similarity[key] = 1.0 if qw == nw else 0.0
+                else:
+                    budget = fuzzy_names.max_edits(qw)
+                    d = fuzzy_names.edit_distance(qw, nw, budget)
+                    similarity[key] = 0.0 if d > budget else 1 - d / max(len(qw), len(nw))
+            best = max(best, similarity[key])
+        return best
+
+    now = time.time()
+    scored = []
+    for r in rows:
+        name_words = set(fuzzy_names.words(os.path.splitext(r['name'])[0]))
+        # Numbers alone ("2023") match too many names; at least one real word must
+        if not any(word_score(qw, name_words) for qw in lookup):
+            continue
+        score = sum(word_score(qw, name_words) for qw in query_words) / len(query_words)
+        if score < 0.5:
+            continue
+        recency = 1 / (1 + max(now - (r['mtime_raw'] or 0), 0) / 86400 / 30)
+        scored.append((score + 0.1 * recency, r))
+
+    if not scored:
         return "No files found matching that name."
+    scored.sort(key=lambda pair: pair[0], reverse=True)
+    return "\n".join(f"- {r['name']} ({r['modified_date']})\n  Path: {r['path']}" for _, r in scored[:limit])
+
+
+# ─── Structured queries ───────────────────────────────────────────────────────
+
+_SORTS = {"modified": "f.mtime_raw", "size": "f.size_mb", "name": "f.name COLLATE NOCASE"}
+_UNITS = {"h": 3600, "d": 86400, "w": 7 * 86400, "m": 30 * 86400, "y": 365 * 86400}
 
-    return "\n".join([f"- {r['name']} ({r['modified_date']})\n  Path: {r['path']}" for r in results])
\ No newline at end of file
+
+def _parse_when(value):
+    """
+    Epoch seconds for 'YYYY-MM-DD[ HH:MM]', 'today', 'yesterday', 'this week',
+    'this month', 'this year', or a span back from now such as '7d', '24h', '2w', '3m'.
+    """
+    text = str(value).strip().lower()
+    now = datetime.datetime.now()
+    midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    named = {
+        "today": midnight,
+        "yesterday": midnight - datetime.timedelta(days=1),
+        "this week": midnight - datetime.timedelta(days=midnight.weekday()),
+        "this month": midnight.replace(day=1),
+        "this year": midnight.replace(month=1, day=1),
+    }
+    if text in named:
+        return named[text].timestamp()
+    if text[:-1].isdigit() and text[-1:] in _UNITS:
+        return time.time() - int(text[:-1]) * _UNITS[text[-1]]
+    for fmt in ("%Y-%m-%d %H:%M", "%Y-%m-%d", "%Y-%m"):
+        try:
+            return datetime.datetime.strptime(text, fmt).timestamp()
+        except ValueError:
+            continue
+    raise ValueError(f"Unrecognized date '{value}'. Use YYYY-MM-DD, 'today', 'this month', or e.g. '7d'.")
+
+
+def query_files(name=None, extension=None, min_mb: float = None, max_mb: float = None, modified_after=None,
+                modified_before=None, folder=None, sort="modified", descending=True, limit=20, page=1):
+    """
+    Filtered catalog query, e.g. PDFs over 50 MB modified this month in Downloads:
+    query_files(extension="pdf", min_mb=50, modified_after="this month", folder="Downloads").
+    `extension` accepts a comma-separated list; `folder` may be absolute or relative to home.
+    """
+    _ensure_schema()
+    try:
+        clauses, params = [], []
+
+        if name:
+            if len(name) >= 3 and _trigram:
+                clauses.append("f.rowid IN (SELECT rowid FROM files_fts WHERE files_fts MATCH ?)")
+                params.append('"' + name.replace('"', '""') + '"')
+            else:
+                clauses.append("f.name LIKE ?")
+                params.append(f"%{name}%")
+
+        if extension:
+            exts = ["." + e.strip().lower().lstrip(".") for e in str(extension).split(",") if e.strip()]
+            clauses.append(f"f.extension IN ({','.join('?' * len(exts))})")
+            params.extend(exts)
+
+        if min_mb is not None:
+            clauses.append("f.size_mb >= ?")
+            params.append(float(min_mb))
+        if max_mb is not None:
+            clauses.append("f.size_mb <= ?")
+            params.append(float(max_mb))
+
+        if modified_after:
+            clauses.append("f.mtime_raw >= ?")
+            params.append(_parse_when(modified_after))
+        if modified_before:
+            clauses.append("f.mtime_raw < ?")
+            params.append(_parse_when(modified_before))
+
+        if folder:
+            root = os.path.expanduser(folder)
+            if not os.path.isabs(root):
+                root = os.path.join(os.path.expanduser("~"), root)
+            lo, hi = _subtree_range(os.path.normpath(root))
+            # Range on the primary key instead of LIKE: uses the index, and no escaping of % or _.
+            # For a big folder with nothing else to narrow it, walking the sort column's index
+            # and filtering by path beats sorting the whole subtree; unary + stops SQLite
+            # from choosing the path range.
+            broad = not (name or extension) and _get_conn().execute(
+                "SELECT COUNT(*) FROM (SELECT 1 FROM files WHERE path >= ? AND path < ? LIMIT ?)",
+                (lo, hi, BROAD_FOLDER_ROWS)
+            ).fetchone()[0] >= BROAD_FOLDER_ROWS
+            clauses.append("+f.path >= ? AND +f.path < ?" if broad else "f.path >= ? AND f.path < ?")
+            params.extend([lo, hi])
+    except ValueError as e:
+        return f"Error: {e}"
+
+    if sort not in _SORTS:
+        return f"Error: sort must be one of {', '.join(_SORTS)}."
+    limit = max(1, min(int(limit), 100))
+    offset = (max(1, int(page)) - 1) * limit
+
+    where = " AND ".join(clauses) or "1"
+    rows = _get_conn().execute(f'''
+        SELECT f.name, f.path, f.modified_date, f.size_mb
+        FROM files f
+        WHERE {where}
+        ORDER BY {_SORTS[sort]} {"DESC" if descending else "ASC"}
+        LIMIT ? OFFSET ?
+    ''', (*params, limit + 1, offset)).fetchall()
+
+    if not rows:
+        return "No files match those filters." if page == 1 else f"No more results (page {page})."
+
+    lines = [f"- {r['name']} ({r['modified_date']}, {r['size_mb']} MB)\n  Path: {r['path']}" for r in rows[:limit]]
+    if len(rows) > limit:
+        lines.append(f"(page {page}; more results with page={int(page) + 1})")
+    return "\n".join(lines)
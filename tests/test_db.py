@@ -0,0 +1,48 @@
+"""Transaction semantics of sentinel.core.db.write, including nested blocks."""
+import os
+import tempfile
+import unittest
+
+from sentinel.core import db
+
+
+class WriteTest(unittest.TestCase):
+    def setUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(prefix="sentinel-db-"), "t.db")
+        with db.write(self.path) as conn:
+            conn.execute("CREATE TABLE t (x INTEGER)")
+
+    def tearDown(self):
+        db.close_all(self.path)
+
+    def rows(self):
+        return [r[0] for r in db.connect(self.path).execute("SELECT x FROM t ORDER BY x")]
+
+    def test_outer_raises_after_inner_write(self):
+        with self.assertRaises(KeyError):
+            with db.write(self.path):
+                with db.write(self.path) as inner:
+                    inner.execute("INSERT INTO t VALUES (1)")
+                raise KeyError
+        self.assertEqual(self.rows(), [])
+
+    def test_inner_failure_rolls_back_only_the_inner_block(self):
+        with db.write(self.path) as outer:
+            outer.execute("INSERT INTO t VALUES (1)")
+            with self.assertRaises(ValueError):
+                with db.write(self.path) as inner:
+                    inner.execute("INSERT INTO t VALUES (2)")
+                    raise ValueError
+            with db.write(self.path) as inner:
+                inner.execute("INSERT INTO t VALUES (3)")
+        self.assertEqual(self.rows(), [1, 3])
+
+    def test_nested_writes_commit_with_the_outer_block(self):
+        with db.write(self.path):
+            with db.write(self.path) as inner:
+                inner.execute("INSERT INTO t VALUES (4)")
+        self.assertEqual(self.rows(), [4])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+"""
+Fact storage in sentinel.tools.memory_ops, run against the numpy vector
+backend with a deterministic bag-of-words embedder.
+
+    python -m pytest tests/test_memory_ops.py
+"""
+import hashlib
+import os
+import re
+import tempfile
+import unittest
+
+os.environ["HOME"] = tempfile.mkdtemp(prefix="sentinel-test-home-")
+
+import numpy as np  # noqa: E402
+
+from sentinel.core.config import ConfigManager  # noqa: E402
+from sentinel.core.embed_cache import CachedEmbeddingFunction  # noqa: E402
+from sentinel.tools import memory_ops  # noqa: E402
+
+
+class _WordsEmbedding:
+    """Hashes alphabetic words only, so "age 31" and "age 32" embed identically."""
+
+    def __call__(self, input):
+        out = []
+        for text in input:
+            v = np.zeros(64, dtype="float32")
+            for w in re.findall(r"[a-z]+", text.lower()):
+                v[int(hashlib.md5(w.encode()).hexdigest(), 16) % 64] += 1
+            out.append(v / (np.linalg.norm(v) + 1e-9))
+        return out
+
+
+class StoreFactTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        ConfigManager().set("memory.vector_backend", "numpy")
+        memory_ops._make_embedding_function = lambda: CachedEmbeddingFunction(_WordsEmbedding(), "words")
+        memory_ops.init_chroma()
+
+    @classmethod
+    def tearDownClass(cls):
+        memory_ops.teardown()
+
+    def objects(self, subject, predicate):
+        return sorted(r['object'] for r in memory_ops.find_facts(subject, predicate, limit=None))
+
+    def test_updated_value_is_stored(self):
+        self.assertIn("Stored", memory_ops.store_fact("User", "age", "31"))
+        self.assertIn("Stored", memory_ops.store_fact("User", "age", "32"))
+        self.assertEqual(self.objects("User", "age"), ["31", "32"])
+
+    def test_restated_fact_is_reinforced(self):
+        memory_ops.store_fact("User", "likes", "green tea")
+        self.assertIn("Already Known", memory_ops.store_fact("user", "likes", "Green tea"))
+        self.assertIn("Already Known", memory_ops.store_fact("User", "likes", "green  tea!"))
+        self.assertEqual(self.objects("User", "likes"), ["green tea"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,198 @@
+"""
+Native tool calling against local stub servers for every provider LLMEngine
+speaks to: schemas go out in each provider's format and structured (parallel)
+tool calls come back as {"tool", "args"} dicts.
+
+    python -m pytest tests/test_native_tools.py
+"""
+import functools
+import json
+import os
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+os.environ["HOME"] = tempfile.mkdtemp(prefix="sentinel-test-home-")
+
+import openai  # noqa: E402
+
+from sentinel.core import llm, tool_schema  # noqa: E402
+from sentinel.core.llm import LLMEngine  # noqa: E402
+
+
+def _openai_reply(body):
+    return {
+        "id": "c", "object": "chat.completion", "created": 0, "model": body["model"],
+        "choices": [{"index": 0, "finish_reason": "tool_calls", "message": {
+            "role": "assistant", "content": None,
+            "tool_calls": [
+                {"id": "1", "type": "function", "function": {"name": "set_volume", "arguments": '{"level": 40}'}},
+                {"id": "2", "type": "function", "function": {"name": "get_time", "arguments": "{}"}},
+            ],
+        }}],
+    }
+
+
+class _Stub(BaseHTTPRequestHandler):
+    requests = []
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, payload, content_type="application/json"):
+        data = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        _Stub.requests.append((self.path, body))
+
+        if self.headers.get("Authorization") == "Bearer bad-key":
+            return self._send(401, {"error": {"message": "Incorrect API key", "type": "invalid_api_key"}})
+
+        if self.path.endswith("/chat/completions"):
+            return self._send(200, _openai_reply(body))
+
+        if self.path.endswith("/v1/messages"):
+            return self._send(200, {
+                "id": "m", "type": "message", "role": "assistant", "model": body["model"],
+                "stop_reason": "tool_use", "stop_sequence": None,
+                "usage": {"input_tokens": 1, "output_tokens": 1},
+                "content": [
+                    {"type": "text", "text": "Opening both."},
+                    {"type": "tool_use", "id": "t1", "name": "open_app", "input": {"name": "spotify"}},
+                    {"type": "tool_use", "id": "t2", "name": "set_volume", "input": {"level": 20}},
+                ],
+            })
+
+        if self.path == "/api/chat":
+            if body["model"] == "no-tools":
+                if "tools" in body:
+                    return self._send(400, {"error": "registry.ollama.ai/library/no-tools does not support tools"})
+                line = json.dumps({"message": {"role": "assistant", "content": '{"tool": "get_time"}'}, "done": True})
+                return self._send(200, (line + "\n").encode(), "application/x-ndjson")
+            return self._send(200, {"model": body["model"], "done": True, "message": {
+                "role": "assistant", "content": "",
+                "tool_calls": [{"function": {"name": "find_file", "arguments": {"query": "resume.pdf"}}}],
+            }})
+
+        self._send(404, {"error": "unknown path"})
+
+
+class _Config:
+    def __init__(self, provider, model, base, key="test-key"):
+        self.settings = {"llm": {"provider": provider, "model": model, "base_urls": {
+            "openai": f"{base}/v1", "groq": base, "anthropic": base, "ollama": base,
+        }}}
+        self.key = key
+
+    def load(self):
+        return self.settings
+
+    def get_key(self, service):
+        return self.key
+
+
+def set_volume(level: int):
+    pass
+
+
+def get_time():
+    pass
+
+
+def find_file(query, limit=10):
+    pass
+
+
+def query_files(name=None, min_mb: float = None, descending=True):
+    pass
+
+
+def install_software(package_names: list[str]):
+    pass
+
+
+@functools.wraps(set_volume)
+def approved_set_volume(**kwargs):
+    pass
+
+
+TOOLS = {"set_volume": set_volume, "get_time": get_time, "open_app": lambda **k: None,
+         "find_file": find_file, "query_files": query_files, "install_software": install_software,
+         "approved_set_volume": approved_set_volume}
+PROMPT = "- open_app(name): launch an application\n- set_volume(level): integer 0-100\n- get_time()"
+
+
+class NativeToolsTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _Stub)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base = f"http://127.0.0.1:{cls.server.server_port}"
+        cls.specs = tool_schema.build_tool_specs(TOOLS, PROMPT)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+
+    def setUp(self):
+        _Stub.requests.clear()
+
+    def _engine(self, provider, model="m", key="test-key"):
+        return LLMEngine(_Config(provider, model, self.base, key), verbose=False)
+
+    def test_schema_types_come_from_signatures(self):
+        props = {s["name"]: s["parameters"]["properties"] for s in self.specs}
+        self.assertEqual(props["set_volume"]["level"], {"type": "integer"})
+        self.assertEqual(props["approved_set_volume"]["level"], {"type": "integer"})
+        self.assertEqual(props["find_file"]["limit"], {"type": "integer"})
+        self.assertEqual(props["query_files"]["min_mb"], {"type": "number"})
+        self.assertEqual(props["query_files"]["descending"], {"type": "boolean"})
+        self.assertEqual(props["install_software"]["package_names"],
+                         {"type": "array", "items": {"type": "string"}})
+        self.assertEqual(props["open_app"], {"name": {"type": "string"}})
+
+    def test_openai_and_groq_parallel_calls(self):
+        for provider in ("openai", "groq"):
+            text, calls = self._engine(provider).query_tools("sys", [{"role": "user", "content": "hi"}], self.specs)
+            self.assertEqual(calls, [{"tool": "set_volume", "args": {"level": 40}}, {"tool": "get_time", "args": {}}])
+            path, body = _Stub.requests[-1]
+            self.assertTrue(path.endswith("/chat/completions"))
+            self.assertEqual(body["tools"][0]["type"], "function")
+
+    def test_anthropic_text_and_calls(self):
+        text, calls = self._engine("anthropic").query_tools("sys", [{"role": "user", "content": "hi"}], self.specs)
+        self.assertEqual(text, "Opening both.")
+        self.assertEqual(calls, [{"tool": "open_app", "args": {"name": "spotify"}},
+                                 {"tool": "set_volume", "args": {"level": 20}}])
+        self.assertIn("input_schema", _Stub.requests[-1][1]["tools"][0])
+
+    def test_ollama_calls(self):
+        text, calls = self._engine("ollama").query_tools("sys", [{"role": "user", "content": "hi"}], self.specs)
+        self.assertEqual(calls, [{"tool": "find_file", "args": {"query": "resume.pdf"}}])
+
+    def test_tool_rejection_falls_back_once_and_is_remembered(self):
+        engine = self._engine("ollama", model="no-tools")
+        for _ in range(2):
+            text, calls = engine.query_tools("sys", [{"role": "user", "content": "time?"}], self.specs)
+            self.assertEqual((text, calls), ('{"tool": "get_time"}', []))
+        with_tools = [body for _, body in _Stub.requests if "tools" in body]
+        self.assertEqual(len(with_tools), 1)
+        self.assertIn(("ollama", "no-tools"), llm._NO_NATIVE_TOOLS)
+
+    def test_auth_errors_propagate(self):
+        engine = self._engine("openai", key="bad-key")
+        with self.assertRaises(openai.AuthenticationError):
+            engine.query_tools("sys", [{"role": "user", "content": "hi"}], self.specs)
+        self.assertEqual(len(_Stub.requests), 1)
+        self.assertNotIn(("openai", "m"), llm._NO_NATIVE_TOOLS)
+
+
+if __name__ == "__main__":
+    unittest.main()